@@ -0,0 +1,175 @@
+"""In-process load of note API (without HTTP server and database server).
+
+Requests are sent straight to ASGI application, notes are stored in memory
+backend with simulated database round trip (``--latency``), so results are
+reproducible offline and compared with baseline (see ``benchmarks.harness``)::
+
+    python -m benchmarks.asgi_load --latency 0.002 --save baseline.json
+    python -m benchmarks.asgi_load --latency 0.002 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from benchmarks import harness
+from benchmarks.load import SCENARIOS
+from tachyon.db.backends import StorageBackend
+from tachyon.settings import settings
+from tachyon.web.application import get_app
+
+App = Any
+
+
+async def call(
+    app: App,
+    method: str,
+    path: str,
+    body: Optional[Dict[str, Any]] = None,
+) -> Tuple[int, bytes]:
+    """Send request to ASGI application.
+
+    :param app: ASGI application
+    :param method: http method
+    :param path: url path
+    :param body: JSON body
+    :return: status code and response body
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"benchmark"),
+            (b"content-type", b"application/json"),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    request_messages = [
+        {
+            "type": "http.request",
+            "body": json.dumps(body).encode() if body is not None else b"",
+            "more_body": False,
+        },
+    ]
+    disconnected = asyncio.Event()
+    response: Dict[str, Any] = {"status": 0, "body": []}
+
+    async def receive() -> Dict[str, Any]:  # noqa: WPS430
+        if request_messages:
+            return request_messages.pop()
+
+        # client stays connected until response is sent
+        await disconnected.wait()
+
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:  # noqa: WPS430
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    disconnected.set()
+
+    return response["status"], b"".join(response["body"])
+
+
+async def create(app: App) -> str:
+    """Create note.
+
+    :param app: ASGI application
+    :return: note sign
+    :raises RuntimeError: if note isn't created
+    """
+    status, body = await call(
+        app,
+        "POST",
+        "/api/note/",
+        {"name": uuid.uuid4().hex, "text": uuid.uuid4().hex},
+    )
+
+    if status != 200:
+        raise RuntimeError("Note creation failed: {0}".format(body.decode()))
+
+    return json.loads(body)["sign"]
+
+
+async def run(scenario: str, total: int, concurrency: int) -> harness.Stats:
+    """Run load scenario against application in this process.
+
+    :param scenario: one of SCENARIOS
+    :param total: total number of requests
+    :param concurrency: number of requests in flight
+    :return: throughput and latency stats
+    """
+    app = get_app()
+    await app.router.startup()
+
+    try:
+        sign = await create(app)
+
+        async def request(index: int) -> None:  # noqa: WPS430
+            # mixed scenario is one creation per nine reads
+            if scenario == "create" or (scenario == "mixed" and not index % 10):
+                await create(app)
+                return
+
+            status, body = await call(app, "GET", "/api/note/{0}/".format(sign))
+
+            if status != 200:
+                raise RuntimeError("Note read failed: {0}".format(body.decode()))
+
+        return await harness.measure_concurrent(request, total, concurrency)
+    finally:
+        await app.router.shutdown()
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Run scenarios and report results.
+
+    :param args: parsed arguments
+    :return: exit code
+    """
+    results = {}
+
+    for scenario in args.scenario:
+        results["asgi.{0}".format(scenario)] = await run(
+            scenario,
+            args.requests,
+            args.concurrency,
+        )
+
+    return harness.report(results, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenario", choices=SCENARIOS, nargs="+", default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.002,
+        help="seconds of simulated database round trip",
+    )
+    harness.add_arguments(parser)
+    args = parser.parse_args()
+
+    settings.storage_backend = StorageBackend.memory
+    settings.storage_memory_latency = args.latency
+    # load of one client address is measured, not its rate limit
+    settings.ratelimit_ip_rate = 0
+
+    sys.exit(asyncio.run(main(args)))
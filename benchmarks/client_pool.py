@@ -0,0 +1,94 @@
+"""Throughput of database calls through thread pool of async client.
+
+Fetches one document by concurrent calls (memory backend with simulated
+database round trip) with blocking calls of sync client in event loop (as
+DAO did before async client) and through async client with every pool
+size, compares with baseline (see ``benchmarks.harness``)::
+
+    python -m benchmarks.client_pool --save baseline.json
+    python -m benchmarks.client_pool --baseline baseline.json
+"""
+import argparse
+import asyncio
+import functools
+import sys
+from typing import Dict, List
+
+from benchmarks import harness
+from tachyon.db.backends.memory import MemoryCloudant
+from tachyon.db.client import AsyncCloudantClient
+
+POOL_SIZES = [1, 10, 100]
+NUMBER = 500
+CONCURRENCY = 100
+
+
+async def fetch(client: AsyncCloudantClient, _: int) -> None:
+    """Fetch benchmark document through async client.
+
+    :param client: async client
+    :param _: index of call
+    """
+    await client.get_document(db="benchmark", doc_id="doc")
+
+
+async def run(
+    latency: float,
+    pool_sizes: List[int],
+    number: int,
+) -> Dict[str, harness.Stats]:
+    """Fetch document by blocking calls and through every pool size.
+
+    :param latency: seconds of simulated database round trip
+    :param pool_sizes: pool sizes of async client
+    :param number: quantity of calls of every benchmark
+    :return: stats by benchmark name
+    """
+    backend = MemoryCloudant(latency)
+    backend.put_database("benchmark")
+    backend.put_document("benchmark", "doc", {"field": 1})
+
+    async def blocking_fetch(_: int) -> None:  # noqa: WPS430
+        backend.get_document(db="benchmark", doc_id="doc")
+
+    results = {
+        "client_pool.blocking": await harness.measure_concurrent(
+            blocking_fetch,
+            number,
+            CONCURRENCY,
+        ),
+    }
+
+    for pool_size in pool_sizes:
+        client = AsyncCloudantClient(backend, pool_size=pool_size)
+
+        name = "client_pool.pool[{0}]".format(pool_size)
+        results[name] = await harness.measure_concurrent(
+            functools.partial(fetch, client),
+            number,
+            CONCURRENCY,
+        )
+        client.close()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=NUMBER)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=POOL_SIZES)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.002,
+        help="seconds of simulated database round trip",
+    )
+    harness.add_arguments(parser)
+    args = parser.parse_args()
+
+    sys.exit(
+        harness.report(
+            asyncio.run(run(args.latency, args.pool_sizes, args.number)),
+            args,
+        ),
+    )
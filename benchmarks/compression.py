@@ -0,0 +1,136 @@
+"""Storage size and latency of notes with content compression codecs.
+
+Creates and reads text notes of typical sizes with every codec (memory
+backend with simulated database round trip), prints stored size of content
+and compares latency with baseline (see ``benchmarks.harness``)::
+
+    python -m benchmarks.compression --save baseline.json
+    python -m benchmarks.compression --baseline baseline.json
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+from benchmarks import harness
+from tachyon.db.backends import StorageBackend
+from tachyon.db.dao.note_dao import NoteDAO
+from tachyon.services.compression import NoteCodec
+from tachyon.settings import settings
+
+SIZES = {"1kb": 1024, "64kb": 64 * 1024, "1mb": 1024 * 1024, "8mb": 8 * 1024 * 1024}
+CODECS: List[Optional[NoteCodec]] = [None, *NoteCodec]
+# notes of every size and codec for 1 KB, less for larger sizes
+NUMBER = 200
+
+# same texts on every run
+_random = random.Random(0)  # noqa: S311
+WORDS = [
+    "".join(_random.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(length))
+    for length in _random.choices(range(2, 12), k=5000)
+]
+
+
+def text(size: int) -> str:
+    """Text of random words (compressible as natural language text).
+
+    :param size: bytes of text
+    :return: text
+    """
+    words = []
+    length = 0
+
+    while length < size:
+        word = _random.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+
+    return " ".join(words)[:size]
+
+
+async def stored_size(dao: NoteDAO, sign: str) -> int:
+    """Bytes of stored content of note.
+
+    :param dao: note DAO
+    :param sign: note sign
+    :return: content size
+    """
+    document = (
+        await dao._client.get_document(  # noqa: WPS437
+            db=dao._base_name,  # noqa: WPS437
+            doc_id=sign,
+        )
+    ).get_result()
+
+    return document["_attachments"]["body"]["length"]
+
+
+async def run(number: int) -> Dict[str, harness.Stats]:
+    """Create and read notes of every size and codec.
+
+    :param number: notes of every size and codec for 1 KB
+    :return: stats by benchmark name
+    """
+    dao = NoteDAO()
+    results = {}
+
+    for label, size in SIZES.items():
+        content = text(size)
+        count = max(3, number * 1024 // size)
+
+        for codec in CODECS:
+            settings.notes_compression = codec
+            name = "{0}[{1}]".format(codec.value if codec else "none", label)
+            timings: Dict[str, List[float]] = {"create": [], "read": []}
+            signs = []
+
+            for _ in range(count):
+                started = time.perf_counter()
+                signs.append(await dao.create(name=name, text=content))
+                timings["create"].append(time.perf_counter() - started)
+
+            stored = await stored_size(dao, signs[0])
+
+            for sign in signs:
+                started = time.perf_counter()
+                await dao.read(sign)
+                timings["read"].append(time.perf_counter() - started)
+
+            print(  # noqa: WPS421
+                "{0:<32} stored {1:>10} bytes ({2:.1%})".format(
+                    name,
+                    stored,
+                    stored / size,
+                ),
+            )
+
+            for operation, operation_timings in timings.items():
+                results["compression.{0}.{1}".format(operation, name)] = harness.stats(
+                    operation_timings,
+                )
+
+    dao.close_client()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=NUMBER)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.002,
+        help="seconds of simulated database round trip",
+    )
+    harness.add_arguments(parser)
+    args = parser.parse_args()
+
+    settings.storage_backend = StorageBackend.memory
+    settings.storage_memory_latency = args.latency
+    # every size is compressed
+    settings.notes_compression_min_size = min(SIZES.values()) // 2
+
+    sys.exit(harness.report(asyncio.run(run(args.number)), args))
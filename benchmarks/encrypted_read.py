@@ -0,0 +1,86 @@
+"""Encrypted note reads per second per core: legacy key scheme against argon2id KDF.
+
+Legacy scheme (version 1) verifies argon2 password hash and then derives key
+with sha256, new scheme (version 2) runs argon2id once for key and key tag::
+
+    python -m benchmarks.encrypted_read --reads 20
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Callable
+
+import nacl.pwhash
+
+from tachyon.services.ciphers.chacha20poly1305 import ChaCha20Poly1305
+from tachyon.services.password import password_executor
+
+MESSAGE = b"benchmark" * 1000
+
+
+def legacy_read(password: str) -> Callable[[], bytes]:
+    """Read of note encrypted with legacy scheme.
+
+    :param password: note password
+    :return: read function
+    """
+    password_hash = nacl.pwhash.str(password.encode())
+    cipher = ChaCha20Poly1305(password)
+    metadata = cipher.metadata
+    encrypted = cipher.encrypt(MESSAGE)
+
+    def read() -> bytes:  # noqa: WPS430
+        nacl.pwhash.verify(password_hash, password.encode())
+
+        return ChaCha20Poly1305(password, **metadata).decrypt(encrypted)
+
+    return read
+
+
+def kdf_read(password: str) -> Callable[[], bytes]:
+    """Read of note encrypted with argon2id key derivation.
+
+    :param password: note password
+    :return: read function
+    """
+    cipher = asyncio.run(ChaCha20Poly1305.derive(password))
+    metadata = cipher.metadata
+    encrypted = cipher.encrypt(MESSAGE)
+
+    def read() -> bytes:  # noqa: WPS430
+        derived = asyncio.run(ChaCha20Poly1305.derive(password, **metadata))
+
+        return derived.decrypt(encrypted)
+
+    return read
+
+
+def main() -> None:
+    """Print encrypted reads per second of both schemes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reads", type=int, default=20)
+    args = parser.parse_args()
+
+    password = uuid.uuid4().hex
+
+    for name, read in (("legacy", legacy_read(password)), ("kdf", kdf_read(password))):
+        read()
+
+        started = time.perf_counter()
+        for _ in range(args.reads):
+            read()
+        elapsed = time.perf_counter() - started
+
+        print(  # noqa: WPS421
+            "{0:>6}: {1:.1f} reads per second per core".format(
+                name,
+                args.reads / elapsed,
+            ),
+        )
+
+    password_executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
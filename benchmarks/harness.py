@@ -0,0 +1,147 @@
+"""Benchmark results with comparison against stored baseline.
+
+Every benchmark has throughput and latency stats (``rps``, ``mean_ms``,
+``p50_ms``, ``p99_ms``). Results are saved as JSON with ``--save`` and later
+runs are compared with them by ``--baseline``: benchmark with throughput
+lower than baseline by more than ``--tolerance`` is a regression and run
+exits with code 1::
+
+    python -m benchmarks.micro --save baseline.json
+    python -m benchmarks.micro --baseline baseline.json --tolerance 0.3
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+Stats = Dict[str, float]
+
+
+def percentile(timings: List[float], percent: float) -> float:
+    """Percentile of timings (nearest-rank).
+
+    :param timings: list of measured timings
+    :param percent: percentile in range 0-100
+    :return: timing value
+    """
+    ordered = sorted(timings)
+    index = max(0, int(round(percent / 100 * len(ordered))) - 1)
+
+    return ordered[index]
+
+
+def stats(timings: List[float], elapsed: Optional[float] = None) -> Stats:
+    """Throughput and latency stats of measured calls.
+
+    :param timings: seconds of every call
+    :param elapsed: seconds of all calls (if they were concurrent)
+    :return: stats
+    """
+    return {
+        "rps": len(timings) / (elapsed if elapsed is not None else sum(timings)),
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+    }
+
+
+def measure(func: Callable[[], Any], number: int) -> Stats:
+    """Call function one by one and measure every call.
+
+    :param func: benchmarked function
+    :param number: quantity of calls
+    :return: stats
+    """
+    timings = []
+
+    for _ in range(number):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    return stats(timings)
+
+
+async def measure_concurrent(
+    func: Callable[[int], Awaitable[Any]],
+    number: int,
+    concurrency: int,
+) -> Stats:
+    """Await coroutine function calls with limited concurrency.
+
+    :param func: benchmarked coroutine function (gets index of call)
+    :param number: quantity of calls
+    :param concurrency: max calls in flight
+    :return: stats
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def timed(index: int) -> None:  # noqa: WPS430
+        async with semaphore:
+            started = time.perf_counter()
+            await func(index)
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(index) for index in range(number)))
+
+    return stats(timings, time.perf_counter() - started)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add arguments of baseline comparison to benchmark parser.
+
+    :param parser: parser of benchmark arguments
+    """
+    parser.add_argument("--baseline", help="JSON file of results to compare with")
+    parser.add_argument("--save", help="JSON file to save results to")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed throughput decrease against baseline (fraction)",
+    )
+
+
+def report(results: Dict[str, Stats], args: argparse.Namespace) -> int:
+    """Print results (with baseline comparison) and save them.
+
+    :param results: stats by benchmark name
+    :param args: parsed arguments (see add_arguments)
+    :return: exit code, 1 if there are regressions
+    """
+    baseline: Dict[str, Stats] = {}
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    regressions = 0
+
+    for name, result in results.items():
+        line = "{0:<32} {1:>12.1f} rps  p50 {2:>9.3f} ms  p99 {3:>9.3f} ms".format(
+            name,
+            result["rps"],
+            result["p50_ms"],
+            result["p99_ms"],
+        )
+
+        if name in baseline:
+            change = result["rps"] / baseline[name]["rps"] - 1
+
+            line += "  {0:+7.1%}".format(change)
+
+            if change < -args.tolerance:
+                regressions += 1
+                line += "  REGRESSION"
+
+        print(line)  # noqa: WPS421
+
+    if args.save:
+        with open(args.save, "w") as results_file:
+            json.dump(results, results_file, indent=2, sort_keys=True)
+
+    return 1 if regressions else 0
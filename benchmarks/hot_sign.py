@@ -0,0 +1,79 @@
+"""Concurrent reads of one note (shared link opened by many clients at once).
+
+Reads one note by ``--reads`` concurrent ``NoteDAO.read`` calls (memory
+backend with simulated round trip) and prints time and database requests::
+
+    python -m benchmarks.hot_sign --reads 1000 --latency 0.002
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from tachyon.db.backends import StorageBackend
+from tachyon.db.client import cloudant_request_seconds
+from tachyon.db.dao.note_dao import NoteDAO
+from tachyon.exceptions.dao.note import NoteDAONotFound
+from tachyon.settings import settings
+
+OPERATIONS = ("get_document", "put_update")
+
+
+async def main(reads: int) -> None:
+    """Read unlimited and limited notes by concurrent reads.
+
+    :param reads: quantity of concurrent reads
+    """
+    dao = NoteDAO()
+
+    for label, max_number_visits in (
+        ("unlimited", 0),
+        ("limited to half", reads // 2),
+    ):
+        sign = await dao.create(
+            name=uuid.uuid4().hex,
+            text=uuid.uuid4().hex,
+            max_number_visits=max_number_visits,
+        )
+        requests_before = {
+            operation: cloudant_request_seconds.get(operation)[0]
+            for operation in OPERATIONS
+        }
+
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(dao.read(sign) for _ in range(reads)),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - started
+
+        print(  # noqa: WPS421
+            "{0:>16}: {1:.1f} ms, {2} read, {3} not found, {4}".format(
+                label,
+                elapsed * 1000,
+                sum(isinstance(result, tuple) for result in results),
+                sum(isinstance(result, NoteDAONotFound) for result in results),
+                ", ".join(
+                    "{0} {1}".format(
+                        operation,
+                        cloudant_request_seconds.get(operation)[0]
+                        - requests_before[operation],
+                    )
+                    for operation in OPERATIONS
+                ),
+            ),
+        )
+
+    dao.close_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reads", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.002)
+    args = parser.parse_args()
+
+    settings.storage_backend = StorageBackend.memory
+    settings.storage_memory_latency = args.latency
+
+    asyncio.run(main(args.reads))
@@ -0,0 +1,90 @@
+"""HTTP load driver for note API.
+
+Run server with local CouchDB (``deploy/docker-compose.local.yml``) and then::
+
+    python -m benchmarks.load --url http://127.0.0.1:8081 --scenario mixed
+
+Prints requests per second and p50/p99 latency of the scenario
+(and comparison with baseline, see ``benchmarks.harness``).
+"""
+import argparse
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from benchmarks import harness
+
+SCENARIOS = ("create", "read", "mixed")
+
+
+def _create(session: requests.Session, url: str) -> str:
+    response = session.post(
+        "{0}/api/note/".format(url),
+        json={"name": uuid.uuid4().hex, "text": uuid.uuid4().hex},
+    )
+    response.raise_for_status()
+
+    return response.json()["sign"]
+
+
+def _read(session: requests.Session, url: str, sign: str) -> None:
+    session.get("{0}/api/note/{1}/".format(url, sign)).raise_for_status()
+
+
+def run(url: str, scenario: str, total: int, concurrency: int) -> Dict[str, float]:
+    """Run load scenario against running server.
+
+    :param url: server base url
+    :param scenario: one of SCENARIOS
+    :param total: total number of requests
+    :param concurrency: number of parallel clients
+    :return: throughput and latency stats
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    sign = _create(session, url)
+
+    def timed(index: int) -> float:  # noqa: WPS430
+        started = time.perf_counter()
+
+        # mixed scenario is one creation per nine reads
+        if scenario == "create" or (scenario == "mixed" and not index % 10):
+            _create(session, url)
+        else:
+            _read(session, url, sign)
+
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = list(executor.map(timed, range(total)))
+    elapsed = time.perf_counter() - started
+
+    return harness.stats(timings, elapsed)
+
+
+def main() -> None:
+    """Parse arguments and print results of load scenario."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="read")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    harness.add_arguments(parser)
+    args = parser.parse_args()
+
+    stats = run(args.url, args.scenario, args.requests, args.concurrency)
+
+    sys.exit(harness.report({"http.{0}".format(args.scenario): stats}, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Overhead of metrics samples (per sample, single thread)::
+
+    python -m benchmarks.metrics_overhead
+
+Measured on CPython 3.11: counter inc ~0.4 us, histogram observe ~0.8 us,
+histogram timer (context manager with two perf_counter calls) ~2 us.
+"""
+import timeit
+
+from tachyon.services.metrics import Counter, Histogram, Registry
+
+NUMBER = 1000000
+
+
+def main() -> None:
+    """Print time per sample for every kind of instrumentation."""
+    registry = Registry()
+    histogram = Histogram(
+        "benchmark_seconds",
+        "Benchmark histogram.",
+        labels=("stage",),
+        metrics_registry=registry,
+    )
+    counter = Counter(
+        "benchmark_total",
+        "Benchmark counter.",
+        labels=("code",),
+        metrics_registry=registry,
+    )
+
+    def timed_block() -> None:  # noqa: WPS430
+        with histogram.time("stage"):
+            pass  # noqa: WPS420
+
+    for name, sample in (
+        ("counter inc", lambda: counter.inc("404")),
+        ("histogram observe", lambda: histogram.observe(0.003, "stage")),
+        ("histogram timer", timed_block),
+    ):
+        seconds = timeit.timeit(sample, number=NUMBER)
+
+        print(  # noqa: WPS421
+            "{0:>18}: {1:.2f} us per sample".format(name, seconds / NUMBER * 1e6),
+        )
+
+
+if __name__ == "__main__":
+    main()
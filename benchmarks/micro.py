@@ -0,0 +1,101 @@
+"""Microbenchmarks of note model, cbor metadata and note cipher.
+
+Runs without database and server, compares with baseline (see
+``benchmarks.harness``)::
+
+    python -m benchmarks.micro --save baseline.json
+    python -m benchmarks.micro --baseline baseline.json
+"""
+import argparse
+import asyncio
+import os
+import sys
+from typing import Callable, Dict, Tuple
+
+from benchmarks import harness
+from tachyon.db.models.note_model import NoteModel
+from tachyon.db.utils import cbor
+from tachyon.services.ciphers.chacha20poly1305 import ChaCha20Poly1305
+from tachyon.services.password import password_executor
+
+SIZES = {"1kb": 1024, "64kb": 64 * 1024, "1mb": 1024 * 1024}
+# calls of every benchmark for 1 KB, less for larger sizes
+NUMBER = 2000
+
+
+def note_benchmarks(content: bytes) -> Dict[str, Callable[[], object]]:
+    """Note model to database document and back.
+
+    :param content: note content
+    :return: benchmarked functions by name
+    """
+    note = NoteModel(name="benchmark", max_number_visits=1)
+    note.set_text(content)
+    document = {"_id": "sign", "_rev": "1-rev", "sign": "sign", **note.to_document()}
+
+    return {
+        "note.to_document": note.to_document,
+        "note.from_document": lambda: NoteModel.from_document(dict(document)),
+    }
+
+
+def cipher_benchmarks(
+    cipher: ChaCha20Poly1305,
+    content: bytes,
+) -> Dict[str, Callable[[], object]]:
+    """Encryption and decryption of note content.
+
+    :param cipher: note cipher
+    :param content: note content
+    :return: benchmarked functions by name
+    """
+    encrypted = cipher.encrypt(content)
+
+    return {
+        "chacha20poly1305.encrypt": lambda: cipher.encrypt(content),
+        "chacha20poly1305.decrypt": lambda: cipher.decrypt(encrypted),
+    }
+
+
+def run() -> Dict[str, harness.Stats]:
+    """Run all microbenchmarks.
+
+    :return: stats by benchmark name
+    """
+    results = {}
+    cipher = asyncio.get_event_loop().run_until_complete(
+        ChaCha20Poly1305.derive("benchmark"),
+    )
+    password_executor.shutdown()
+
+    metadata = cipher.metadata
+    encoded_metadata = cbor.dumps(metadata)
+    benchmarks: Dict[str, Tuple[Callable[[], object], int]] = {
+        "cbor.dumps": (lambda: cbor.dumps(metadata), NUMBER * 10),
+        "cbor.loads": (lambda: cbor.loads(encoded_metadata), NUMBER * 10),
+    }
+
+    for label, size in SIZES.items():
+        content = os.urandom(size)
+        number = max(10, NUMBER * 1024 // size)
+
+        for name, func in {
+            **note_benchmarks(content),
+            **cipher_benchmarks(cipher, content),
+        }.items():
+            benchmarks["{0}[{1}]".format(name, label)] = (func, number)
+
+    for name, (func, number) in benchmarks.items():
+        # warm up (caches, lazy imports)
+        func()
+        results[name] = harness.measure(func, number)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    harness.add_arguments(parser)
+    args = parser.parse_args()
+
+    sys.exit(harness.report(run(), args))
@@ -0,0 +1,68 @@
+"""Note body encoding cost: legacy b85 text against binary attachment.
+
+Measures CPU time of building database document (JSON) from note content
+and reading content back, and stored size of content::
+
+    python -m benchmarks.note_body
+"""
+import base64
+import json
+import os
+import timeit
+
+from tachyon.db.models.note_model import NoteModel
+
+SIZES = {"1 KB": 1024, "100 KB": 100 * 1024, "5 MB": 5 * 1024 * 1024}
+
+
+def legacy_roundtrip(content: bytes) -> bytes:
+    """Content to document and back in legacy layout (b85 text).
+
+    :param content: note content
+    :return: decoded content
+    """
+    document = json.dumps(
+        {"name": "benchmark", "text": base64.b85encode(content).decode()}
+    )
+
+    return base64.b85decode(json.loads(document)["text"])
+
+
+def attachment_roundtrip(content: bytes) -> bytes:
+    """Content to document and back in attachment layout.
+
+    :param content: note content
+    :return: decoded content
+    """
+    note = NoteModel(name="benchmark")
+    note.set_text(content)
+
+    document = json.dumps(note.to_document())
+
+    return NoteModel.from_document(json.loads(document)).get_content()
+
+
+def main() -> None:
+    """Print timings and stored sizes for every note size."""
+    for label, size in SIZES.items():
+        content = os.urandom(size)
+        number = max(1, 2000000 // size)
+
+        for name, roundtrip, stored_size in (
+            ("b85 text", legacy_roundtrip, len(base64.b85encode(content))),
+            ("attachment", attachment_roundtrip, size),
+        ):
+            seconds = timeit.timeit(lambda: roundtrip(content), number=number)
+
+            print(  # noqa: WPS421
+                "{0:>7} {1:<10}: {2:10.3f} ms per note, stored {3} bytes".format(
+                    label,
+                    name,
+                    seconds / number * 1000,
+                    stored_size,
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main()
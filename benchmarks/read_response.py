@@ -0,0 +1,112 @@
+"""Note read response cost: validated pydantic models against direct response.
+
+Measures CPU time per request of decoding fetched note document and
+rendering read response body, as done by ``read_note`` endpoint::
+
+    python -m benchmarks.read_response
+"""
+import asyncio
+import base64
+import os
+import time
+from typing import Any, Dict
+
+from fastapi.responses import UJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from tachyon.db.models.note_model import BODY_ATTACHMENT, NoteModel
+from tachyon.web.api.note.schemas import NoteReadResponse
+from tachyon.web.api.note.views import router
+
+SIZES = {"1 KB": 1024, "100 KB": 100 * 1024, "5 MB": 5 * 1024 * 1024}
+
+READ_ROUTE = next(
+    route
+    for route in router.routes
+    if isinstance(route, APIRoute) and route.name == "read_note"
+)
+
+
+def fetched_document(content: bytes) -> Dict[str, Any]:
+    """Note document as it is fetched with attachments.
+
+    :param content: note content
+    :return: document
+    """
+    return {
+        "_id": "benchmark",
+        "_rev": "1-benchmark",
+        "sign": "benchmark",
+        "name": "benchmark",
+        "content_type": "text",
+        "max_number_visits": 0,
+        "current_number_visits": 0,
+        "is_encrypted": False,
+        "_attachments": {
+            BODY_ATTACHMENT: {
+                "content_type": "application/octet-stream",
+                "data": base64.b64encode(content).decode(),
+            },
+        },
+    }
+
+
+async def validated_response(document: Dict[str, Any]) -> bytes:
+    """Validated note model and response model (revalidated by FastAPI).
+
+    :param document: fetched document
+    :return: response body
+    """
+    attachments = document.pop("_attachments")
+    note = NoteModel(**document)
+    message = base64.b64decode(attachments[BODY_ATTACHMENT]["data"]).decode()
+
+    content = await serialize_response(
+        field=READ_ROUTE.secure_cloned_response_field,
+        response_content=NoteReadResponse(name=note.name, message=message),
+    )
+
+    return UJSONResponse(content).body
+
+
+async def direct_response(document: Dict[str, Any]) -> bytes:
+    """Note model from trusted document and response rendered as is.
+
+    :param document: fetched document
+    :return: response body
+    """
+    note = NoteModel.from_document(document)
+
+    return UJSONResponse({"name": note.name, "message": note.get_text()}).body
+
+
+async def main() -> None:
+    """Print CPU time per request for every note size."""
+    for label, size in SIZES.items():
+        # text notes, so content is valid utf-8
+        content = os.urandom(size // 2).hex().encode()
+        document = fetched_document(content)
+        number = max(10, 20000000 // size)
+
+        for name, render in (
+            ("validated", validated_response),
+            ("direct", direct_response),
+        ):
+            started = time.process_time()
+
+            for _ in range(number):
+                await render(dict(document))
+
+            seconds = time.process_time() - started
+
+            print(  # noqa: WPS421
+                "{0:>7} {1:<9}: {2:10.3f} ms CPU per request".format(
+                    label,
+                    name,
+                    seconds / number * 1000,
+                ),
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
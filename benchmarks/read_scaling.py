@@ -0,0 +1,98 @@
+"""Note read latency depending on database size.
+
+Seeds notes database (from ``TACHYON_*`` environment) up to every size in
+``--sizes`` and measures ``NoteDAO.read`` latency of random stored notes::
+
+    python -m benchmarks.read_scaling --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import List
+
+from ibmcloudant.cloudant_v1 import BulkDocs
+
+from benchmarks.harness import percentile
+from tachyon.db.dao.note_dao import NoteDAO
+from tachyon.db.models.note_model import NoteModel
+
+SEED_BATCH_SIZE = 5000
+
+
+async def seed(dao: NoteDAO, signs: List[str], size: int) -> None:
+    """Bulk insert unlimited notes until database has size notes.
+
+    :param dao: note dao
+    :param signs: already stored signs (extended in place)
+    :param size: target quantity of notes
+    """
+    note = NoteModel(name="benchmark")
+    note.set_text(b"benchmark" * 10)
+    note_data = note.dict(exclude={"key", "sign"})
+
+    while len(signs) < size:
+        batch = [
+            dao._generate_sign()  # noqa: WPS437
+            for _ in range(min(SEED_BATCH_SIZE, size - len(signs)))
+        ]
+
+        await dao._client.post_bulk_docs(  # noqa: WPS437
+            db=dao._base_name,  # noqa: WPS437
+            bulk_docs=BulkDocs(
+                docs=[{**note_data, "_id": sign, "sign": sign} for sign in batch],
+            ),
+        )
+
+        signs.extend(batch)
+
+
+async def measure(dao: NoteDAO, signs: List[str], reads: int) -> List[float]:
+    """Read random notes one by one.
+
+    :param dao: note dao
+    :param signs: stored signs
+    :param reads: quantity of reads
+    :return: timings of reads
+    """
+    timings = []
+
+    for sign in random.sample(signs, min(reads, len(signs))):
+        started = time.perf_counter()
+        await dao.read(sign)
+        timings.append(time.perf_counter() - started)
+
+    return timings
+
+
+async def main(sizes: List[int], reads: int) -> None:
+    """Seed and measure for every database size.
+
+    :param sizes: database sizes
+    :param reads: quantity of reads for every size
+    """
+    dao = NoteDAO()
+    signs: List[str] = []
+
+    for size in sorted(sizes):
+        await seed(dao, signs, size)
+        timings = await measure(dao, signs, reads)
+
+        print(  # noqa: WPS421
+            "{0:>8} notes: mean {1:.2f} ms, p50 {2:.2f} ms, p99 {3:.2f} ms".format(
+                size,
+                statistics.mean(timings) * 1000,
+                percentile(timings, 50) * 1000,
+                percentile(timings, 99) * 1000,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--reads", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.sizes, args.reads))
@@ -1,6 +1,6 @@
 import asyncio
 import sys
-from collections import Generator
+from typing import Generator
 
 import nest_asyncio
 import pytest
@@ -41,7 +41,8 @@ def notes_initialize_db(
     :param event_loop: Session-wide event loop.
     :yields: Nothing.
     """
-    NoteDAO()._populate_db()  # noqa: WPS437
+    dao = NoteDAO()
+    dao._populate_db(dao._connect())  # noqa: WPS437
 
     yield
 
@@ -63,11 +64,14 @@ def fastapi_app() -> FastAPI:
 @pytest.fixture(scope="function")
 def client(
     fastapi_app: FastAPI,
-) -> TestClient:
+) -> Generator[TestClient, None, None]:
     """
     Fixture that creates client for requesting server.
 
+    Application startup and shutdown events are run around the test.
+
     :param fastapi_app: the application.
-    :return: client for the app.
+    :yields: client for the app.
     """
-    return TestClient(app=fastapi_app)
+    with TestClient(app=fastapi_app) as test_client:
+        yield test_client
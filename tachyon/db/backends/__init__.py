@@ -0,0 +1,19 @@
+"""Storage backends of database client.
+
+Backend is a sync client with document API of CloudantV1 used by DAO
+(documents with revisions, attachments, bulk requests, selector queries,
+views and update functions) declared by ``base.StorageClient``, it is
+wrapped by AsyncCloudantClient.
+"""
+from enum import Enum
+
+
+class StorageBackend(str, Enum):  # noqa: WPS600
+    """Enum of storage backends."""
+
+    # remote CouchDB/Cloudant
+    cloudant = "cloudant"
+    # local sqlite file (single node deployments)
+    sqlite = "sqlite"
+    # in-process database (tests and benchmarks), lost on restart
+    memory = "memory"
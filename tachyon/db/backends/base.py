@@ -0,0 +1,257 @@
+"""Storage interface of database client (implemented by every backend)."""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from ibm_cloud_sdk_core import DetailedResponse
+
+
+class StorageClient(ABC):  # noqa: WPS214
+    """Sync client of storage with document API of CloudantV1 used by DAO.
+
+    Methods (except ``put_update`` and ``post_compact``, which CloudantV1
+    doesn't have) take arguments of CloudantV1 methods with the same names
+    and return responses with the same results, errors are raised as
+    ``ApiException`` with http status code.
+    """
+
+    # max database calls in flight worth thread of async client
+    # (none if every call waits for network)
+    max_concurrency: Optional[int] = None
+
+    def set_pool_size(self, pool_size: int) -> None:
+        """Size connection pool for concurrent calls of async client.
+
+        :param pool_size: max quantity of concurrent calls
+        """
+
+    def close(self) -> None:
+        """Release pooled connections."""
+
+    @abstractmethod
+    def get_server_information(self, **kwargs: Any) -> DetailedResponse:
+        """Server information.
+
+        :param kwargs: request options
+        """
+
+    @abstractmethod
+    def put_database(self, db: str, **kwargs: Any) -> DetailedResponse:
+        """Create database.
+
+        :param db: database name
+        :param kwargs: request options
+        """
+
+    @abstractmethod
+    def delete_database(self, db: str, **kwargs: Any) -> DetailedResponse:
+        """Delete database.
+
+        :param db: database name
+        :param kwargs: request options
+        """
+
+    @abstractmethod
+    def get_database_information(self, db: str, **kwargs: Any) -> DetailedResponse:
+        """Database information with documents counts.
+
+        :param db: database name
+        :param kwargs: request options
+        """
+
+    @abstractmethod
+    def post_index(
+        self,
+        db: str,
+        index: Any,
+        name: str,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Create index of document fields.
+
+        :param db: database name
+        :param index: index definition
+        :param name: index name
+        :param kwargs: request options (type)
+        """
+
+    @abstractmethod
+    def get_document(self, db: str, doc_id: str, **kwargs: Any) -> DetailedResponse:
+        """Get document.
+
+        :param db: database name
+        :param doc_id: document id
+        :param kwargs: request options (attachments)
+        """
+
+    @abstractmethod
+    def put_document(
+        self,
+        db: str,
+        doc_id: str,
+        document: Any,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Create or update document.
+
+        :param db: database name
+        :param doc_id: document id
+        :param document: document (with revision for update)
+        :param kwargs: request options
+        """
+
+    @abstractmethod
+    def delete_document(
+        self,
+        db: str,
+        doc_id: str,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Delete document.
+
+        :param db: database name
+        :param doc_id: document id
+        :param kwargs: request options (rev)
+        """
+
+    @abstractmethod
+    def get_design_document(
+        self,
+        db: str,
+        ddoc: str,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Get design document.
+
+        :param db: database name
+        :param ddoc: design document name
+        :param kwargs: request options
+        """
+
+    @abstractmethod
+    def put_design_document(
+        self,
+        db: str,
+        ddoc: str,
+        design_document: Any,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Create or update design document.
+
+        :param db: database name
+        :param ddoc: design document name
+        :param design_document: design document
+        :param kwargs: request options
+        """
+
+    @abstractmethod
+    def put_attachment(  # noqa: WPS211
+        self,
+        db: str,
+        doc_id: str,
+        attachment_name: str,
+        attachment: Any,
+        content_type: str,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Add attachment to document.
+
+        :param db: database name
+        :param doc_id: document id
+        :param attachment_name: attachment name
+        :param attachment: attachment data (bytes, file or iterator of chunks)
+        :param content_type: attachment content type
+        :param kwargs: request options (rev)
+        """
+
+    @abstractmethod
+    def get_attachment(
+        self,
+        db: str,
+        doc_id: str,
+        attachment_name: str,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Get attachment data.
+
+        :param db: database name
+        :param doc_id: document id
+        :param attachment_name: attachment name
+        :param kwargs: request options (stream)
+        """
+
+    @abstractmethod
+    def post_bulk_docs(
+        self,
+        db: str,
+        bulk_docs: Any,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Write many documents.
+
+        :param db: database name
+        :param bulk_docs: documents
+        :param kwargs: request options
+        """
+
+    @abstractmethod
+    def post_all_docs(self, db: str, **kwargs: Any) -> DetailedResponse:
+        """Documents by ids.
+
+        :param db: database name
+        :param kwargs: request options (keys, include_docs, attachments)
+        """
+
+    @abstractmethod
+    def post_find(
+        self,
+        db: str,
+        selector: Dict[str, Any],
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Documents matched by selector.
+
+        :param db: database name
+        :param selector: conditions by field
+        :param kwargs: request options (fields, limit)
+        """
+
+    @abstractmethod
+    def post_view(
+        self,
+        db: str,
+        ddoc: str,
+        view: str,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Rows of view.
+
+        :param db: database name
+        :param ddoc: design document name
+        :param view: view name
+        :param kwargs: request options (group_level, reduce, update)
+        """
+
+    @abstractmethod
+    def put_update(  # noqa: WPS211
+        self,
+        db: str,
+        ddoc: str,
+        function: str,
+        doc_id: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> DetailedResponse:
+        """Run update function of design document on document.
+
+        :param db: database name
+        :param ddoc: design document name
+        :param function: update function name
+        :param doc_id: document id
+        :param params: query of update request
+        """
+
+    @abstractmethod
+    def post_compact(self, db: str) -> DetailedResponse:
+        """Compact database (free space of deleted documents).
+
+        :param db: database name
+        """
@@ -0,0 +1,79 @@
+"""Remote CouchDB/Cloudant backend (CloudantV1 with storage interface)."""
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote
+
+from ibm_cloud_sdk_core import DetailedResponse
+from ibmcloudant import CloudantV1
+from requests.adapters import HTTPAdapter
+
+from tachyon.db.backends.base import StorageClient
+
+
+class CloudantStorage(CloudantV1, StorageClient):
+    """CloudantV1 with requests of database API which it doesn't cover."""
+
+    def set_pool_size(self, pool_size: int) -> None:
+        """Keep up to pool size http connections alive.
+
+        :param pool_size: max quantity of concurrent calls
+        """
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session = self.get_http_client()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    def close(self) -> None:
+        """Close pooled http connections."""
+        self.get_http_client().close()
+
+    def put_update(  # noqa: WPS211
+        self,
+        db: str,
+        ddoc: str,
+        function: str,
+        doc_id: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> DetailedResponse:
+        """Run update function of design document on document.
+
+        :param db: database name
+        :param ddoc: design document name
+        :param function: update function name
+        :param doc_id: document id
+        :param params: query of update request
+        :return: response of update function
+        """
+        return self._send(
+            "PUT",
+            (db, "_design", ddoc, "_update", function, doc_id),
+            params=params,
+        )
+
+    def post_compact(self, db: str) -> DetailedResponse:
+        """Compact database (free space of deleted documents).
+
+        :param db: database name
+        :return: response
+        """
+        return self._send(
+            "POST",
+            (db, "_compact"),
+            headers={"Content-Type": "application/json"},
+        )
+
+    def _send(
+        self,
+        method: str,
+        path: Tuple[str, ...],
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        headers = {"Accept": "application/json", **kwargs.pop("headers", {})}
+
+        request = self.prepare_request(
+            method=method,
+            url="/{0}".format("/".join(quote(part, safe="") for part in path)),
+            headers=headers,
+            **kwargs,
+        )
+
+        return self.send(request)
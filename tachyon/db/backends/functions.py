@@ -0,0 +1,97 @@
+"""Python counterparts of design documents functions for local backends.
+
+Javascript of design documents isn't run by local backends, so update
+functions are served by python functions registered here with
+``update_function`` and views by SQL expressions over JSON body of document
+registered with ``view`` (see ``tachyon.db.backends.notes``).
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Document = Dict[str, Any]
+# document (none if it doesn't exist) and request (query) ->
+# document to write (or none) and response
+UpdateFunction = Callable[
+    [Optional[Document], Dict[str, Any]],
+    Tuple[Optional[Document], Dict[str, Any]],
+]
+# SQL condition of emit and SQL expressions of emitted key items (JSON values)
+View = Tuple[str, Tuple[str, ...]]
+
+# counterparts of design documents functions by design document and name
+_update_functions: Dict[Tuple[str, str], UpdateFunction] = {}
+_views: Dict[Tuple[str, str], View] = {}
+
+
+def update_function(
+    ddoc: str,
+    name: str,
+) -> Callable[[UpdateFunction], UpdateFunction]:
+    """Register python counterpart of update function of design document.
+
+    Function gets document and request with ``query`` and returns document
+    to write (or none) and response with optional ``code`` and ``json``,
+    as update function does.
+
+    :param ddoc: design document name
+    :param name: update function name
+    :return: decorator
+    """
+
+    def decorator(func: UpdateFunction) -> UpdateFunction:  # noqa: WPS430
+        _update_functions[ddoc, name] = func
+
+        return func
+
+    return decorator
+
+
+def view(ddoc: str, name: str, condition: str, key: Tuple[str, ...]) -> None:
+    """Register SQL counterpart of map function of design document view.
+
+    Map function emits one key (array) for every document matched by
+    condition, ``_count`` reduce of rows is grouped by SQL.
+
+    :param ddoc: design document name
+    :param name: view name
+    :param condition: SQL condition of emit
+    :param key: SQL expressions of key items
+    """
+    _views[ddoc, name] = (condition, key)
+
+
+def truthy(field: str) -> str:
+    """SQL condition of truthy document field (as in javascript).
+
+    :param field: field name
+    :return: SQL condition
+    """
+    return "COALESCE(json_extract(body, '$.{0}'), 0) NOT IN (0, '')".format(field)
+
+
+def json_boolean(condition: str) -> str:
+    """SQL JSON boolean of condition (for key items).
+
+    :param condition: SQL condition
+    :return: SQL expression
+    """
+    return "json(CASE WHEN {0} THEN 'true' ELSE 'false' END)".format(condition)
+
+
+def get_update_function(ddoc: str, name: str) -> Optional[UpdateFunction]:
+    """Registered counterpart of update function.
+
+    :param ddoc: design document name
+    :param name: update function name
+    :return: function or none if it isn't registered
+    """
+    return _update_functions.get((ddoc, name))
+
+
+def get_view(ddoc: str, name: str) -> Optional[View]:
+    """Registered counterpart of map function of view.
+
+    :param ddoc: design document name
+    :param name: view name
+    :return: condition and key expressions or none if view isn't registered
+    """
+    return _views.get((ddoc, name))
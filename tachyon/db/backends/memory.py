@@ -0,0 +1,41 @@
+"""In-memory backend for tests and benchmarks without CouchDB."""
+import functools
+import time
+from typing import Any, Callable
+
+from tachyon.db.backends.sqlite import SQLiteCloudant
+
+# methods without database request
+LOCAL_METHODS = ("set_pool_size", "close")
+
+
+class MemoryCloudant(SQLiteCloudant):
+    """In-memory sqlite database with simulated network latency.
+
+    Every database request waits ``latency`` seconds before it's served
+    (outside of database lock, as concurrent requests to remote database).
+    """
+
+    # every call waits for simulated network
+    max_concurrency = None
+
+    def __init__(self, latency: float = 0) -> None:
+        super().__init__(":memory:")
+
+        self.latency = latency
+
+
+def _with_latency(method: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(method)
+    def wrapper(self: MemoryCloudant, *args: Any, **kwargs: Any) -> Any:  # noqa: WPS430
+        if self.latency:
+            time.sleep(self.latency)
+
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+for _name, _method in list(vars(SQLiteCloudant).items()):  # noqa: WPS327
+    if callable(_method) and not _name.startswith("_") and _name not in LOCAL_METHODS:
+        setattr(MemoryCloudant, _name, _with_latency(_method))
@@ -0,0 +1,70 @@
+"""Python counterparts of ``notes`` design document of NoteDAO.
+
+They mirror javascript functions of ``tachyon.db.dao.note_dao`` (keep them
+in sync), which are run by CouchDB/Cloudant.
+"""
+from http import HTTPStatus
+from typing import Any, Dict, Optional, Tuple
+
+from tachyon.db.backends.functions import (
+    Document,
+    json_boolean,
+    truthy,
+    update_function,
+    view,
+)
+
+
+@update_function("notes", "visit")
+def visit_document(
+    document: Optional[Document],
+    request: Dict[str, Any],
+) -> Tuple[Optional[Document], Dict[str, Any]]:
+    """Counterpart of VISIT_UPDATE_FUNCTION.
+
+    :param document: note document
+    :param request: request with query
+    :return: document to write and response
+    """
+    not_found = {"code": HTTPStatus.NOT_FOUND, "json": {"error": "not_found"}}
+
+    if document is None:
+        return None, not_found
+
+    max_visits = document.get("max_number_visits") or 0
+    visits = document.get("current_number_visits") or 0
+    granted = int(request["query"].get("visits", "1"))
+
+    if max_visits:
+        granted = min(granted, max_visits - visits)
+
+    if granted <= 0:
+        return None, not_found
+
+    visits += granted
+    deleted = bool(max_visits and visits >= max_visits)
+
+    if deleted:
+        document = {"_id": document["_id"], "_rev": document["_rev"], "_deleted": True}
+    else:
+        document = {**document, "current_number_visits": visits}
+
+    return document, {
+        "json": {
+            "current_number_visits": visits,
+            "granted": granted,
+            "deleted": deleted,
+        },
+    }
+
+
+# counterpart of STAT_MAP_FUNCTION
+view(
+    "notes",
+    "stat",
+    condition="{0} AND NOT {1}".format(truthy("sign"), truthy("is_uploading")),
+    key=(
+        json_boolean(truthy("is_encrypted")),
+        json_boolean(truthy("max_number_visits")),
+    ),
+)
@@ -0,0 +1,1078 @@
+"""Local sqlite backend with document API of CloudantV1.
+
+Documents are stored as JSON rows with revisions and tombstones as in
+CouchDB, so DAO works with both backends unchanged. Javascript of design
+documents isn't run: update functions are served by their python
+counterparts and views by SQL counterparts (see
+``tachyon.db.backends.functions``).
+"""
+import base64
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from http import HTTPStatus
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+from ibm_cloud_sdk_core import ApiException, DetailedResponse
+
+from tachyon.db.backends import notes  # noqa: F401 (registers functions of notes)
+from tachyon.db.backends.base import StorageClient
+from tachyon.db.backends.functions import Document, get_update_function, get_view
+
+# cloudant default of _find limit
+FIND_LIMIT = 25
+# bytes of attachment chunk read from file-like attachment
+ATTACHMENT_CHUNK_SIZE = 64 * 1024
+
+FIELD_NAME = re.compile(r"^\w+$")
+
+SELECTOR_OPERATORS = {"$eq": "=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS databases (name TEXT PRIMARY KEY)",
+    """
+    CREATE TABLE IF NOT EXISTS documents (
+        db TEXT NOT NULL,
+        id TEXT NOT NULL,
+        rev TEXT NOT NULL,
+        deleted INTEGER NOT NULL,
+        body TEXT NOT NULL,
+        PRIMARY KEY (db, id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS attachments (
+        db TEXT NOT NULL,
+        id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        content_type TEXT NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (db, id, name, seq)
+    )
+    """,
+    # chunks of attachments being uploaded (private to connection)
+    """
+    CREATE TEMP TABLE IF NOT EXISTS uploads (
+        upload TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (upload, seq)
+    )
+    """,
+)
+
+
+def _error(code: int, error: str) -> ApiException:
+    return ApiException(code, message=error)
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    # models of cloudant sdk or plain dicts
+    return value.to_dict() if hasattr(value, "to_dict") else dict(value)
+
+
+def _field_expression(field: str) -> str:
+    if field == "_id":
+        return "id"
+
+    if not FIELD_NAME.match(field):
+        raise _error(HTTPStatus.BAD_REQUEST, "invalid_field")
+
+    return "json_extract(body, '$.{0}')".format(field)
+
+
+def _quote(identifier: str) -> str:
+    return '"{0}"'.format(identifier.replace('"', '""'))
+
+
+def _binary_response(data: bytes, content_type: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = HTTPStatus.OK
+    response.headers["Content-Type"] = content_type
+    # body is already read (iter_content slices it)
+    response._content = data  # noqa: WPS437
+    response._content_consumed = True  # noqa: WPS437
+
+    return response
+
+
+def _iter_chunks(attachment: Any) -> Iterator[bytes]:
+    # bytes, file or iterator of chunks
+    if isinstance(attachment, bytes):
+        yield attachment
+    elif hasattr(attachment, "read"):
+        yield from iter(lambda: attachment.read(ATTACHMENT_CHUNK_SIZE), b"")
+    else:
+        yield from attachment
+
+
+class _AttachmentReader:
+    """File-like reader of attachment chunks from snapshot of database.
+
+    Connection is owned by reader: read transaction keeps attachment
+    readable while document is deleted, connection is closed when attachment
+    is read or reader is closed.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, cursor: sqlite3.Cursor) -> None:
+        self._connection = connection
+        self._cursor: Optional[sqlite3.Cursor] = cursor
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes (all left if size is negative).
+
+        :param size: max bytes
+        :return: bytes, empty at the end
+        """
+        while self._cursor is not None and (size < 0 or len(self._buffer) < size):
+            row = self._cursor.fetchone()
+
+            if row is None:
+                self.close()
+            else:
+                self._buffer += row[0]
+
+        if size < 0:
+            size = len(self._buffer)
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+
+        return data
+
+    def close(self) -> None:
+        """End read transaction and close connection."""
+        if self._cursor is not None:
+            self._cursor = None
+            self._connection.execute("ROLLBACK")
+            self._connection.close()
+
+
+class SQLiteCloudant(StorageClient):  # noqa: WPS214
+    """Sync client of local sqlite database (methods of CloudantV1 used by DAO).
+
+    One connection (WAL journal) is shared by threads of async client, so
+    calls are serialized, every call takes microseconds without network.
+    """
+
+    # threads are held by streamed attachments, other calls are serialized
+    max_concurrency: Optional[int] = 16
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._connection = sqlite3.connect(
+            path,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._lock = threading.RLock()
+
+        # auto vacuum is set before tables of new database are created
+        self._connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+
+        for statement in SCHEMA:
+            self._connection.execute(statement)
+
+    def get_server_information(self, **kwargs: Any) -> DetailedResponse:
+        """Server information.
+
+        :param kwargs: unused request options
+        :return: response
+        """
+        return DetailedResponse(
+            response={
+                "couchdb": "Welcome",
+                "version": sqlite3.sqlite_version,
+                "vendor": {"name": "sqlite"},
+            },
+            status_code=HTTPStatus.OK,
+        )
+
+    def put_database(self, db: str, **kwargs: Any) -> DetailedResponse:
+        """Create database.
+
+        :param db: database name
+        :param kwargs: unused request options
+        :return: response
+        :raises ApiException: if database exists (412)
+        """
+        with self._transaction() as connection:
+            try:
+                connection.execute("INSERT INTO databases VALUES (?)", (db,))
+            except sqlite3.IntegrityError:
+                raise _error(HTTPStatus.PRECONDITION_FAILED, "file_exists")
+
+        return DetailedResponse(response={"ok": True}, status_code=HTTPStatus.CREATED)
+
+    def delete_database(self, db: str, **kwargs: Any) -> DetailedResponse:
+        """Delete database with its documents and indexes.
+
+        :param db: database name
+        :param kwargs: unused request options
+        :return: response
+        """
+        with self._transaction() as connection:
+            self._check_database(db)
+
+            indexes = connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' "
+                + "AND substr(name, 1, ?) = ?",
+                (len(db) + 1, "{0}/".format(db)),
+            ).fetchall()
+
+            for (index,) in indexes:
+                connection.execute("DROP INDEX {0}".format(_quote(index)))
+
+            for table in ("databases", "documents", "attachments"):
+                connection.execute(
+                    "DELETE FROM {0} WHERE {1} = ?".format(
+                        table,
+                        "name" if table == "databases" else "db",
+                    ),
+                    (db,),
+                )
+
+        return DetailedResponse(response={"ok": True}, status_code=HTTPStatus.OK)
+
+    def get_database_information(self, db: str, **kwargs: Any) -> DetailedResponse:
+        """Database information with documents counts.
+
+        :param db: database name
+        :param kwargs: unused request options
+        :return: response
+        """
+        with self._lock:
+            self._check_database(db)
+
+            total, deleted = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(deleted), 0) FROM documents "
+                + "WHERE db = ?",
+                (db,),
+            ).fetchone()
+
+        return DetailedResponse(
+            response={
+                "db_name": db,
+                "doc_count": total - deleted,
+                "doc_del_count": deleted,
+            },
+            status_code=HTTPStatus.OK,
+        )
+
+    def post_index(
+        self,
+        db: str,
+        index: Any,
+        name: str,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Create index of document fields (for selector queries).
+
+        :param db: database name
+        :param index: index definition
+        :param name: index name
+        :param kwargs: unused request options (type of index)
+        :return: response
+        """
+        fields = [
+            next(iter(field)) if isinstance(field, dict) else field
+            for field in _as_dict(index)["fields"]
+        ]
+        expressions = ", ".join(_field_expression(field) for field in fields)
+
+        with self._transaction() as connection:
+            self._check_database(db)
+
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS {0} ON documents (db, {1})".format(
+                    _quote("{0}/{1}".format(db, name)),
+                    expressions,
+                ),
+            )
+
+        return DetailedResponse(
+            response={"result": "created", "name": name},
+            status_code=HTTPStatus.OK,
+        )
+
+    def get_document(
+        self,
+        db: str,
+        doc_id: str,
+        attachments: bool = False,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Get document.
+
+        :param db: database name
+        :param doc_id: document id
+        :param attachments: include attachments data (otherwise stubs)
+        :param kwargs: unused request options
+        :return: response with document
+        :raises ApiException: if document not found (404)
+        """
+        return DetailedResponse(
+            response=self._get_document(db, doc_id, attachments),
+            status_code=HTTPStatus.OK,
+        )
+
+    def put_document(
+        self,
+        db: str,
+        doc_id: str,
+        document: Any,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Create or update document.
+
+        :param db: database name
+        :param doc_id: document id
+        :param document: document (with revision for update)
+        :param kwargs: unused request options
+        :return: response with new revision
+        """
+        return DetailedResponse(
+            response={
+                "ok": True,
+                "id": doc_id,
+                "rev": self._put_document(db, doc_id, _as_dict(document)),
+            },
+            status_code=HTTPStatus.CREATED,
+        )
+
+    def delete_document(
+        self,
+        db: str,
+        doc_id: str,
+        rev: Optional[str] = None,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Delete document (replace it with tombstone).
+
+        :param db: database name
+        :param doc_id: document id
+        :param rev: current revision of document
+        :param kwargs: unused request options
+        :return: response with revision of tombstone
+        :raises ApiException: if document not found (404)
+        """
+        with self._transaction():
+            self._check_database(db)
+
+            row = self._row(db, doc_id)
+
+            if not row or row[1]:
+                raise _error(HTTPStatus.NOT_FOUND, "not_found")
+
+            new_rev = self._write(db, doc_id, {"_rev": rev, "_deleted": True})
+
+        return DetailedResponse(
+            response={"ok": True, "id": doc_id, "rev": new_rev},
+            status_code=HTTPStatus.OK,
+        )
+
+    def get_design_document(
+        self, db: str, ddoc: str, **kwargs: Any
+    ) -> DetailedResponse:
+        """Get design document.
+
+        :param db: database name
+        :param ddoc: design document name
+        :param kwargs: unused request options
+        :return: response with design document
+        """
+        return DetailedResponse(
+            response=self._get_document(db, "_design/{0}".format(ddoc)),
+            status_code=HTTPStatus.OK,
+        )
+
+    def put_design_document(
+        self,
+        db: str,
+        ddoc: str,
+        design_document: Any,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Create or update design document.
+
+        :param db: database name
+        :param ddoc: design document name
+        :param design_document: design document
+        :param kwargs: unused request options
+        :return: response with new revision
+        """
+        doc_id = "_design/{0}".format(ddoc)
+
+        return DetailedResponse(
+            response={
+                "ok": True,
+                "id": doc_id,
+                "rev": self._put_document(db, doc_id, _as_dict(design_document)),
+            },
+            status_code=HTTPStatus.CREATED,
+        )
+
+    def put_attachment(  # noqa: WPS211
+        self,
+        db: str,
+        doc_id: str,
+        attachment_name: str,
+        attachment: Any,
+        content_type: str,
+        rev: Optional[str] = None,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Add attachment to document (document is created if it doesn't exist).
+
+        :param db: database name
+        :param doc_id: document id
+        :param attachment_name: attachment name
+        :param attachment: attachment data (bytes, file or iterator of chunks)
+        :param content_type: attachment content type
+        :param rev: current revision of document
+        :param kwargs: unused request options
+        :return: response with new revision
+        """
+        upload = uuid.uuid4().hex
+
+        try:
+            # chunks may come from network, so they are staged one by one
+            # (without lock over upload) and moved to attachment in transaction
+            self._stage_upload(upload, _iter_chunks(attachment))
+
+            with self._transaction():
+                self._check_database(db)
+
+                row = self._row(db, doc_id)
+                document = (
+                    self._document(db, doc_id, row[0], row[2], attachments=False)
+                    if row and not row[1]
+                    else {}
+                )
+                document["_rev"] = rev
+                document.setdefault("_attachments", {})[attachment_name] = {
+                    "content_type": content_type,
+                    "upload": upload,
+                }
+
+                new_rev = self._write(db, doc_id, document)
+        finally:
+            with self._lock:
+                self._connection.execute(
+                    "DELETE FROM uploads WHERE upload = ?",
+                    (upload,),
+                )
+
+        return DetailedResponse(
+            response={"ok": True, "id": doc_id, "rev": new_rev},
+            status_code=HTTPStatus.CREATED,
+        )
+
+    def get_attachment(
+        self,
+        db: str,
+        doc_id: str,
+        attachment_name: str,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Get attachment data.
+
+        :param db: database name
+        :param doc_id: document id
+        :param attachment_name: attachment name
+        :param kwargs: unused request options (stream)
+        :return: response with http response of attachment data
+        :raises ApiException: if document or attachment not found (404)
+        """
+        if self._path == ":memory:":
+            # data is in memory anyway (and database can't be opened again)
+            with self._lock:
+                content_type = self._check_attachment(
+                    self._connection,
+                    db,
+                    doc_id,
+                    attachment_name,
+                )
+                data = b"".join(
+                    chunk
+                    for (chunk,) in self._attachment_chunks(
+                        self._connection,
+                        db,
+                        doc_id,
+                        attachment_name,
+                    )
+                )
+
+            return DetailedResponse(
+                response=_binary_response(data, content_type),
+                status_code=HTTPStatus.OK,
+            )
+
+        # chunks are read from snapshot by own connection, so stream doesn't
+        # hold lock and isn't cut by deletion of document (as in CouchDB)
+        connection = sqlite3.connect(
+            self._path,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+
+        try:
+            connection.execute("BEGIN")
+            content_type = self._check_attachment(
+                connection,
+                db,
+                doc_id,
+                attachment_name,
+            )
+            cursor = self._attachment_chunks(connection, db, doc_id, attachment_name)
+        except BaseException:
+            connection.close()
+            raise
+
+        response = requests.Response()
+        response.status_code = HTTPStatus.OK
+        response.headers["Content-Type"] = content_type
+        response.raw = _AttachmentReader(connection, cursor)
+
+        return DetailedResponse(response=response, status_code=HTTPStatus.OK)
+
+    def post_bulk_docs(
+        self, db: str, bulk_docs: Any, **kwargs: Any
+    ) -> DetailedResponse:
+        """Write many documents, errors of documents are returned in results.
+
+        :param db: database name
+        :param bulk_docs: documents
+        :param kwargs: unused request options
+        :return: response with result of every document
+        """
+        results: List[Dict[str, Any]] = []
+
+        with self._transaction():
+            self._check_database(db)
+
+            for document in _as_dict(bulk_docs)["docs"]:
+                document = _as_dict(document)
+                doc_id = document.get("_id") or uuid.uuid4().hex
+
+                try:
+                    rev = self._write(db, doc_id, document)
+                except ApiException as exc:
+                    results.append(
+                        {"id": doc_id, "error": exc.message, "reason": exc.message},
+                    )
+                else:
+                    results.append({"ok": True, "id": doc_id, "rev": rev})
+
+        return DetailedResponse(response=results, status_code=HTTPStatus.CREATED)
+
+    def post_all_docs(
+        self,
+        db: str,
+        keys: Optional[Sequence[str]] = None,
+        include_docs: bool = False,
+        attachments: bool = False,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Documents by ids (all documents if ids aren't set).
+
+        :param db: database name
+        :param keys: document ids
+        :param include_docs: include documents in rows
+        :param attachments: include attachments data in documents
+        :param kwargs: unused request options
+        :return: response with row of every document
+        """
+        rows = []
+
+        with self._lock:
+            self._check_database(db)
+
+            if keys is None:
+                found = self._connection.execute(
+                    "SELECT id, rev, deleted, body FROM documents "
+                    + "WHERE db = ? AND deleted = 0 ORDER BY id",
+                    (db,),
+                ).fetchall()
+            else:
+                found = [
+                    (key, *row) if row else (key, None, None, None)
+                    for key, row in ((key, self._row(db, key)) for key in keys)
+                ]
+
+            for doc_id, rev, deleted, body in found:
+                if rev is None:
+                    rows.append({"key": doc_id, "error": "not_found"})
+                    continue
+
+                row: Dict[str, Any] = {
+                    "id": doc_id,
+                    "key": doc_id,
+                    "value": {"rev": rev},
+                }
+
+                if deleted:
+                    row["value"]["deleted"] = True
+                    row["doc"] = None
+                elif include_docs:
+                    row["doc"] = self._document(db, doc_id, rev, body, attachments)
+
+                rows.append(row)
+
+            total = self._connection.execute(
+                "SELECT COUNT(*) FROM documents WHERE db = ? AND deleted = 0",
+                (db,),
+            ).fetchone()[0]
+
+        return DetailedResponse(
+            response={"total_rows": total, "rows": rows},
+            status_code=HTTPStatus.OK,
+        )
+
+    def post_find(
+        self,
+        db: str,
+        selector: Dict[str, Any],
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Documents matched by selector (comparison operators only).
+
+        Fields without value don't match any condition (as in cloudant).
+
+        :param db: database name
+        :param selector: conditions by field
+        :param fields: fields of documents in response
+        :param limit: max quantity of documents
+        :param kwargs: unused request options
+        :return: response with documents
+        :raises ApiException: if selector has unsupported operator (400)
+        """
+        conditions = ["db = ?", "deleted = 0", "id NOT LIKE '\\_design/%' ESCAPE '\\'"]
+        params: List[Any] = [db]
+
+        for field, condition in selector.items():
+            operators = condition if isinstance(condition, dict) else {"$eq": condition}
+
+            for operator, argument in operators.items():
+                if operator not in SELECTOR_OPERATORS:
+                    raise _error(HTTPStatus.BAD_REQUEST, "invalid_operator")
+
+                conditions.append(
+                    "{0} {1} ?".format(
+                        _field_expression(field),
+                        SELECTOR_OPERATORS[operator],
+                    ),
+                )
+                params.append(argument)
+
+        params.append(FIND_LIMIT if limit is None else limit)
+
+        with self._lock:
+            self._check_database(db)
+
+            documents = [
+                self._document(db, doc_id, rev, body, attachments=False)
+                for doc_id, rev, body in self._connection.execute(
+                    "SELECT id, rev, body FROM documents WHERE {0} LIMIT ?".format(
+                        " AND ".join(conditions),
+                    ),
+                    params,
+                )
+            ]
+
+        if fields:
+            documents = [
+                {field: document[field] for field in fields if field in document}
+                for document in documents
+            ]
+
+        return DetailedResponse(
+            response={"docs": documents},
+            status_code=HTTPStatus.OK,
+        )
+
+    def post_view(
+        self,
+        db: str,
+        ddoc: str,
+        view: str,
+        group_level: Optional[int] = None,
+        reduce: bool = True,
+        **kwargs: Any,
+    ) -> DetailedResponse:
+        """Rows of view (keys of registered SQL counterpart, _count reduce).
+
+        :param db: database name
+        :param ddoc: design document name
+        :param view: view name
+        :param group_level: length of keys prefix for grouping
+        :param reduce: reduce rows
+        :param kwargs: unused request options (update)
+        :return: response with rows
+        :raises ApiException: if view or its SQL counterpart not found
+        """
+        design_document = self._get_document(db, "_design/{0}".format(ddoc))
+        view_definition = design_document.get("views", {}).get(view)
+        registered = get_view(ddoc, view)
+
+        if view_definition is None:
+            raise _error(HTTPStatus.NOT_FOUND, "not_found")
+
+        if registered is None or view_definition.get("reduce", "_count") != "_count":
+            raise _error(HTTPStatus.NOT_IMPLEMENTED, "not_implemented")
+
+        condition, key = registered
+        where = (
+            "WHERE db = ? AND deleted = 0 "
+            + "AND id NOT LIKE '\\_design/%' ESCAPE '\\' AND ({0})".format(condition)
+        )
+
+        if reduce and "reduce" in view_definition:
+            # documents are counted by groups of key prefix (one group without it)
+            grouped = key[:group_level] if group_level else ("NULL",)
+            query = (
+                "SELECT json_array({0}), COUNT(*) FROM documents {1} "
+                + "GROUP BY {0} ORDER BY 1"
+            ).format(", ".join(grouped), where)
+        else:
+            query = "SELECT json_array({0}), id FROM documents {1} ORDER BY id".format(
+                ", ".join(key),
+                where,
+            )
+
+        with self._lock:
+            found = self._connection.execute(query, (db,)).fetchall()
+
+        if reduce and "reduce" in view_definition:
+            rows = [
+                {"key": json.loads(row_key) if group_level else None, "value": count}
+                for row_key, count in found
+            ]
+        else:
+            rows = [
+                {"id": doc_id, "key": json.loads(row_key), "value": None}
+                for row_key, doc_id in found
+            ]
+
+        return DetailedResponse(response={"rows": rows}, status_code=HTTPStatus.OK)
+
+    def put_update(  # noqa: WPS211
+        self,
+        db: str,
+        ddoc: str,
+        function: str,
+        doc_id: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> DetailedResponse:
+        """Run python counterpart of update function on document.
+
+        :param db: database name
+        :param ddoc: design document name
+        :param function: update function name
+        :param doc_id: document id
+        :param params: query of update request
+        :return: response of update function
+        :raises ApiException: if update function not found
+        """
+        func = get_update_function(ddoc, function)
+        # query values are strings, as in http request
+        query = {key: str(value) for key, value in (params or {}).items()}
+
+        with self._transaction():
+            self._check_database(db)
+
+            design_row = self._row(db, "_design/{0}".format(ddoc))
+            design_document = (
+                json.loads(design_row[2]) if design_row and not design_row[1] else {}
+            )
+
+            if function not in design_document.get("updates", {}):
+                raise _error(HTTPStatus.NOT_FOUND, "not_found")
+
+            if func is None:
+                raise _error(HTTPStatus.NOT_IMPLEMENTED, "not_implemented")
+
+            row = self._row(db, doc_id)
+            document = (
+                self._document(db, doc_id, row[0], row[2], attachments=False)
+                if row and not row[1]
+                else None
+            )
+
+            new_document, response = func(document, {"query": query})
+            code = response.get("code", HTTPStatus.OK)
+
+            if code >= HTTPStatus.BAD_REQUEST:
+                raise _error(code, response.get("json", {}).get("error", "error"))
+
+            if new_document is not None:
+                self._write(db, doc_id, new_document)
+
+        return DetailedResponse(response=response.get("json"), status_code=code)
+
+    def post_compact(self, db: str) -> DetailedResponse:
+        """Free pages of deleted content and truncate write-ahead log.
+
+        :param db: database name
+        :return: response
+        """
+        with self._lock:
+            self._check_database(db)
+
+            self._connection.execute("PRAGMA incremental_vacuum").fetchall()
+            self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+        return DetailedResponse(response={"ok": True}, status_code=HTTPStatus.ACCEPTED)
+
+    def _get_document(
+        self,
+        db: str,
+        doc_id: str,
+        attachments: bool = False,
+    ) -> Document:
+        with self._lock:
+            self._check_database(db)
+
+            row = self._row(db, doc_id)
+
+            if not row or row[1]:
+                raise _error(HTTPStatus.NOT_FOUND, "not_found")
+
+            return self._document(db, doc_id, row[0], row[2], attachments)
+
+    def _put_document(self, db: str, doc_id: str, document: Document) -> str:
+        with self._transaction():
+            self._check_database(db)
+
+            return self._write(db, doc_id, document)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+            self._connection.execute("COMMIT")
+
+    def _stage_upload(self, upload: str, chunks: Iterator[bytes]) -> None:
+        seq = 0
+
+        for chunk in chunks:
+            if chunk:
+                with self._lock:
+                    self._connection.execute(
+                        "INSERT INTO uploads VALUES (?, ?, ?)",
+                        (upload, seq, bytes(chunk)),
+                    )
+
+                seq += 1
+
+        if not seq:
+            # empty attachment has one empty chunk
+            with self._lock:
+                self._connection.execute(
+                    "INSERT INTO uploads VALUES (?, 0, ?)",
+                    (upload, b""),
+                )
+
+    def _check_attachment(
+        self,
+        connection: sqlite3.Connection,
+        db: str,
+        doc_id: str,
+        attachment_name: str,
+    ) -> str:
+        # content type of attachment of existing document
+        row = connection.execute(
+            "SELECT deleted FROM documents WHERE db = ? AND id = ?",
+            (db, doc_id),
+        ).fetchone()
+        attachment = connection.execute(
+            "SELECT content_type FROM attachments "
+            + "WHERE db = ? AND id = ? AND name = ? AND seq = 0",
+            (db, doc_id, attachment_name),
+        ).fetchone()
+
+        if not row or row[0] or not attachment:
+            raise _error(HTTPStatus.NOT_FOUND, "not_found")
+
+        return attachment[0]
+
+    def _attachment_chunks(
+        self,
+        connection: sqlite3.Connection,
+        db: str,
+        doc_id: str,
+        attachment_name: str,
+    ) -> sqlite3.Cursor:
+        return connection.execute(
+            "SELECT data FROM attachments "
+            + "WHERE db = ? AND id = ? AND name = ? ORDER BY seq",
+            (db, doc_id, attachment_name),
+        )
+
+    def _check_database(self, db: str) -> None:
+        exists = self._connection.execute(
+            "SELECT 1 FROM databases WHERE name = ?",
+            (db,),
+        ).fetchone()
+
+        if not exists:
+            raise _error(HTTPStatus.NOT_FOUND, "not_found")
+
+    def _row(self, db: str, doc_id: str) -> Optional[Tuple[str, int, str]]:
+        return self._connection.execute(
+            "SELECT rev, deleted, body FROM documents WHERE db = ? AND id = ?",
+            (db, doc_id),
+        ).fetchone()
+
+    def _document(
+        self,
+        db: str,
+        doc_id: str,
+        rev: str,
+        body: str,
+        attachments: bool,
+    ) -> Document:
+        document = {"_id": doc_id, "_rev": rev, **json.loads(body)}
+
+        if attachments:
+            chunks: Dict[str, List[bytes]] = {}
+            content_types = {}
+
+            for name, content_type, data in self._connection.execute(
+                "SELECT name, content_type, data FROM attachments "
+                + "WHERE db = ? AND id = ? ORDER BY name, seq",
+                (db, doc_id),
+            ):
+                chunks.setdefault(name, []).append(data)
+                content_types[name] = content_type
+
+            stored = {
+                name: {
+                    "content_type": content_types[name],
+                    "data": base64.b64encode(b"".join(name_chunks)).decode(),
+                }
+                for name, name_chunks in chunks.items()
+            }
+        else:
+            stored = {
+                name: {"content_type": content_type, "length": length, "stub": True}
+                for name, content_type, length in self._connection.execute(
+                    "SELECT name, content_type, SUM(length(data)) FROM attachments "
+                    + "WHERE db = ? AND id = ? GROUP BY name",
+                    (db, doc_id),
+                )
+            }
+
+        if stored:
+            document["_attachments"] = stored
+
+        return document
+
+    def _write(self, db: str, doc_id: str, document: Document) -> str:
+        """Write document revision (in transaction).
+
+        Attachments are replaced by ``_attachments`` of document: stubs keep
+        stored attachments, others are written (data in base64 or bytes, or
+        ``upload`` with staged chunks).
+
+        :param db: database name
+        :param doc_id: document id
+        :param document: document
+        :return: new revision
+        :raises ApiException: on revision conflict (409) or missing stub (412)
+        """
+        row = self._row(db, doc_id)
+        current_rev = row[0] if row else None
+        rev = document.get("_rev")
+
+        # new document (or document over tombstone) is written without revision
+        if (row and not row[1]) or rev:
+            if rev != current_rev:
+                raise _error(HTTPStatus.CONFLICT, "conflict")
+
+        deleted = bool(document.get("_deleted"))
+        attachments = {} if deleted else document.get("_attachments") or {}
+        stubs = [
+            name for name, attachment in attachments.items() if "stub" in attachment
+        ]
+
+        stored = {
+            name
+            for (name,) in self._connection.execute(
+                "SELECT DISTINCT name FROM attachments WHERE db = ? AND id = ?",
+                (db, doc_id),
+            )
+        }
+
+        if not stored.issuperset(stubs):
+            raise _error(HTTPStatus.PRECONDITION_FAILED, "missing_stub")
+
+        for name in stored.difference(stubs):
+            self._connection.execute(
+                "DELETE FROM attachments WHERE db = ? AND id = ? AND name = ?",
+                (db, doc_id, name),
+            )
+
+        for name, attachment in attachments.items():
+            if name in stubs:
+                continue
+
+            if "upload" in attachment:
+                self._connection.execute(
+                    "INSERT INTO attachments SELECT ?, ?, ?, seq, ?, data "
+                    + "FROM uploads WHERE upload = ?",
+                    (
+                        db,
+                        doc_id,
+                        name,
+                        attachment["content_type"],
+                        attachment["upload"],
+                    ),
+                )
+                continue
+
+            data = attachment["data"]
+
+            self._connection.execute(
+                "INSERT INTO attachments VALUES (?, ?, ?, 0, ?, ?)",
+                (
+                    db,
+                    doc_id,
+                    name,
+                    attachment["content_type"],
+                    data if isinstance(data, bytes) else base64.b64decode(data),
+                ),
+            )
+
+        new_rev = "{0}-{1}".format(
+            int(current_rev.split("-")[0]) + 1 if current_rev else 1,
+            uuid.uuid4().hex,
+        )
+        body = (
+            {}
+            if deleted
+            else {key: value for key, value in document.items() if key[0] != "_"}
+        )
+
+        self._connection.execute(
+            "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)",
+            (db, doc_id, new_rev, int(deleted), json.dumps(body)),
+        )
+
+        return new_rev
@@ -0,0 +1,181 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Iterator
+
+import requests
+from ibm_cloud_sdk_core import ApiException, DetailedResponse
+
+from tachyon.db.backends import StorageBackend
+from tachyon.db.backends.base import StorageClient
+from tachyon.db.backends.cloudant import CloudantStorage
+from tachyon.db.backends.memory import MemoryCloudant
+from tachyon.db.backends.sqlite import SQLiteCloudant
+from tachyon.services.metrics import Counter, Histogram
+from tachyon.settings import settings
+
+cloudant_request_seconds = Histogram(
+    "tachyon_cloudant_request_seconds",
+    "Duration of database calls (with waiting for free connection).",
+    labels=("operation",),
+)
+cloudant_errors_total = Counter(
+    "tachyon_cloudant_errors_total",
+    "Database calls finished with error, by http status code.",
+    labels=("operation", "code"),
+)
+
+
+class AsyncCloudantClient:
+    """Asyncio interface for cloudant client.
+
+    Every call of the wrapped storage client method is awaitable and runs in
+    a dedicated thread pool sized to the keep-alive HTTP connection pool, so
+    blocking network I/O never stalls the event loop and a single worker keeps
+    up to ``pool_size`` requests to the database in flight (pool of local
+    backend is capped by its ``max_concurrency``).
+
+    Cloudant SDK has no async transport (authenticators and request models
+    are bound to ``requests``), so calls are threaded instead of native
+    async http. Concurrent calls scale with pool size as with async http,
+    see ``benchmarks.client_pool`` (blocking calls in event loop are serial).
+    """
+
+    def __init__(
+        self,
+        client: StorageClient,
+        pool_size: int,
+    ) -> None:
+        pool_size = min(pool_size, client.max_concurrency or pool_size)
+
+        client.set_pool_size(pool_size)
+
+        self.sync = client
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size,
+            thread_name_prefix="cloudant",
+        )
+
+    @classmethod
+    def new_instance(cls) -> "AsyncCloudantClient":
+        """Create new async cloudant client (of backend from settings).
+
+        :return: async cloudant client
+        """
+        client: StorageClient
+
+        if settings.storage_backend == StorageBackend.sqlite:
+            client = SQLiteCloudant(settings.storage_sqlite_path)
+        elif settings.storage_backend == StorageBackend.memory:
+            client = MemoryCloudant(settings.storage_memory_latency)
+        else:
+            client = CloudantStorage.new_instance(settings.cloudant_service_name)
+
+        return cls(client, pool_size=settings.cloudant_pool_size)
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[DetailedResponse]]:
+        method = getattr(self.sync, name)
+
+        async def method_call(  # noqa: WPS430
+            *args: Any,
+            **kwargs: Any,
+        ) -> DetailedResponse:
+            return await self.call(name, method, *args, **kwargs)
+
+        return method_call
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run blocking function in client thread pool.
+
+        :param func: blocking callable (usually method of sync client)
+        :param args: positional arguments for callable
+        :param kwargs: keyword arguments for callable
+        :return: callable result
+        """
+        loop = asyncio.get_event_loop()
+
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(func, *args, **kwargs),
+        )
+
+    async def call(
+        self,
+        operation: str,
+        func: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Run database call in client thread pool with metrics of operation.
+
+        :param operation: name of operation for metrics
+        :param func: blocking callable of sync client
+        :param args: positional arguments for callable
+        :param kwargs: keyword arguments for callable
+        :return: callable result
+        """
+        started = time.perf_counter()
+
+        try:
+            return await self.run(func, *args, **kwargs)
+        except ApiException as exc:
+            cloudant_errors_total.inc(operation, str(exc.code))
+            raise
+        finally:
+            cloudant_request_seconds.observe(time.perf_counter() - started, operation)
+
+    def sync_iterator(self, chunks: AsyncIterator[bytes]) -> Iterator[bytes]:
+        """Blocking iterator over async chunks (request body for client thread).
+
+        Chunks are pulled from event loop one by one, so stream isn't buffered.
+
+        :param chunks: async iterator of chunks
+        :return: blocking iterator
+        """
+        loop = asyncio.get_event_loop()
+
+        async def next_chunk() -> bytes:  # noqa: WPS430
+            # __anext__ of async iterator is awaitable, not coroutine
+            return await chunks.__anext__()
+
+        def iterate() -> Iterator[bytes]:  # noqa: WPS430
+            while True:  # noqa: WPS457
+                try:
+                    yield asyncio.run_coroutine_threadsafe(
+                        next_chunk(),
+                        loop,
+                    ).result()
+                except StopAsyncIteration:
+                    return
+
+        return iterate()
+
+    async def iter_response(
+        self,
+        response: requests.Response,
+        chunk_size: int,
+    ) -> AsyncGenerator[bytes, None]:
+        """Iterate over streamed response body without blocking event loop.
+
+        :param response: response requested with stream=True
+        :param chunk_size: max size of chunk
+        :yields: body chunks
+        """
+        chunks = response.iter_content(chunk_size=chunk_size)
+
+        try:
+            while True:  # noqa: WPS457
+                chunk = await self.run(next, chunks, None)
+
+                if chunk is None:
+                    return
+
+                yield chunk
+        finally:
+            response.close()
+
+    def close(self) -> None:
+        """Release thread pool and pooled connections."""
+        self._executor.shutdown(wait=False)
+        self.sync.close()
@@ -1,46 +1,201 @@
+import asyncio
+import threading
+import time
 from abc import ABC
 from http import HTTPStatus
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 from ibm_cloud_sdk_core import ApiException
-from ibmcloudant import CloudantV1
+from ibmcloudant.cloudant_v1 import IndexDefinition, IndexField
 
-from tachyon.settings import settings
+from tachyon.db.client import AsyncCloudantClient
+from tachyon.exceptions.dao.base import DAOUnavailableError
 
 
 class BaseDAO(ABC):
     """Base abstract-class for DAO."""
 
     _base_name: str = ""
-    _client_instance: Optional[CloudantV1] = None
+    # fields for json indexes (for selector queries)
+    _indexes: Tuple[str, ...] = ()
+    # design documents by name (views, update functions)
+    _design_documents: Dict[str, Dict[str, Any]] = {}
+    _client_instance: Optional[AsyncCloudantClient] = None
+    # creation of client (and database population) by one executor thread
+    # at once, lock is never taken by event loop
+    _client_lock = threading.Lock()
+    # background connection after failed access is in progress
+    _connecting = False
 
     @staticmethod
-    def _create_client() -> CloudantV1:
+    def _create_client() -> AsyncCloudantClient:
         """Create new cloudant client to service.
 
-        :return: cloudant client
+        :return: async cloudant client
         """
-        return CloudantV1.new_instance(settings.cloudant_service_name)
+        return AsyncCloudantClient.new_instance()
+
+    @classmethod
+    def close_client(cls) -> None:
+        """Close shared cloudant client of DAO class (if it was created)."""
+        if cls._client_instance:
+            cls._client_instance.close()
+            cls._client_instance = None
+
+    async def warm_up(self, connections: int) -> None:
+        """Create client, populate database and open pooled connections.
+
+        Connections are opened by concurrent requests, so they stay in pool
+        for first requests of worker.
+
+        :param connections: quantity of connections to open
+        """
+        client = await self.connect()
+
+        await asyncio.gather(
+            *(client.get_server_information() for _ in range(connections)),
+        )
+
+    async def ping(self) -> float:
+        """Check database of DAO is reachable (and populated).
+
+        :return: latency of request in seconds
+        """
+        # database population (if it failed before) is retried
+        client = await self.connect()
+
+        started = time.perf_counter()
+
+        await client.get_database_information(db=self._base_name)
+
+        return time.perf_counter() - started
+
+    async def connect(self) -> AsyncCloudantClient:
+        """Get client or create it and populate database (in executor thread).
+
+        :return: async cloudant client
+        """
+        client = self._client_instance
+
+        if client:
+            return client
+
+        return await asyncio.get_event_loop().run_in_executor(None, self._connect)
+
+    def _connect(self) -> AsyncCloudantClient:
+        """Create client and populate database with blocking calls.
+
+        Client (and its connection pool) is shared by all instances of DAO class.
+        Client is shared only after database is populated, so if database is
+        unavailable, population is retried by next connection.
+
+        :return: async cloudant client
+        """
+        with self._client_lock:
+            client = self._client_instance
+
+            if not client:
+                client = self._create_client()
+
+                try:
+                    self._populate_db(client)
+                except Exception:
+                    client.close()
+                    raise
+
+                type(self)._client_instance = client  # noqa: WPS601
+
+        return client
+
+    def _connect_in_background(self) -> None:
+        cls = type(self)
+
+        if cls._connecting:
+            return
+
+        cls._connecting = True  # noqa: WPS601
+
+        def connected(
+            future: "asyncio.Future[AsyncCloudantClient]",
+        ) -> None:  # noqa: WPS430
+            cls._connecting = False  # noqa: WPS601
+            # error is reported by readiness check (see ping)
+            future.exception()
+
+        asyncio.get_event_loop().run_in_executor(
+            None,
+            self._connect,
+        ).add_done_callback(connected)
 
     def _delete_db(self) -> None:
-        self._client.delete_database(self._base_name)
+        self._connect().sync.delete_database(self._base_name)
 
-    def _populate_db(self) -> None:
+    def _populate_db(self, client: AsyncCloudantClient) -> None:
         try:
-            self._client.put_database(self._base_name)
+            client.sync.put_database(self._base_name)
         except ApiException as exc:
             if exc.code != HTTPStatus.PRECONDITION_FAILED:
                 raise
 
+        for field in self._indexes:
+            client.sync.post_index(
+                db=self._base_name,
+                index=IndexDefinition(fields=[IndexField(**{field: "asc"})]),
+                name="{0}-index".format(field),
+                type="json",
+            )
+
+        for ddoc, design_document in self._design_documents.items():
+            self._populate_design_document(client, ddoc, design_document)
+
+    def _populate_design_document(
+        self,
+        client: AsyncCloudantClient,
+        ddoc: str,
+        design_document: Dict[str, Any],
+    ) -> None:
+        try:
+            current = client.sync.get_design_document(
+                db=self._base_name,
+                ddoc=ddoc,
+            ).get_result()
+        except ApiException as exc:
+            if exc.code != HTTPStatus.NOT_FOUND:
+                raise
+
+            current = {}
+
+        if any(current.get(key) != value for key, value in design_document.items()):
+            design_document = {"_id": "_design/{0}".format(ddoc), **design_document}
+
+            if current:
+                design_document["_rev"] = current["_rev"]
+
+            client.sync.put_design_document(
+                db=self._base_name,
+                ddoc=ddoc,
+                design_document=design_document,
+            )
+
     @property
-    def _client(self) -> CloudantV1:
-        """Get or create cloudant client property.
+    def _client(self) -> AsyncCloudantClient:
+        """Get connected cloudant client property.
 
-        :return: cloudant client
+        Client is created by ``connect`` (on startup or readiness check), so
+        access without it fails fast (database is connected in background)
+        instead of blocking event loop.
+
+        :return: async cloudant client
+        :raises DAOUnavailableError: if database isn't connected yet
         """
-        if not self._client_instance:
-            self._client_instance = self._create_client()  # noqa: WPS601
+        client = self._client_instance
+
+        if client is None:
+            self._connect_in_background()
 
-            self._populate_db()
+            raise DAOUnavailableError(
+                message="Database is unavailable, try again later.",
+                http_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            )
 
-        return self._client_instance
+        return client
@@ -1,31 +1,167 @@
+import asyncio
+import random
 import re
 import secrets
+import time
+from collections import Counter
 from http import HTTPStatus
-from typing import Optional, Tuple
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import nacl.exceptions
-import nacl.pwhash
-from ibmcloudant.cloudant_v1 import Document
+from ibm_cloud_sdk_core import ApiException, DetailedResponse
+from ibmcloudant.cloudant_v1 import BulkDocs
 
 from tachyon.db.dao.base_dao import BaseDAO
-from tachyon.db.models.note_model import NoteContentType, NoteModel
+from tachyon.db.models.note_model import BODY_ATTACHMENT, NoteContentType, NoteModel
+from tachyon.exceptions.base import BaseTachyonException
 from tachyon.exceptions.dao.note import (
     NoteDAOEncryptPasswordError,
     NoteDAOException,
     NoteDAONotFound,
     NoteDAOSignError,
+    NoteDAOSizeError,
 )
+from tachyon.services.cache import LRUCache
 from tachyon.services.ciphers.chacha20poly1305 import ChaCha20Poly1305
+from tachyon.services.compression import (
+    compress_async,
+    decompress_async,
+    decompress_stream,
+)
+from tachyon.services.counters import RateCounter
+from tachyon.services.metrics import Histogram
+from tachyon.services.password import password_check
 from tachyon.settings import settings
 
+# bytes of cached note besides its message (note model and cache entry)
+CACHE_ENTRY_OVERHEAD = 1536
+
+# Counts visits (query parameter, default 1) atomically on database side:
+# grants visits left by limit, increments visits and replaces note with bare
+# tombstone (without content) on last allowed visit.
+VISIT_UPDATE_FUNCTION = """
+function (doc, req) {
+  var notFound = {code: 404, json: {error: "not_found"}};
+
+  if (!doc) {
+    return [null, notFound];
+  }
+
+  var maxVisits = doc.max_number_visits || 0;
+  var visits = doc.current_number_visits || 0;
+  var granted = parseInt(req.query.visits || "1", 10);
+
+  if (maxVisits) {
+    granted = Math.min(granted, maxVisits - visits);
+  }
+
+  if (granted <= 0) {
+    return [null, notFound];
+  }
+
+  visits += granted;
+
+  var deleted = Boolean(maxVisits && visits >= maxVisits);
+
+  if (deleted) {
+    doc = {_id: doc._id, _rev: doc._rev, _deleted: true};
+  } else {
+    doc.current_number_visits = visits;
+  }
+
+  return [
+    doc,
+    {json: {current_number_visits: visits, granted: granted, deleted: deleted}},
+  ];
+}
+"""
+
+# Counts notes by encryption and visits limit (queried with group_level=2).
+STAT_MAP_FUNCTION = """
+function (doc) {
+  if (doc.sign && !doc.is_uploading) {
+    emit([Boolean(doc.is_encrypted), Boolean(doc.max_number_visits)], null);
+  }
+}
+"""
+# counterparts of these functions for local backends (keep them in sync)
+# are in tachyon.db.backends.notes
+
+note_stage_seconds = Histogram(
+    "tachyon_note_stage_seconds",
+    "Duration of note processing stages (kdf, encrypt, encode, sign, etc.).",
+    labels=("stage",),
+)
+
+
+async def _iter_content(content: bytes) -> AsyncIterator[bytes]:
+    yield content
+
+
+class _VisitBatch:
+    """Visits of note waiting for one combined write."""
+
+    __slots__ = ("visits", "result")
+
+    def __init__(self) -> None:
+        self.visits = 0
+        # current visits of note and visits granted to batch
+        self.result: "asyncio.Future[Tuple[int, int]]" = (
+            asyncio.get_event_loop().create_future()
+        )
+
 
 class NoteDAO(BaseDAO):
     """Class for accessing note table."""
 
     SIGN_LENGTH = 43
     SIGN_BYTES_LENGTH = 32
+    # seconds, multiplied by attempt number
+    VISIT_RETRY_DELAY = 0.005
+    # documents per _all_docs/_bulk_docs request
+    BULK_BATCH_SIZE = 500
 
     _base_name = settings.notes_base
+    _indexes = ("sign", "expires_at")
+    _design_documents = {
+        "notes": {
+            "updates": {"visit": VISIT_UPDATE_FUNCTION},
+            "views": {"stat": {"map": STAT_MAP_FUNCTION, "reduce": "_count"}},
+        },
+    }
+    # counts of notes from stat view (shared by worker)
+    _stat_cache: LRUCache[Dict[str, int]] = LRUCache(
+        max_size=1,
+        ttl=settings.notes_stat_cache_ttl,
+    )
+    # notes events of worker in last minute
+    _created = RateCounter()
+    _read = RateCounter()
+    _deleted = RateCounter()
+    # time of last database compaction by sweeper (shared by worker)
+    _compacted_at: Optional[float] = None
+    # visits of unlimited notes waiting for flush (shared by worker)
+    _buffered_visits: "Counter[str]" = Counter()
+    # in-flight document fetches by sign and attachments flag (shared by worker)
+    _fetches: Dict[Tuple[str, bool], "asyncio.Future[DetailedResponse]"] = {}
+    # visits waiting for write and locks of visit writes by sign (shared by worker)
+    _visit_batches: Dict[str, _VisitBatch] = {}
+    _visit_locks: Dict[str, asyncio.Lock] = {}
+    # decoded unlimited unencrypted notes by sign (shared by worker)
+    _cache: LRUCache[Tuple[NoteModel, str]] = LRUCache(
+        max_size=settings.notes_cache_size,
+        ttl=settings.notes_cache_ttl,
+    )
 
     async def create(
         self,
@@ -35,6 +171,7 @@ class NoteDAO(BaseDAO):
         max_number_visits: int = 0,
         is_encrypted: bool = False,
         encrypt_password: Optional[str] = None,
+        ttl: Optional[int] = None,
     ) -> str:
         """Create note.
 
@@ -44,144 +181,1132 @@ class NoteDAO(BaseDAO):
         :param max_number_visits: max visits for this note, min=0
         :param is_encrypted: note encryption switch-parameter
         :param encrypt_password: if is_encrypted - password for note cipher
+        :param ttl: seconds of note lifetime, default from settings
         :return: note sign
-        :raises NoteDAOException: raise for encryption data error (password is none)
         """
-        note_creation_params = {
-            "name": name,
-            "content_type": content_type,
-            "max_number_visits": max_number_visits,
-            "is_encrypted": is_encrypted,
-        }
+        note = await self._build_note(
+            name=name,
+            text=text,
+            content_type=content_type,
+            max_number_visits=max_number_visits,
+            is_encrypted=is_encrypted,
+            encrypt_password=encrypt_password,
+            ttl=ttl,
+        )
 
-        note = NoteModel(**note_creation_params)
+        with note_stage_seconds.time("encode"):
+            document = note.to_document()
 
-        note.set_text(text.encode())
+        sign, _ = await self._insert(document)
 
-        if is_encrypted:
-            if not encrypt_password:
-                raise NoteDAOException(
-                    "Param is_encrypted for note set to true, "
-                    "but encrypt_password isn't set.",
-                )
+        self._created.add()
 
-            cipher = ChaCha20Poly1305(encrypt_password)
+        return sign
 
-            note.encrypt_password_hash = self._password_hash(encrypt_password)
-            note.set_text(cipher.encrypt(text))
-            note.set_encrypt_metadata(cipher.metadata)
+    async def create_bulk(
+        self,
+        notes: Sequence[Dict[str, Any]],
+    ) -> List[Union[str, BaseTachyonException]]:
+        """Create many notes with bulk writes.
+
+        Notes are hashed and encrypted in parallel (up to password executor
+        workers at once) and written by _bulk_docs requests.
+
+        :param notes: params of create for every note
+        :return: sign or error for every note (in same order)
+        """
+        # not more than workers, so bulk doesn't saturate executor queue
+        semaphore = asyncio.Semaphore(settings.password_executor_workers)
+
+        async def build(params: Dict[str, Any]) -> NoteModel:  # noqa: WPS430
+            async with semaphore:
+                return await self._build_note(**params)
+
+        built: List[Union[NoteModel, BaseTachyonException]] = []
 
-        note = note.dict(exclude={"key"})
-        note["sign"] = await self._generate_sign()
+        for note in await asyncio.gather(
+            *(build(params) for params in notes),
+            return_exceptions=True,
+        ):
+            # errors of note params are results, others fail whole request
+            if not isinstance(note, (NoteModel, BaseTachyonException)):
+                raise note
 
-        note = Document(id=note["sign"], **note)
+            built.append(note)
 
-        self._client.put_document(db=self._base_name, doc_id=note.id, document=note)
+        inserted = iter(
+            await self._insert_bulk(
+                [note.to_document() for note in built if isinstance(note, NoteModel)],
+            ),
+        )
+
+        results = [
+            next(inserted) if isinstance(note, NoteModel) else note for note in built
+        ]
+
+        self._created.add(sum(isinstance(result, str) for result in results))
+
+        return results
+
+    async def create_stream(
+        self,
+        name: str,
+        chunks: AsyncIterable[bytes],
+        content_type: NoteContentType = NoteContentType.text,
+        max_number_visits: int = 0,
+        is_encrypted: bool = False,
+        encrypt_password: Optional[str] = None,
+        ttl: Optional[int] = None,
+    ) -> str:
+        """Create note from stream of content chunks (without buffering).
 
-        return note.sign
+        Note is hidden from readers until content upload is finished.
+
+        :param name: note name
+        :param chunks: note content chunks
+        :param content_type: content type (only text, others - coming soon)
+        :param max_number_visits: max visits for this note, min=0
+        :param is_encrypted: note encryption switch-parameter
+        :param encrypt_password: if is_encrypted - password for note cipher
+        :param ttl: seconds of note lifetime, default from settings
+        :return: note sign
+        """
+        note, cipher = await self._new_note(
+            name=name,
+            content_type=content_type,
+            max_number_visits=max_number_visits,
+            is_encrypted=is_encrypted,
+            encrypt_password=encrypt_password,
+            ttl=ttl,
+        )
+
+        body = self._limit_size(chunks)
+
+        if cipher:
+            body = cipher.encrypt_stream(body)
+
+        note.is_uploading = True
+        sign, rev = await self._insert(note.to_document(attachments=False))
+
+        try:
+            rev = (
+                await self._client.put_attachment(
+                    db=self._base_name,
+                    doc_id=sign,
+                    attachment_name=BODY_ATTACHMENT,
+                    attachment=self._client.sync_iterator(body),
+                    content_type="application/octet-stream",
+                    rev=rev,
+                )
+            ).get_result()["rev"]
+
+            note.is_uploading = False
+
+            await self._client.put_document(
+                db=self._base_name,
+                doc_id=sign,
+                document={
+                    **note.to_document(attachments=False),
+                    "sign": sign,
+                    "_rev": rev,
+                    "_attachments": {BODY_ATTACHMENT: {"stub": True}},
+                },
+            )
+        except Exception:
+            await self._client.delete_document(db=self._base_name, doc_id=sign, rev=rev)
+            raise
+
+        return sign
 
     async def read(
         self,
         sign: str,
         password: Optional[str] = None,
     ) -> Tuple[NoteModel, str]:
-        """Create note.
+        """Read note.
 
         :param sign: note sign
         :param password: password for note cipher
         :return: note and message
-        :raises NoteDAONotFound: if note not found by sign
-        :raises NoteDAOEncryptPasswordError: if password is wrong or no password
+        """
+        self._check_sign(sign)
+
+        if self._cache_enabled:
+            cached = self._cache.get(sign)
+
+            if cached and not cached[0].is_expired:
+                self._buffered_visits[sign] += 1
+                self._read.add()
+
+                return cached[0].copy(), cached[1]
+
+        note, cipher = await self._get_note(sign, password, attachments=True)
+
+        content = await self._decode_content(note, cipher)
+        message_data = content.decode()
+
+        await self._count_visit(sign, note)
+        self._count_read(note)
+
+        if self._visit_buffered(note) and self._cache_enabled and not cipher:
+            self._cache.set(
+                sign,
+                (note.copy(), message_data),
+                len(content) + CACHE_ENTRY_OVERHEAD,
+            )
+
+        return note, message_data
+
+    async def read_info(self, sign: str) -> NoteModel:
+        """Read note without content and without visit (for revalidation).
+
+        Cached note is returned without database request, otherwise note
+        document is fetched without content attachment.
+
+        :param sign: note sign
+        :return: note
+        :raises NoteDAONotFound: if note not found by sign (or expired)
+        """
+        self._check_sign(sign)
+
+        if self._cache_enabled:
+            cached = self._cache.get(sign)
+
+            if cached and not cached[0].is_expired:
+                return cached[0].copy()
+
+        return self._decode_note(await self._get_document(sign, attachments=False))
+
+    async def read_stream(
+        self,
+        sign: str,
+        password: Optional[str] = None,
+    ) -> Tuple[NoteModel, AsyncIterator[bytes]]:
+        """Read note with content as stream of chunks (without buffering).
+
+        :param sign: note sign
+        :param password: password for note cipher
+        :return: note and content chunks
+        """
+        self._check_sign(sign)
+
+        note, cipher = await self._get_note(sign, password, attachments=False)
+
+        response = None
+
+        if note.has_attachment:
+            # body is requested before visit, so last visit can't lose it
+            response = (
+                await self._client.get_attachment(
+                    db=self._base_name,
+                    doc_id=sign,
+                    attachment_name=BODY_ATTACHMENT,
+                    stream=True,
+                )
+            ).get_result()
+
+        try:
+            await self._count_visit(sign, note)
+        except Exception:
+            if response is not None:
+                response.close()
+
+            raise
+
+        chunks = (
+            self._client.iter_response(
+                response,
+                chunk_size=settings.notes_stream_chunk_size,
+            )
+            if response is not None
+            else _iter_content(note.get_content())
+        )
+
+        if cipher:
+            chunks = cipher.decrypt_stream(chunks)
+
+        if note.content_codec:
+            chunks = decompress_stream(chunks, note.content_codec)
+
+        self._count_read(note)
+
+        return note, chunks
+
+    async def read_bulk(
+        self,
+        passwords: Dict[str, Optional[str]],
+    ) -> Dict[str, Union[Tuple[NoteModel, str], BaseTachyonException]]:
+        """Read many notes with one fetch and one write of visits per batch.
+
+        Notes with conflicting writes fall back to visit by update function.
+
+        :param passwords: password (or none) by note sign
+        :return: note and message or error by note sign
+        """
+        results: Dict[str, Union[Tuple[NoteModel, str], BaseTachyonException]] = {}
+        signs = []
+
+        for sign in passwords:
+            try:
+                self._check_sign(sign)
+            except NoteDAOSignError as exc:
+                results[sign] = exc
+            else:
+                signs.append(sign)
+
+        for offset in range(0, len(signs), self.BULK_BATCH_SIZE):
+            rows = (
+                await self._client.post_all_docs(
+                    db=self._base_name,
+                    keys=signs[offset : offset + self.BULK_BATCH_SIZE],
+                    include_docs=True,
+                    attachments=True,
+                )
+            ).get_result()["rows"]
+
+            documents = {row["key"]: row["doc"] for row in rows if row.get("doc")}
+
+            for row in rows:
+                if row["key"] not in documents:
+                    results[row["key"]] = NoteDAONotFound(
+                        message="Note not found!",
+                        http_code=HTTPStatus.NOT_FOUND,
+                    )
+
+            results.update(await self._read_documents(documents, passwords))
+
+        for result in results.values():
+            if isinstance(result, tuple):
+                self._count_read(result[0])
+
+        return results
+
+    async def _read_documents(
+        self,
+        documents: Dict[str, Dict[str, Any]],
+        passwords: Dict[str, Optional[str]],
+    ) -> Dict[str, Union[Tuple[NoteModel, str], BaseTachyonException]]:
+        """Decrypt note documents and count their visits with one bulk write.
+
+        :param documents: note documents by sign
+        :param passwords: password (or none) by note sign
+        :return: note and message or error by note sign
+        """
+        # not more than workers, so bulk doesn't saturate executor queue
+        semaphore = asyncio.Semaphore(settings.password_executor_workers)
+
+        async def read(sign: str) -> Tuple[NoteModel, str]:  # noqa: WPS430
+            async with semaphore:
+                note, cipher = await self._open_note(
+                    dict(documents[sign]),
+                    passwords[sign],
+                )
+
+            return note, (await self._decode_content(note, cipher)).decode()
+
+        read_results = await asyncio.gather(
+            *(read(sign) for sign in documents),
+            return_exceptions=True,
+        )
+
+        results: Dict[str, Union[Tuple[NoteModel, str], BaseTachyonException]] = {}
+        # read notes waiting for bulk write of visits
+        visited: Dict[str, Tuple[NoteModel, str]] = {}
+        writes = []
+
+        for sign, read_result in zip(documents, read_results):
+            # errors of notes are results, others fail whole request
+            if isinstance(read_result, BaseTachyonException):
+                results[sign] = read_result
+                continue
+
+            if not isinstance(read_result, tuple):
+                raise read_result
+
+            results[sign], write = self._visit_read_result(
+                sign,
+                read_result,
+                documents[sign],
+            )
+
+            if write is not None:
+                visited[sign] = read_result
+                writes.append(write)
+
+        if writes:
+            written = (
+                await self._client.post_bulk_docs(
+                    db=self._base_name,
+                    bulk_docs=BulkDocs(docs=writes),
+                )
+            ).get_result()
+
+            for write in written:
+                if write.get("error"):
+                    results[write["id"]] = await self._retry_visit(
+                        write["id"],
+                        visited[write["id"]],
+                    )
+
+        return results
+
+    def _visit_read_result(
+        self,
+        sign: str,
+        read_result: Tuple[NoteModel, str],
+        document: Dict[str, Any],
+    ) -> Tuple[
+        Union[Tuple[NoteModel, str], BaseTachyonException],
+        Optional[Dict[str, Any]],
+    ]:
+        """Count visit of note read by bulk read (buffered or by bulk write).
+
+        :param sign: note sign
+        :param read_result: note and message
+        :param document: note document
+        :return: result of read and document to write (if visit isn't buffered)
+        """
+        note, _ = read_result
+        note.current_number_visits += 1
+
+        if self._visit_buffered(note):
+            self._buffered_visits[sign] += 1
+
+            return read_result, None
+
+        if note.max_number_visits and (
+            note.current_number_visits > note.max_number_visits
+        ):
+            return (
+                NoteDAONotFound(
+                    message="Note not found!",
+                    http_code=HTTPStatus.NOT_FOUND,
+                ),
+                None,
+            )
+
+        return read_result, self._visited_document(note, document)
+
+    async def _retry_visit(
+        self,
+        sign: str,
+        result: Tuple[NoteModel, str],
+    ) -> Union[Tuple[NoteModel, str], BaseTachyonException]:
+        """Count visit of note from bulk read by update function.
+
+        :param sign: note sign
+        :param result: note and message
+        :return: note and message or error
+        """
+        try:
+            result[0].current_number_visits = await self._visit(sign)
+        except BaseTachyonException as exc:
+            return exc
+
+        return result
+
+    @staticmethod
+    def _visited_document(note: NoteModel, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Document with counted visit (tombstone on last allowed visit).
+
+        :param note: note with counted visit
+        :param document: fetched note document
+        :return: document for bulk write
+        """
+        if note.max_number_visits and (
+            note.current_number_visits >= note.max_number_visits
+        ):
+            return {"_id": document["_id"], "_rev": document["_rev"], "_deleted": True}
+
+        visited = {**document, "current_number_visits": note.current_number_visits}
+
+        # content isn't uploaded again
+        if "_attachments" in document:
+            visited["_attachments"] = {
+                name: {"stub": True} for name in document["_attachments"]
+            }
+
+        return visited
+
+    async def stat(self) -> Dict[str, int]:
+        """Counts of stored notes and notes events of worker in last minute.
+
+        Counts come from stat view (updated lazily, so they may lag a bit)
+        and are cached in process for notes_stat_cache_ttl seconds.
+
+        :return: stat values
+        """
+        counts = self._stat_cache.get("counts")
+
+        if counts is None:
+            rows = (
+                await self._client.post_view(
+                    db=self._base_name,
+                    ddoc="notes",
+                    view="stat",
+                    group_level=2,
+                    update="lazy",
+                )
+            ).get_result()["rows"]
+
+            counts = {"total": 0, "encrypted": 0, "limited": 0}
+
+            for row in rows:
+                is_encrypted, is_limited = row["key"]
+
+                counts["total"] += row["value"]
+                counts["encrypted"] += row["value"] if is_encrypted else 0
+                counts["limited"] += row["value"] if is_limited else 0
+
+            self._stat_cache.set("counts", counts, 1)
+
+        return {
+            **counts,
+            "created_per_minute": self._created.value,
+            "read_per_minute": self._read.value,
+            "deleted_per_minute": self._deleted.value,
+        }
+
+    def _count_read(self, note: NoteModel) -> None:
+        """Count note read (and deletion on last allowed visit) in stat.
+
+        :param note: note with counted visit
+        """
+        self._read.add()
+
+        if note.max_number_visits and (
+            note.current_number_visits >= note.max_number_visits
+        ):
+            self._deleted.add()
+
+    def cache_stat(self) -> Dict[str, Any]:
+        """Stats of notes cache (shared by worker).
+
+        :return: enabled flag, hits, misses, items and sizes
+        """
+        return {
+            "enabled": self._cache_enabled,
+            "hits": self._cache.hits,
+            "misses": self._cache.misses,
+            "items": len(self._cache),
+            "size": self._cache.size,
+            "max_size": self._cache.max_size,
+        }
+
+    @property
+    def _cache_enabled(self) -> bool:
+        """Cache is used only if visits of cached notes can be buffered.
+
+        :return: cache enabled or not
+        """
+        return bool(self._cache.max_size and settings.notes_visit_flush_interval)
+
+    def _check_sign(self, sign: str) -> None:
+        """Check sign format before database lookup.
+
+        :param sign: note sign
         :raises NoteDAOSignError: if received sign not allowed by conditions
         """
-        if len(sign) != self.SIGN_LENGTH:
+        if len(sign) != self.SIGN_LENGTH or sign.startswith("_"):
             raise NoteDAOSignError(
                 "Sign must be 32 characters long",
                 http_code=HTTPStatus.BAD_REQUEST,
             )
 
-        note = next(
-            iter(
-                (self._client.post_find(self._base_name, {"sign": sign})).get_result()[
-                    "docs"
-                ],
-            ),
-            None,
-        )  # : WPS221
+    def _check_size(self, size: int) -> None:
+        """Check note content size.
 
-        if not note:
-            raise NoteDAONotFound(
-                message="Note not found!",
-                http_code=HTTPStatus.NOT_FOUND,
+        :param size: content size in bytes
+        :raises NoteDAOSizeError: if content is larger than allowed
+        """
+        if size > settings.notes_max_size:
+            raise NoteDAOSizeError(
+                "Note is too large, max size is {0} bytes.".format(
+                    settings.notes_max_size,
+                ),
+                http_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
             )
 
-        note = NoteModel(**note)
+    async def _limit_size(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        """Pass chunks through while total size is allowed.
 
-        if note.is_encrypted:
-            if not password:
-                raise NoteDAOEncryptPasswordError(
-                    "This note encrypted, but password is none!",
-                    http_code=HTTPStatus.BAD_REQUEST,
+        :param chunks: content chunks
+        :yields: same chunks
+        """
+        size = 0
+
+        async for chunk in chunks:
+            size += len(chunk)
+            self._check_size(size)
+
+            yield chunk
+
+    async def _build_note(
+        self,
+        name: str,
+        text: str,
+        content_type: NoteContentType = NoteContentType.text,
+        max_number_visits: int = 0,
+        is_encrypted: bool = False,
+        encrypt_password: Optional[str] = None,
+        ttl: Optional[int] = None,
+    ) -> NoteModel:
+        """Note with content (encrypted if needed) ready for insert.
+
+        :param name: note name
+        :param text: note content
+        :param content_type: content type
+        :param max_number_visits: max visits for this note, min=0
+        :param is_encrypted: note encryption switch-parameter
+        :param encrypt_password: if is_encrypted - password for note cipher
+        :param ttl: seconds of note lifetime, default from settings
+        :return: note
+        """
+        content = text.encode()
+
+        self._check_size(len(content))
+
+        note, cipher = await self._new_note(
+            name=name,
+            content_type=content_type,
+            max_number_visits=max_number_visits,
+            is_encrypted=is_encrypted,
+            encrypt_password=encrypt_password,
+            ttl=ttl,
+        )
+
+        if (
+            settings.notes_compression
+            and len(content) >= settings.notes_compression_min_size
+        ):
+            with note_stage_seconds.time("compress"):
+                compressed = await compress_async(
+                    content,
+                    settings.notes_compression,
+                    settings.notes_compression_level,
+                )
+
+            if compressed is not None:
+                content = compressed
+                note.content_codec = settings.notes_compression
+
+        with note_stage_seconds.time("encrypt"):
+            note.set_text(cipher.encrypt(content) if cipher else content)
+
+        return note
+
+    async def _decode_content(
+        self,
+        note: NoteModel,
+        cipher: Optional[ChaCha20Poly1305],
+    ) -> bytes:
+        """Note content decrypted (if encrypted) and decompressed (if compressed).
+
+        :param note: note with content
+        :param cipher: cipher for note content
+        :return: content bytes
+        """
+        content = note.get_content()
+
+        if cipher:
+            with note_stage_seconds.time("decrypt"):
+                content = cipher.decrypt(content)
+
+        if note.content_codec:
+            with note_stage_seconds.time("decompress"):
+                content = await decompress_async(content, note.content_codec)
+
+        return content
+
+    async def _new_note(
+        self,
+        name: str,
+        content_type: NoteContentType,
+        max_number_visits: int,
+        is_encrypted: bool,
+        encrypt_password: Optional[str],
+        ttl: Optional[int] = None,
+    ) -> Tuple[NoteModel, Optional[ChaCha20Poly1305]]:
+        """Note without content and cipher for its content (if encrypted).
+
+        :param name: note name
+        :param content_type: content type
+        :param max_number_visits: max visits for this note, min=0
+        :param is_encrypted: note encryption switch-parameter
+        :param encrypt_password: if is_encrypted - password for note cipher
+        :param ttl: seconds of note lifetime, default from settings
+        :return: note and cipher
+        :raises NoteDAOException: raise for encryption data error (password is none)
+        """
+        ttl = ttl or settings.notes_default_ttl
+
+        note = NoteModel(
+            name=name,
+            content_type=content_type,
+            max_number_visits=max_number_visits,
+            is_encrypted=is_encrypted,
+            expires_at=int(time.time()) + ttl if ttl else None,
+        )
+
+        if not is_encrypted:
+            return note, None
+
+        if not encrypt_password:
+            raise NoteDAOException(
+                "Param is_encrypted for note set to true, "
+                "but encrypt_password isn't set.",
+                http_code=HTTPStatus.BAD_REQUEST,
+            )
+
+        with note_stage_seconds.time("kdf"):
+            cipher = await ChaCha20Poly1305.derive(encrypt_password)
+
+        note.set_encrypt_metadata(cipher.metadata)
+
+        return note, cipher
+
+    async def _insert(self, note: Dict[str, Any]) -> Tuple[str, str]:
+        """Insert note document with new unique sign.
+
+        :param note: note document without id
+        :return: sign and revision of inserted document
+        """
+        # sign is document id, so uniqueness is checked by insert itself
+        while True:  # noqa: WPS457
+            with note_stage_seconds.time("sign"):
+                sign = self._generate_sign()
+
+            try:
+                result = (
+                    await self._client.put_document(
+                        db=self._base_name,
+                        doc_id=sign,
+                        document={**note, "sign": sign},
+                    )
+                ).get_result()
+            except ApiException as exc:
+                if exc.code != HTTPStatus.CONFLICT:
+                    raise
+            else:
+                return sign, result["rev"]
+
+    async def _insert_bulk(
+        self,
+        notes: List[Dict[str, Any]],
+    ) -> List[Union[str, NoteDAOException]]:
+        """Insert note documents with new unique signs by _bulk_docs requests.
+
+        :param notes: note documents without id
+        :return: sign or error for every document (in same order)
+        """
+        results: List[Union[str, NoteDAOException]] = [""] * len(notes)
+
+        for offset in range(0, len(notes), self.BULK_BATCH_SIZE):
+            batch = list(range(offset, min(offset + self.BULK_BATCH_SIZE, len(notes))))
+
+            # documents with taken signs are inserted again with new signs
+            while batch:
+                signs = [self._generate_sign() for _ in batch]
+
+                written = (
+                    await self._client.post_bulk_docs(
+                        db=self._base_name,
+                        bulk_docs=BulkDocs(
+                            docs=[
+                                {**notes[index], "_id": sign, "sign": sign}
+                                for index, sign in zip(batch, signs)
+                            ],
+                        ),
+                    )
+                ).get_result()
+
+                conflicts = []
+
+                for index, sign, result in zip(batch, signs, written):
+                    if result.get("error") == "conflict":
+                        conflicts.append(index)
+                    elif result.get("error"):
+                        results[index] = NoteDAOException(
+                            "Note isn't created: {0}".format(result.get("reason")),
+                            http_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                        )
+                    else:
+                        results[index] = sign
+
+                batch = conflicts
+
+        return results
+
+    async def _get_note(
+        self,
+        sign: str,
+        password: Optional[str],
+        attachments: bool,
+    ) -> Tuple[NoteModel, Optional[ChaCha20Poly1305]]:
+        """Get note and cipher for its content (if encrypted and password is right).
+
+        :param sign: note sign
+        :param password: password for note cipher
+        :param attachments: fetch content attachment with note
+        :return: note and cipher
+        """
+        document = await self._get_document(sign, attachments)
+
+        return await self._open_note(document, password)
+
+    async def _get_document(self, sign: str, attachments: bool) -> Dict[str, Any]:
+        """Get note document.
+
+        :param sign: note sign
+        :param attachments: fetch content attachment with note
+        :return: note document
+        :raises NoteDAONotFound: if note not found by sign
+        """
+        try:
+            return await self._fetch_document(sign, attachments)
+        except ApiException as exc:
+            if exc.code == HTTPStatus.NOT_FOUND:
+                raise NoteDAONotFound(
+                    message="Note not found!",
+                    http_code=HTTPStatus.NOT_FOUND,
+                )
+
+            raise
+
+    async def _fetch_document(self, sign: str, attachments: bool) -> Dict[str, Any]:
+        """Fetch note document, concurrent fetches of sign share one request.
+
+        :param sign: note sign
+        :param attachments: fetch content attachment with note
+        :return: note document (copy for caller)
+        """
+        key = (sign, attachments)
+        fetch = self._fetches.get(key)
+
+        if fetch is None:
+            fetch = asyncio.ensure_future(
+                self._client.get_document(
+                    db=self._base_name,
+                    doc_id=sign,
+                    attachments=attachments,
+                ),
+            )
+            self._fetches[key] = fetch
+            fetch.add_done_callback(lambda _: self._fetches.pop(key, None))
+
+        # cancelled read doesn't cancel fetch of other reads
+        response = await asyncio.shield(fetch)
+
+        return dict(response.get_result())
+
+    async def _open_note(
+        self,
+        document: Dict[str, Any],
+        password: Optional[str],
+    ) -> Tuple[NoteModel, Optional[ChaCha20Poly1305]]:
+        """Note from document and cipher for its content (if password is right).
+
+        :param document: note document
+        :param password: password for note cipher
+        :return: note and cipher
+        :raises NoteDAOEncryptPasswordError: if password is wrong or no password
+        """
+        note = self._decode_note(document)
+
+        if not note.is_encrypted:
+            return note, None
+
+        if not password:
+            raise NoteDAOEncryptPasswordError(
+                "This note encrypted, but password is none!",
+                http_code=HTTPStatus.BAD_REQUEST,
+            )
+
+        # notes before key derivation (version 1) have separate password hash
+        if note.encrypt_password_hash:
+            with note_stage_seconds.time("password_check"):
+                password_matched = await password_check(
+                    password,
+                    note.encrypt_password_hash,
                 )
 
-            if not self._password_check(password, note.encrypt_password_hash):
+            if not password_matched:
                 raise NoteDAOEncryptPasswordError(
                     "This note encrypted, but password is wrong!",
                     http_code=HTTPStatus.BAD_REQUEST,
                 )
 
-            cipher = ChaCha20Poly1305(password, **note.get_encrypt_metadata())
+            return note, ChaCha20Poly1305(password, **note.get_encrypt_metadata())
+
+        try:
+            with note_stage_seconds.time("kdf"):
+                cipher = await ChaCha20Poly1305.derive(
+                    password,
+                    **note.get_encrypt_metadata(),
+                )
+        except nacl.exceptions.CryptoError:
+            raise NoteDAOEncryptPasswordError(
+                "This note encrypted, but password is wrong!",
+                http_code=HTTPStatus.BAD_REQUEST,
+            )
+
+        return note, cipher
+
+    def _decode_note(self, document: Dict[str, Any]) -> NoteModel:
+        """Note from document.
+
+        :param document: note document
+        :return: note
+        :raises NoteDAONotFound: if note is still uploading or expired
+        """
+        with note_stage_seconds.time("decode"):
+            note = NoteModel.from_document(document)
+
+        if note.is_uploading or note.is_expired:
+            raise NoteDAONotFound(
+                message="Note not found!",
+                http_code=HTTPStatus.NOT_FOUND,
+            )
+
+        return note
+
+    def _visit_buffered(self, note: NoteModel) -> bool:
+        """Visits of unlimited notes are buffered if flush interval is set.
 
-            message_data = cipher.decrypt(note.get_text(decode=False)).decode()
+        :param note: note
+        :return: visit goes to buffer or not
+        """
+        return not note.max_number_visits and bool(settings.notes_visit_flush_interval)
+
+    async def _count_visit(self, sign: str, note: NoteModel) -> None:
+        """Count note visit (buffered or in database).
 
+        :param sign: note sign
+        :param note: note
+        """
+        if self._visit_buffered(note):
+            self._buffered_visits[sign] += 1
+            note.current_number_visits += 1
         else:
-            message_data = note.get_text()
+            note.current_number_visits = await self._visit(sign)
 
-        note.current_number_visits += 1
+    async def _visit(self, sign: str) -> int:
+        """Count note visit (and delete note on last visit).
+
+        Concurrent visits of note in worker are combined: visits waiting
+        for previous write of note are counted by one next write.
+
+        :param sign: note sign
+        :return: number of this visit
+        :raises NoteDAONotFound: if note deleted or already visited max times
+        """
+        batch = self._visit_batches.get(sign)
+
+        if batch is None:
+            batch = _VisitBatch()
+            self._visit_batches[sign] = batch
+            asyncio.ensure_future(self._write_visit_batch(sign, batch))
+
+        index = batch.visits
+        batch.visits += 1
+
+        visits, granted = await asyncio.shield(batch.result)
+
+        if index >= granted:
+            raise NoteDAONotFound(
+                message="Note not found!",
+                http_code=HTTPStatus.NOT_FOUND,
+            )
+
+        return visits - granted + index + 1
 
-        updated_note = note.dict(by_alias=True)
+    async def _write_visit_batch(self, sign: str, batch: _VisitBatch) -> None:
+        """Write visits of batch after previous write of note.
 
-        updated_note = self._client.post_document(
-            db=self._base_name,
-            document=updated_note,
+        :param sign: note sign
+        :param batch: visits batch
+        """
+        lock = self._visit_locks.setdefault(sign, asyncio.Lock())
+
+        async with lock:
+            # new visits of note go to next batch
+            self._visit_batches.pop(sign)
+
+            try:
+                batch.result.set_result(await self._write_visits(sign, batch.visits))
+            except Exception as exc:
+                batch.result.set_exception(exc)
+
+        if sign not in self._visit_batches:
+            self._visit_locks.pop(sign, None)
+
+    async def _write_visits(self, sign: str, visits: int) -> Tuple[int, int]:
+        """Count note visits (and delete note on last visit) in one operation.
+
+        :param sign: note sign
+        :param visits: quantity of visits
+        :return: current number of visits and visits granted by limit
+        :raises NoteDAONotFound: if note deleted or already visited max times
+        :raises NoteDAOException: if visits not counted due to concurrent reads
+        """
+        for attempt in range(settings.notes_visit_retries):
+            try:
+                result = (
+                    await self._client.put_update(
+                        db=self._base_name,
+                        ddoc="notes",
+                        function="visit",
+                        doc_id=sign,
+                        params={"visits": visits},
+                    )
+                ).get_result()
+
+                return result["current_number_visits"], result["granted"]
+            except ApiException as exc:
+                if exc.code == HTTPStatus.NOT_FOUND:
+                    raise NoteDAONotFound(
+                        message="Note not found!",
+                        http_code=HTTPStatus.NOT_FOUND,
+                    )
+
+                if exc.code != HTTPStatus.CONFLICT:
+                    raise
+
+            await asyncio.sleep(random.uniform(0, self.VISIT_RETRY_DELAY * attempt))
+
+        raise NoteDAOException(
+            "Note is read by too many clients at once, try again later.",
+            http_code=HTTPStatus.CONFLICT,
+        )
+
+    async def flush_visits(self) -> None:
+        """Write buffered visits of unlimited notes in bulk.
+
+        Visits of notes with conflicting writes stay in buffer for next flush,
+        visits of deleted notes are dropped. If flush fails, visits of
+        batches not written yet go back to buffer.
+        """
+        visits = Counter(self._buffered_visits)
+        self._buffered_visits.clear()
+
+        signs = list(visits)
+
+        for offset in range(0, len(signs), self.BULK_BATCH_SIZE):
+            try:
+                await self._flush_visits_batch(
+                    signs[offset : offset + self.BULK_BATCH_SIZE],
+                    visits,
+                )
+            except (Exception, asyncio.CancelledError):
+                for sign in signs[offset:]:
+                    self._buffered_visits[sign] += visits[sign]
+
+                raise
+
+    async def _flush_visits_batch(
+        self,
+        signs: List[str],
+        visits: "Counter[str]",
+    ) -> None:
+        """Write buffered visits of batch of notes by one bulk request.
+
+        :param signs: signs of notes of batch
+        :param visits: buffered visits by sign
+        """
+        rows = (
+            await self._client.post_all_docs(
+                db=self._base_name,
+                keys=signs,
+                include_docs=True,
+            )
+        ).get_result()["rows"]
+
+        notes = []
+
+        for row in rows:
+            if row.get("doc"):
+                notes.append(row["doc"])
+            else:
+                self._cache.delete(row["key"])
+
+        for note in notes:
+            note["current_number_visits"] += visits[note["_id"]]
+
+        results = (
+            await self._client.post_bulk_docs(
+                db=self._base_name,
+                bulk_docs=BulkDocs(docs=notes),
+            )
         ).get_result()
 
-        if note.max_number_visits:
-            if note.current_number_visits >= note.max_number_visits:
-                self._client.delete_document(
+        for result in results:
+            if result.get("error") == "conflict":
+                self._buffered_visits[result["id"]] += visits[result["id"]]
+
+    async def sweep(self) -> int:
+        """Delete expired notes and compact database (if interval has passed).
+
+        Notes are deleted in small batches with pause between them,
+        so sweeper doesn't compete with reads and writes of notes.
+
+        :return: quantity of deleted notes
+        """
+        deleted = 0
+
+        while True:  # noqa: WPS457
+            notes = (
+                await self._client.post_find(
                     db=self._base_name,
-                    doc_id=updated_note["id"],
-                    rev=updated_note["rev"],
+                    # unset expires_at (null) is less than any number in selector
+                    selector={"expires_at": {"$gt": 0, "$lte": int(time.time())}},
+                    fields=["_id", "_rev"],
+                    limit=settings.notes_sweep_batch_size,
                 )
+            ).get_result()["docs"]
 
-        return note, message_data
+            if not notes:
+                break
 
-    async def _generate_sign(self) -> str:
-        generated_sign = None
+            written = (
+                await self._client.post_bulk_docs(
+                    db=self._base_name,
+                    bulk_docs=BulkDocs(
+                        docs=[{**note, "_deleted": True} for note in notes]
+                    ),
+                )
+            ).get_result()
 
-        while not generated_sign:
-            sign = secrets.token_urlsafe(self.SIGN_BYTES_LENGTH)
+            for result in written:
+                if not result.get("error"):
+                    self._cache.delete(result["id"])
+                    deleted += 1
 
-            if (
-                re.match("^[^_].*", sign)
-                and not self._client.post_find(
-                    db=self._base_name,
-                    selector={"sign": {"$eq": sign}},
-                    fields=["_id"],
-                    limit=1,
-                ).get_result()["docs"]
-            ):
-                generated_sign = sign
+            if len(notes) < settings.notes_sweep_batch_size:
+                break
 
-        return generated_sign
+            await asyncio.sleep(settings.notes_sweep_batch_delay)
 
-    @classmethod
-    def _password_check(cls, password: str, password_hash: str) -> bool:
-        try:
-            return nacl.pwhash.verify(password_hash.encode(), password.encode())
-        except nacl.exceptions.InvalidkeyError:
-            return False
+        self._deleted.add(deleted)
+
+        compaction_due = (
+            self._compacted_at is None
+            or time.monotonic() - self._compacted_at
+            >= settings.notes_compaction_interval
+        )
+
+        if deleted and settings.notes_compaction_interval and compaction_due:
+            type(self)._compacted_at = time.monotonic()  # noqa: WPS601
+
+            await self._client.post_compact(db=self._base_name)
+
+        return deleted
 
     @classmethod
-    def _password_hash(cls, password: str) -> str:
-        return nacl.pwhash.str(password.encode()).decode()
+    def _generate_sign(cls) -> str:
+        sign = secrets.token_urlsafe(cls.SIGN_BYTES_LENGTH)
+
+        # ids started with underscore are reserved by database
+        while not re.match("^[^_].*", sign):
+            sign = secrets.token_urlsafe(cls.SIGN_BYTES_LENGTH)
+
+        return sign
@@ -1,10 +1,14 @@
 import base64
+import time
 from enum import Enum
 from typing import Any, Dict, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from tachyon.db.utils import cbor
+from tachyon.services.compression import NoteCodec
+
+BODY_ATTACHMENT = "body"
 
 
 class NoteContentType(str, Enum):  # noqa: WPS600
@@ -30,27 +34,107 @@ class NoteModel(BaseModel):
     encrypt_password_hash: Optional[str] = Field(default=None)
 
     encrypt_metadata: Optional[str] = Field(default=None)
+    # codec of compressed content (compressed before encryption), none - raw
+    content_codec: Optional[NoteCodec] = Field(default=None)
+
+    # unix time (seconds) after which note is deleted, none - never expires
+    expires_at: Optional[int] = Field(default=None)
 
+    # content is being streamed to database, note isn't readable yet
+    is_uploading: bool = Field(default=False)
+
+    # legacy layout: content in b85 format (new notes store it as attachment)
     text: str = Field(default="")
 
+    _content: Optional[bytes] = PrivateAttr(default=None)
+    _has_attachment: bool = PrivateAttr(default=False)
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> "NoteModel":
+        """Note from database document (with attachments data or legacy text).
+
+        Documents are written by DAO, so they aren't validated again.
+
+        :param document: database document
+        :return: note
+        """
+        attachments = document.pop("_attachments", None) or {}
+
+        note = cls.construct(key=document.pop("_id", None), **document)
+
+        body = attachments.get(BODY_ATTACHMENT)
+
+        if body is not None:
+            note._has_attachment = True  # noqa: WPS437
+
+            if "data" in body:
+                note._content = base64.b64decode(body["data"])  # noqa: WPS437
+
+        return note
+
+    @property
+    def is_expired(self) -> bool:
+        """Note lifetime is over (it isn't readable, even if not swept yet).
+
+        :return: expired or not
+        """
+        return self.expires_at is not None and self.expires_at <= time.time()
+
+    @property
+    def has_attachment(self) -> bool:
+        """Content is stored as attachment (not in legacy text field).
+
+        :return: has content attachment or not
+        """
+        return self._has_attachment
+
+    def to_document(self, attachments: bool = True) -> Dict[str, Any]:
+        """Database document with content as binary attachment.
+
+        :param attachments: include content attachment
+        :return: document without id
+        """
+        document = self.dict(exclude={"key", "sign", "text"})
+
+        if not attachments:
+            return document
+
+        document["_attachments"] = {
+            BODY_ATTACHMENT: {
+                "content_type": "application/octet-stream",
+                "data": base64.b64encode(self._content or b"").decode(),
+            },
+        }
+
+        return document
+
     def get_text(self, decode: bool = True) -> Union[str, bytes]:
-        """Text from b85 format.
+        """Note content (from attachment or legacy b85 text).
 
         :param decode: decode to utf-8 or not
         :return: text
         """
-        return (
-            base64.b85decode(self.text).decode()
-            if decode
-            else base64.b85decode(self.text)
-        )
+        content = self.get_content()
+
+        return content.decode() if decode else content
+
+    def get_content(self) -> bytes:
+        """Note content bytes (from attachment or legacy b85 text).
+
+        :return: content bytes
+        """
+        if self._content is not None:
+            return self._content
+
+        return base64.b85decode(self.text)
 
     def set_text(self, value: bytes) -> None:
-        """Text to b85 format.
+        """Note content (stored as binary attachment).
 
-        :param value: text for b85 encode
+        :param value: content bytes
         """
-        self.text = base64.b85encode(value).decode()  # noqa: WPS601
+        self._content = value
+        self.text = ""  # noqa: WPS601
 
     def get_encrypt_metadata(self) -> Dict[str, Any]:
         """Encryption data from cbor format.
@@ -0,0 +1,9 @@
+from tachyon.exceptions.base import BaseTachyonException
+
+
+class DAOException(BaseTachyonException):
+    """Base exception for internal errors in dao."""
+
+
+class DAOUnavailableError(DAOException):
+    """Base exception for internal errors with database connection."""
@@ -15,3 +15,7 @@ class NoteDAONotFound(NoteDAOException):
 
 class NoteDAOEncryptPasswordError(NoteDAOException):
     """Base exception for internal errors with note password."""
+
+
+class NoteDAOSizeError(NoteDAOException):
+    """Base exception for internal errors with note size."""
@@ -0,0 +1 @@
+"""Internal exceptions for services."""
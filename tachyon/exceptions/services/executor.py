@@ -0,0 +1,9 @@
+from tachyon.exceptions.base import BaseTachyonException
+
+
+class ExecutorException(BaseTachyonException):
+    """Base exception for internal errors in executors."""
+
+
+class ExecutorSaturatedError(ExecutorException):
+    """Base exception for executor queue overflow."""
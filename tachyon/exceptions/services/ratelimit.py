@@ -0,0 +1,9 @@
+from tachyon.exceptions.base import BaseTachyonException
+
+
+class RateLimitException(BaseTachyonException):
+    """Base exception for internal errors in rate limiter."""
+
+
+class RateLimitExceededError(RateLimitException):
+    """Base exception for requests over rate limit."""
@@ -0,0 +1,77 @@
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Optional, Tuple, TypeVar
+
+ValueType = TypeVar("ValueType")
+
+
+class LRUCache(Generic[ValueType]):
+    """In-process LRU cache limited by total size of values and entry TTL."""
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+        # key -> (value, value size, expiration time)
+        self._entries: "OrderedDict[Any, Tuple[ValueType, int, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Any) -> Optional[ValueType]:
+        """Get value and mark it as recently used.
+
+        :param key: cache key
+        :return: value or None if missed or expired
+        """
+        entry = self._entries.get(key)
+
+        if entry is None or entry[2] < time.monotonic():
+            if entry is not None:
+                self.delete(key)
+
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return entry[0]
+
+    def set(self, key: Any, value: ValueType, size: int) -> None:  # noqa: WPS125
+        """Set value and evict least recently used values over max size.
+
+        :param key: cache key
+        :param value: value for cache
+        :param size: size of value (bytes)
+        """
+        if size > self.max_size:
+            return
+
+        self.delete(key)
+
+        self._entries[key] = (value, size, time.monotonic() + self.ttl)
+        self.size += size
+
+        while self.size > self.max_size:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def delete(self, key: Any) -> None:
+        """Delete value if exists.
+
+        :param key: cache key
+        """
+        entry = self._entries.pop(key, None)
+
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self) -> None:
+        """Delete all values."""
+        self._entries.clear()
+        self.size = 0
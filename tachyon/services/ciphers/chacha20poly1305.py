@@ -1,19 +1,178 @@
 import base64
+import hmac
 import secrets
-from typing import Dict, Optional, Union
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Union,
+)
 
+import nacl.bindings
 import nacl.encoding
+import nacl.exceptions
 import nacl.hash
+import nacl.pwhash.argon2id
 import nacl.secret
 
+from tachyon.services.password import password_derive
 from tachyon.settings import settings
 
+HEADER_LENGTH = nacl.bindings.crypto_secretstream_xchacha20poly1305_HEADERBYTES
+# authentication data added to every segment
+SEGMENT_OVERHEAD = nacl.bindings.crypto_secretstream_xchacha20poly1305_ABYTES
+
+TAG_MESSAGE = nacl.bindings.crypto_secretstream_xchacha20poly1305_TAG_MESSAGE
+TAG_FINAL = nacl.bindings.crypto_secretstream_xchacha20poly1305_TAG_FINAL
+
+# version of key scheme in metadata:
+# 1 - key is sha256 of password (checked by separate argon2 hash),
+# 2 - key and key tag from one argon2id run, server secret bound as aad
+LEGACY_VERSION = 1
+KDF_VERSION = 2
+
+
+class SegmentEncryptor:
+    """Incremental xchacha20-poly1305 secretstream encryption.
+
+    Plaintext is split into segments of fixed size, last segment is marked by
+    final tag, so truncated ciphertext can't be decrypted.
+    Memory usage is bounded by segment size for any length of plaintext.
+    """
+
+    def __init__(
+        self,
+        key: bytes,
+        segment_size: int,
+        aad: Optional[bytes] = None,
+    ) -> None:
+        self._segment_size = segment_size
+        self._aad = aad
+        self._state = nacl.bindings.crypto_secretstream_xchacha20poly1305_state()
+        self._header: Optional[
+            bytes
+        ] = nacl.bindings.crypto_secretstream_xchacha20poly1305_init_push(
+            self._state,
+            key,
+        )
+        self._buffer = bytearray()
+
+    def update(self, data: bytes) -> bytes:
+        """Encrypt next part of plaintext.
+
+        :param data: plaintext part of any size
+        :returns: ciphertext of completed segments (may be empty)
+        """
+        self._buffer += data
+
+        output = bytearray(self._pop_header())
+
+        while len(self._buffer) > self._segment_size:
+            output += self._push(bytes(self._buffer[: self._segment_size]), TAG_MESSAGE)
+            del self._buffer[: self._segment_size]  # noqa: WPS420
+
+        return bytes(output)
+
+    def finalize(self) -> bytes:
+        """Encrypt rest of plaintext as final segment.
+
+        :returns: ciphertext of final segment
+        """
+        return self._pop_header() + self._push(bytes(self._buffer), TAG_FINAL)
+
+    def _pop_header(self) -> bytes:
+        header, self._header = self._header or b"", None
+
+        return header
+
+    def _push(self, segment: bytes, tag: int) -> bytes:
+        return nacl.bindings.crypto_secretstream_xchacha20poly1305_push(
+            self._state,
+            segment,
+            ad=self._aad,
+            tag=tag,
+        )
+
+
+class SegmentDecryptor:
+    """Incremental decryption of SegmentEncryptor output (any chunking)."""
+
+    def __init__(
+        self,
+        key: bytes,
+        segment_size: int,
+        aad: Optional[bytes] = None,
+    ) -> None:
+        self._key = key
+        self._aad = aad
+        self._segment_size = segment_size + SEGMENT_OVERHEAD
+        self._state = nacl.bindings.crypto_secretstream_xchacha20poly1305_state()
+        self._initialized = False
+        self._buffer = bytearray()
+
+    def update(self, data: bytes) -> bytes:
+        """Decrypt next part of ciphertext.
+
+        :param data: ciphertext part of any size
+        :returns: plaintext of completed segments (may be empty)
+        """
+        self._buffer += data
+
+        if not self._initialized:
+            if len(self._buffer) < HEADER_LENGTH:
+                return b""
+
+            nacl.bindings.crypto_secretstream_xchacha20poly1305_init_pull(
+                self._state,
+                bytes(self._buffer[:HEADER_LENGTH]),
+                self._key,
+            )
+            del self._buffer[:HEADER_LENGTH]  # noqa: WPS420
+            self._initialized = True
+
+        output = bytearray()
+
+        # segment of exact size may be the last one, so it waits for finalize
+        while len(self._buffer) > self._segment_size:
+            output += self._pull(bytes(self._buffer[: self._segment_size]), TAG_MESSAGE)
+            del self._buffer[: self._segment_size]  # noqa: WPS420
+
+        return bytes(output)
+
+    def finalize(self) -> bytes:
+        """Decrypt final segment.
+
+        :returns: plaintext of final segment
+        :raises CryptoError: if ciphertext is truncated or corrupted
+        """
+        if not self._initialized:
+            raise nacl.exceptions.CryptoError("Ciphertext is truncated")
+
+        return self._pull(bytes(self._buffer), TAG_FINAL)
+
+    def _pull(self, segment: bytes, expected_tag: int) -> bytes:
+        message, tag = nacl.bindings.crypto_secretstream_xchacha20poly1305_pull(
+            self._state,
+            segment,
+            ad=self._aad,
+        )
+
+        if tag != expected_tag:
+            raise nacl.exceptions.CryptoError("Unexpected segment tag")
+
+        return message
+
 
 class ChaCha20Poly1305:
     """Interface for chacha20-poly1305."""
 
     NONCE_LENGTH = 24
     KEY_LENGTH = 32
+    SALT_LENGTH = nacl.pwhash.argon2id.SALTBYTES
 
     def __init__(
         self,
@@ -21,6 +180,12 @@ class ChaCha20Poly1305:
         key: Optional[Union[bytes, str]] = None,
         nonce: Optional[Union[bytes, str]] = None,
         aad: Optional[Union[bytes, str]] = None,
+        segment_size: Optional[int] = None,
+        version: int = LEGACY_VERSION,
+        salt: Optional[Union[bytes, str]] = None,
+        opslimit: Optional[int] = None,
+        memlimit: Optional[int] = None,
+        key_tag: Optional[Union[bytes, str]] = None,
     ):
         if isinstance(key, str):
             key = base64.b85decode(key)
@@ -31,6 +196,12 @@ class ChaCha20Poly1305:
         if isinstance(aad, str):
             aad = base64.b85decode(aad)
 
+        if isinstance(salt, str):
+            salt = base64.b85decode(salt)
+
+        if isinstance(key_tag, str):
+            key_tag = base64.b85decode(key_tag)
+
         self._key = key or nacl.hash.sha256(
             password.encode(),
             encoder=nacl.encoding.RawEncoder,
@@ -38,15 +209,93 @@ class ChaCha20Poly1305:
 
         self._nonce = nonce or secrets.token_bytes(self.NONCE_LENGTH)
         self._aad = aad or settings.crypto_secret
+        # None - whole message in one box, else - segmented stream
+        self._segment_size = segment_size
+        self._version = version
+        self._salt = salt
+        self._opslimit = opslimit
+        self._memlimit = memlimit
+        self._key_tag = key_tag
 
         self._algorithm = nacl.secret.SecretBox(key=self._key)
 
+    @classmethod
+    async def derive(
+        cls,
+        password: str,
+        salt: Optional[str] = None,
+        opslimit: Optional[int] = None,
+        memlimit: Optional[int] = None,
+        key_tag: Optional[str] = None,
+        segment_size: Optional[int] = None,
+        **metadata: Union[str, int],
+    ) -> "ChaCha20Poly1305":
+        """Cipher with key derived from password by argon2id (in password executor).
+
+        One argon2id run gives both key and key tag, tag is stored in metadata
+        and checks password before decrypt. Without metadata new salt is generated.
+
+        :param password: password for cipher
+        :param salt: salt from metadata
+        :param opslimit: argon2id operations limit, default from settings
+        :param memlimit: argon2id memory limit, default from settings
+        :param key_tag: key tag from metadata
+        :param segment_size: bytes of plaintext segment, default from settings
+        :param metadata: rest of metadata (version)
+        :returns: cipher
+        :raises CryptoError: if password doesn't match key tag
+        """
+        salt_data = (
+            base64.b85decode(salt) if salt else secrets.token_bytes(cls.SALT_LENGTH)
+        )
+        opslimit = opslimit or settings.crypto_kdf_opslimit
+        memlimit = memlimit or settings.crypto_kdf_memlimit
+
+        key_material = await password_derive(
+            password,
+            cls.KEY_LENGTH * 2,
+            salt_data,
+            opslimit,
+            memlimit,
+        )
+        key, derived_tag = (
+            key_material[: cls.KEY_LENGTH],
+            key_material[cls.KEY_LENGTH :],
+        )
+
+        if key_tag and not hmac.compare_digest(derived_tag, base64.b85decode(key_tag)):
+            raise nacl.exceptions.CryptoError("Password doesn't match key tag")
+
+        return cls(
+            password,
+            key=key,
+            segment_size=segment_size or settings.crypto_segment_size,
+            version=KDF_VERSION,
+            salt=salt_data,
+            opslimit=opslimit,
+            memlimit=memlimit,
+            key_tag=derived_tag,
+        )
+
     @property
-    def metadata(self) -> Dict[str, str]:
+    def metadata(self) -> Dict[str, Any]:
         """Encryption additional data (nonce, etc.).
 
-        :returns: nonce for decrypt
+        :returns: key scheme and layout data for decrypt
         """
+        if self._version >= KDF_VERSION:
+            return {
+                "version": self._version,
+                "salt": base64.b85encode(self._salt or b"").decode(),
+                "opslimit": self._opslimit or settings.crypto_kdf_opslimit,
+                "memlimit": self._memlimit or settings.crypto_kdf_memlimit,
+                "key_tag": base64.b85encode(self._key_tag or b"").decode(),
+                "segment_size": self._segment_size or settings.crypto_segment_size,
+            }
+
+        if self._segment_size:
+            return {"segment_size": self._segment_size}
+
         return {
             "nonce": base64.b85encode(self._nonce).decode(),
         }
@@ -60,6 +309,9 @@ class ChaCha20Poly1305:
         if isinstance(message_data, str):
             message_data = message_data.encode()
 
+        if self._segment_size:
+            return b"".join(self.encrypt_chunks([message_data]))
+
         return self._algorithm.encrypt(message_data, self._nonce)
 
     def decrypt(self, message_data: Union[str, bytes]) -> bytes:
@@ -71,4 +323,115 @@ class ChaCha20Poly1305:
         if isinstance(message_data, str):
             message_data = message_data.encode()
 
+        if self._segment_size:
+            return b"".join(self.decrypt_chunks([message_data]))
+
         return self._algorithm.decrypt(message_data)
+
+    @property
+    def _segment_aad(self) -> Optional[bytes]:
+        """Additional data bound to segments (since key scheme version 2).
+
+        :returns: aad or none
+        """
+        return self._aad if self._version >= KDF_VERSION else None
+
+    def encryptor(self) -> SegmentEncryptor:
+        """Incremental encryptor (cipher must be in segmented mode).
+
+        :returns: new encryptor
+        :raises ValueError: if cipher isn't in segmented mode
+        """
+        if not self._segment_size:
+            raise ValueError("Cipher isn't in segmented mode")
+
+        return SegmentEncryptor(self._key, self._segment_size, self._segment_aad)
+
+    def decryptor(self) -> SegmentDecryptor:
+        """Incremental decryptor (cipher must be in segmented mode).
+
+        :returns: new decryptor
+        :raises ValueError: if cipher isn't in segmented mode
+        """
+        if not self._segment_size:
+            raise ValueError("Cipher isn't in segmented mode")
+
+        return SegmentDecryptor(self._key, self._segment_size, self._segment_aad)
+
+    def encrypt_chunks(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Encrypt data chunks (cipher must be in segmented mode).
+
+        :param chunks: plain data chunks of any size
+        :yields: encrypted data chunks
+        """
+        encryptor = self.encryptor()
+
+        for chunk in chunks:
+            encrypted_chunk = encryptor.update(chunk)
+
+            if encrypted_chunk:
+                yield encrypted_chunk
+
+        yield encryptor.finalize()
+
+    def decrypt_chunks(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Decrypt chunks of encrypt_chunks output (any chunk size).
+
+        :param chunks: encrypted data chunks
+        :yields: decrypted data chunks
+        """
+        if not self._segment_size:
+            yield self.decrypt(b"".join(chunks))
+            return
+
+        decryptor = self.decryptor()
+
+        for chunk in chunks:
+            decrypted_chunk = decryptor.update(chunk)
+
+            if decrypted_chunk:
+                yield decrypted_chunk
+
+        yield decryptor.finalize()
+
+    async def encrypt_stream(
+        self,
+        chunks: AsyncIterable[bytes],
+    ) -> AsyncIterator[bytes]:
+        """Encrypt stream of data chunks (cipher must be in segmented mode).
+
+        :param chunks: plain data chunks of any size
+        :yields: encrypted data chunks
+        """
+        encryptor = self.encryptor()
+
+        async for chunk in chunks:
+            encrypted_chunk = encryptor.update(chunk)
+
+            if encrypted_chunk:
+                yield encrypted_chunk
+
+        yield encryptor.finalize()
+
+    async def decrypt_stream(
+        self,
+        chunks: AsyncIterable[bytes],
+    ) -> AsyncIterator[bytes]:
+        """Decrypt stream of encrypt_stream chunks (any chunk size).
+
+        :param chunks: encrypted data chunks
+        :yields: decrypted data chunks
+        """
+        if not self._segment_size:
+            yield self.decrypt(b"".join([chunk async for chunk in chunks]))
+            return
+
+        decryptor = self.decryptor()
+
+        async for chunk in chunks:
+            decrypted_chunk = decryptor.update(chunk)
+
+            if decrypted_chunk:
+                yield decrypted_chunk
+
+        yield decryptor.finalize()
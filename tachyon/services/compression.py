@@ -0,0 +1,133 @@
+import asyncio
+import lzma
+import zlib
+from enum import Enum
+from typing import AsyncIterable, AsyncIterator, Optional, Union
+
+# bytes of content prefix compressed first to detect incompressible content
+SAMPLE_SIZE = 64 * 1024
+# compressed content is stored only if it's smaller than this part of original
+MAX_RATIO = 0.9
+# bytes of content (de)compressed in event loop, larger content is
+# (de)compressed in thread (codecs release GIL)
+INLINE_SIZE = 64 * 1024
+
+
+class NoteCodec(str, Enum):  # noqa: WPS600
+    """Enum of note content compression codecs."""
+
+    # fast, moderate ratio
+    zlib = "zlib"
+    # slow, better ratio for large texts
+    lzma = "lzma"
+
+
+def compress(content: bytes, codec: NoteCodec, level: int) -> Optional[bytes]:
+    """Compress content if it's compressible.
+
+    Large content is checked by its compressed prefix first, so content
+    like random or already compressed data isn't compressed whole.
+
+    :param content: content bytes
+    :param codec: compression codec
+    :param level: compression level (0-9)
+    :return: compressed content or none if it isn't smaller enough
+    """
+    if len(content) > SAMPLE_SIZE * 2:
+        sample = zlib.compress(content[:SAMPLE_SIZE], 1)
+
+        if len(sample) > SAMPLE_SIZE * MAX_RATIO:
+            return None
+
+    if codec == NoteCodec.lzma:
+        compressed = lzma.compress(content, preset=level)
+    else:
+        compressed = zlib.compress(content, level)
+
+    if len(compressed) > len(content) * MAX_RATIO:
+        return None
+
+    return compressed
+
+
+async def compress_async(
+    content: bytes,
+    codec: NoteCodec,
+    level: int,
+) -> Optional[bytes]:
+    """Compress content if it's compressible (large content - in thread).
+
+    :param content: content bytes
+    :param codec: compression codec
+    :param level: compression level (0-9)
+    :return: compressed content or none if it isn't smaller enough
+    """
+    if len(content) <= INLINE_SIZE:
+        return compress(content, codec, level)
+
+    return await asyncio.get_event_loop().run_in_executor(
+        None,
+        compress,
+        content,
+        codec,
+        level,
+    )
+
+
+def decompress(content: bytes, codec: Union[NoteCodec, str]) -> bytes:
+    """Decompress content.
+
+    :param content: compressed content
+    :param codec: compression codec
+    :return: content bytes
+    """
+    if codec == NoteCodec.lzma:
+        return lzma.decompress(content)
+
+    return zlib.decompress(content)
+
+
+async def decompress_async(content: bytes, codec: Union[NoteCodec, str]) -> bytes:
+    """Decompress content (large content - in thread).
+
+    :param content: compressed content
+    :param codec: compression codec
+    :return: content bytes
+    """
+    if len(content) <= INLINE_SIZE:
+        return decompress(content, codec)
+
+    return await asyncio.get_event_loop().run_in_executor(
+        None,
+        decompress,
+        content,
+        codec,
+    )
+
+
+async def decompress_stream(
+    chunks: AsyncIterable[bytes],
+    codec: Union[NoteCodec, str],
+) -> AsyncIterator[bytes]:
+    """Decompress stream of compressed content chunks.
+
+    :param chunks: compressed content chunks
+    :param codec: compression codec
+    :yields: content chunks
+    """
+    decompressor = (
+        lzma.LZMADecompressor() if codec == NoteCodec.lzma else zlib.decompressobj()
+    )
+
+    async for chunk in chunks:
+        data = decompressor.decompress(chunk)
+
+        if data:
+            yield data
+
+    # lzma decompressor returns all data on decompress
+    if not isinstance(decompressor, lzma.LZMADecompressor):
+        tail = decompressor.flush()
+
+        if tail:
+            yield tail
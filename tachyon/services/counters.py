@@ -0,0 +1,41 @@
+import time
+from collections import deque
+from typing import Deque, List
+
+
+class RateCounter:
+    """In-process counter of events in sliding time window (per-second buckets)."""
+
+    def __init__(self, window: int = 60) -> None:
+        self.window = window
+
+        # [second, events]
+        self._buckets: Deque[List[int]] = deque()
+
+    @property
+    def value(self) -> int:
+        """Quantity of events in last window.
+
+        :return: events count
+        """
+        self._trim(int(time.monotonic()))
+
+        return sum(events for _, events in self._buckets)
+
+    def add(self, events: int = 1) -> None:
+        """Count events at current second.
+
+        :param events: quantity of events
+        """
+        second = int(time.monotonic())
+
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += events
+        else:
+            self._buckets.append([second, events])
+
+        self._trim(second)
+
+    def _trim(self, second: int) -> None:
+        while self._buckets and self._buckets[0][0] <= second - self.window:
+            self._buckets.popleft()
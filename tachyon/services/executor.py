@@ -0,0 +1,92 @@
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from http import HTTPStatus
+from typing import Any, Callable, Optional
+
+from tachyon.exceptions.services.executor import ExecutorSaturatedError
+
+
+class ExecutorKind(str, Enum):  # noqa: WPS600
+    """Enum of executor kinds."""
+
+    process = "process"
+    thread = "thread"
+
+
+class BoundedExecutor:
+    """Pool for CPU-bound calls with limited queue depth.
+
+    Pool is created on first call, tasks over ``max_workers + queue_size``
+    are rejected immediately instead of waiting in unbounded queue.
+    """
+
+    def __init__(
+        self,
+        kind: ExecutorKind = ExecutorKind.process,
+        max_workers: int = 1,
+        queue_size: int = 0,
+    ) -> None:
+        self.kind = kind
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+
+        self.pending = 0
+
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """Get or create pool of executor kind.
+
+        :return: executor pool
+        """
+        if not self._executor:
+            pool_class = (
+                ProcessPoolExecutor
+                if self.kind == ExecutorKind.process
+                else ThreadPoolExecutor
+            )
+
+            self._executor = pool_class(max_workers=self.max_workers)
+
+        return self._executor
+
+    @property
+    def max_pending(self) -> int:
+        """Max quantity of running and queued tasks.
+
+        :return: tasks limit
+        """
+        return self.max_workers + self.queue_size
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run function in pool (function and args must be picklable for process).
+
+        :param func: blocking callable
+        :param args: positional arguments for callable
+        :return: callable result
+        :raises ExecutorSaturatedError: if pool queue is full
+        """
+        if self.pending >= self.max_pending:
+            raise ExecutorSaturatedError(
+                "Server is busy, try again later.",
+                http_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            )
+
+        self.pending += 1
+
+        try:
+            return await asyncio.get_event_loop().run_in_executor(
+                self.executor,
+                functools.partial(func, *args),
+            )
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        """Shutdown pool (it will be re-created on next call)."""
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
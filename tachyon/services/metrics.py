@@ -0,0 +1,285 @@
+"""In-process metrics in Prometheus text format.
+
+Metrics are per worker process (as other in-process stats), every sample is
+a few dict and list operations without locks (see benchmarks/metrics_overhead.py).
+"""
+import bisect
+import functools
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from types import TracebackType
+from typing import Any, Callable, DefaultDict, Dict, List, Optional, Tuple, Type
+
+# seconds
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+
+    pairs = (
+        '{0}="{1}"'.format(
+            name,
+            value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in zip(names, values)
+    )
+
+    return "{{{0}}}".format(",".join(pairs))
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self.metrics: List["Metric"] = []
+
+    def register(self, metric: "Metric") -> None:
+        """Add metric to registry.
+
+        :param metric: metric
+        """
+        self.metrics.append(metric)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format.
+
+        :return: metrics text
+        """
+        lines = []
+
+        for metric in self.metrics:
+            lines.append("# HELP {0} {1}".format(metric.name, metric.documentation))
+            lines.append("# TYPE {0} {1}".format(metric.name, metric.kind))
+            lines.extend(metric.samples())
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class Metric(ABC):
+    """Base abstract-class for metrics."""
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        metrics_registry: Registry = registry,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+
+        metrics_registry.register(self)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Lines of metric samples."""
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._values: DefaultDict[LabelValues, float] = defaultdict(float)
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increase value.
+
+        :param label_values: values of metric labels (in order of labels)
+        :param amount: increment
+        """
+        self._values[label_values] += amount
+
+    def get(self, *label_values: str) -> float:
+        """Current value.
+
+        :param label_values: values of metric labels (in order of labels)
+        :return: value
+        """
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> List[str]:
+        """Lines of metric samples.
+
+        :return: sample lines
+        """
+        return [
+            "{0}{1} {2}".format(self.name, _format_labels(self.labels, labels), value)
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    """Value which goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        """Decrease value.
+
+        :param label_values: values of metric labels (in order of labels)
+        :param amount: decrement
+        """
+        self._values[label_values] -= amount
+
+
+class Histogram(Metric):
+    """Distribution of values (usually durations) by buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        *args: Any,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+
+        self.buckets = buckets
+        # labels -> [count of every bucket (not cumulative), +Inf, sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Add value to distribution.
+
+        :param value: observed value
+        :param label_values: values of metric labels (in order of labels)
+        """
+        series = self._values.get(label_values)
+
+        if series is None:
+            series = [0] * (len(self.buckets) + 3)
+            self._values[label_values] = series
+
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def time(self, *label_values: str) -> "_Timer":
+        """Context manager which observes duration of its block.
+
+        :param label_values: values of metric labels (in order of labels)
+        :return: timer context manager
+        """
+        return _Timer(self, label_values)
+
+    def timed(self, *label_values: str) -> Callable[[Any], Any]:
+        """Decorator which observes duration of coroutine function call.
+
+        :param label_values: values of metric labels (in order of labels)
+        :return: decorator
+        """
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:  # noqa: WPS430
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: WPS430
+                with self.time(*label_values):
+                    return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def get(self, *label_values: str) -> Tuple[int, float]:
+        """Count and sum of observed values.
+
+        :param label_values: values of metric labels (in order of labels)
+        :return: count and sum
+        """
+        series = self._values.get(label_values)
+
+        if series is None:
+            return 0, 0
+
+        return int(series[-1]), series[-2]
+
+    def samples(self) -> List[str]:
+        """Lines of metric samples.
+
+        :return: sample lines
+        """
+        lines = []
+
+        for labels, series in self._values.items():
+            cumulative = 0.0
+
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                lines.append(
+                    "{0}_bucket{1} {2}".format(
+                        self.name,
+                        _format_labels((*self.labels, "le"), (*labels, str(bound))),
+                        int(cumulative),
+                    ),
+                )
+
+            lines.append(
+                "{0}_sum{1} {2}".format(
+                    self.name,
+                    _format_labels(self.labels, labels),
+                    series[-2],
+                ),
+            )
+            lines.append(
+                "{0}_count{1} {2}".format(
+                    self.name,
+                    _format_labels(self.labels, labels),
+                    int(series[-1]),
+                ),
+            )
+
+        return lines
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_label_values", "_started")
+
+    def __init__(self, histogram: Histogram, label_values: LabelValues) -> None:
+        self._histogram = histogram
+        self._label_values = label_values
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._histogram.observe(
+            time.perf_counter() - self._started,
+            *self._label_values,
+        )
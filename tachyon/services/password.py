@@ -0,0 +1,67 @@
+import nacl.exceptions
+import nacl.pwhash
+import nacl.pwhash.argon2id
+
+from tachyon.services.executor import BoundedExecutor
+from tachyon.settings import settings
+
+password_executor = BoundedExecutor(
+    kind=settings.password_executor,
+    max_workers=settings.password_executor_workers,
+    queue_size=settings.password_executor_queue_size,
+)
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    try:
+        return nacl.pwhash.verify(password_hash.encode(), password.encode())
+    except nacl.exceptions.InvalidkeyError:
+        return False
+
+
+def _derive(
+    password: str, size: int, salt: bytes, opslimit: int, memlimit: int
+) -> bytes:
+    return nacl.pwhash.argon2id.kdf(
+        size,
+        password.encode(),
+        salt,
+        opslimit=opslimit,
+        memlimit=memlimit,
+    )
+
+
+async def password_check(password: str, password_hash_value: str) -> bool:
+    """Verify password by argon2 hash in password executor.
+
+    :param password: password for check
+    :param password_hash_value: argon2 password hash string
+    :return: password matched or not
+    """
+    return await password_executor.run(_verify, password, password_hash_value)
+
+
+async def password_derive(
+    password: str,
+    size: int,
+    salt: bytes,
+    opslimit: int,
+    memlimit: int,
+) -> bytes:
+    """Derive key material from password with argon2id in password executor.
+
+    :param password: password for derive
+    :param size: bytes of key material
+    :param salt: random salt
+    :param opslimit: argon2id operations limit
+    :param memlimit: argon2id memory limit
+    :return: key material
+    """
+    return await password_executor.run(
+        _derive,
+        password,
+        size,
+        salt,
+        opslimit,
+        memlimit,
+    )
@@ -0,0 +1,22 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger("periodic")
+
+
+async def run_periodically(func: Callable[[], Awaitable[Any]], interval: float) -> None:
+    """Call coroutine function every interval seconds until task is cancelled.
+
+    Errors of single call are logged and don't stop next calls.
+
+    :param func: coroutine function without arguments
+    :param interval: seconds between calls
+    """
+    while True:  # noqa: WPS457
+        await asyncio.sleep(interval)
+
+        try:
+            await func()
+        except Exception as exc:
+            logger.exception(exc)
@@ -0,0 +1,245 @@
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+# buckets of memory limiter, least recently used are dropped over it
+MEMORY_MAX_BUCKETS = 100000
+# acquires between deletions of refilled buckets of sqlite limiter
+SQLITE_CLEANUP_INTERVAL = 1000
+
+
+class RateLimitBackend(str, Enum):  # noqa: WPS600
+    """Enum of rate limiter backends."""
+
+    # buckets of worker process
+    memory = "memory"
+    # buckets in local sqlite file shared by workers of host
+    sqlite = "sqlite"
+
+
+def _take(
+    tokens: float,
+    elapsed: float,
+    rate: float,
+    burst: int,
+) -> Tuple[float, float]:
+    # refill bucket and take one token if bucket has it
+    tokens = min(burst, tokens + elapsed * rate)
+
+    if tokens >= 1:
+        return tokens - 1, 0
+
+    return tokens, (1 - tokens) / rate
+
+
+def _give(tokens: float, elapsed: float, rate: float, burst: int) -> float:
+    # refill bucket and return one token to it
+    return min(burst, tokens + elapsed * rate + 1)
+
+
+class RateLimiter(ABC):
+    """Base abstract-class for token buckets by key.
+
+    Bucket has ``burst`` tokens, refilled at ``rate``.
+    """
+
+    # calls may wait for other processes, so they are run in thread
+    blocking = False
+
+    @abstractmethod
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take token from bucket of key.
+
+        :param key: bucket key
+        :param rate: tokens added to bucket per second
+        :param burst: bucket capacity
+        """
+
+    @abstractmethod
+    def refund(self, key: str, rate: float, burst: int) -> None:
+        """Return token taken by acquire to bucket of key.
+
+        :param key: bucket key
+        :param rate: tokens added to bucket per second
+        :param burst: bucket capacity
+        """
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Token buckets of worker process (limits are per worker)."""
+
+    def __init__(self, max_buckets: int = MEMORY_MAX_BUCKETS) -> None:
+        self.max_buckets = max_buckets
+
+        # key -> (tokens, monotonic time of update), in order of use
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take token from bucket of key.
+
+        :param key: bucket key
+        :param rate: tokens added to bucket per second
+        :param burst: bucket capacity
+        :return: 0 if token is taken, else seconds until bucket has token
+        """
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens, wait = _take(tokens, now - updated, rate, burst)
+
+        self._buckets[key] = (tokens, now)
+
+        if len(self._buckets) > self.max_buckets:
+            del self._buckets[next(iter(self._buckets))]  # noqa: WPS420
+
+        return wait
+
+    def refund(self, key: str, rate: float, burst: int) -> None:
+        """Return token taken by acquire to bucket of key.
+
+        :param key: bucket key
+        :param rate: tokens added to bucket per second
+        :param burst: bucket capacity
+        """
+        now = time.monotonic()
+        bucket = self._buckets.pop(key, None)
+
+        # dropped bucket is full already
+        if bucket is not None:
+            tokens, updated = bucket
+            self._buckets[key] = (_give(tokens, now - updated, rate, burst), now)
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """Token buckets in local sqlite file shared by worker processes of host.
+
+    Every acquire is one short transaction in local file (no network round
+    trip), connection is opened by process on first acquire. Transaction
+    waits for lock of file held by other workers, so calls are blocking.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+        self._acquires = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get or open connection to buckets database.
+
+        :return: sqlite connection
+        """
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            # buckets aren't worth fsync
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    full_at REAL NOT NULL
+                )
+                """,
+            )
+            self._connection = connection
+
+        return self._connection
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take token from bucket of key.
+
+        :param key: bucket key
+        :param rate: tokens added to bucket per second
+        :param burst: bucket capacity
+        :return: 0 if token is taken, else seconds until bucket has token
+        """
+        with self._lock:
+            connection = self.connection
+            # wall clock is shared by processes (monotonic clock isn't)
+            now = time.time()
+
+            connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                row = connection.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                tokens, updated = row if row else (burst, now)
+                tokens, wait = _take(tokens, max(0, now - updated), rate, burst)
+
+                connection.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)",
+                    (key, tokens, now, now + (burst - tokens) / rate),
+                )
+
+                self._acquires += 1
+
+                if not self._acquires % SQLITE_CLEANUP_INTERVAL:
+                    # full buckets are the same as missing ones
+                    connection.execute(
+                        "DELETE FROM buckets WHERE full_at < ?",
+                        (now,),
+                    )
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+            connection.execute("COMMIT")
+
+        return wait
+
+    def refund(self, key: str, rate: float, burst: int) -> None:
+        """Return token taken by acquire to bucket of key.
+
+        :param key: bucket key
+        :param rate: tokens added to bucket per second
+        :param burst: bucket capacity
+        """
+        with self._lock:
+            connection = self.connection
+            now = time.time()
+
+            connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                row = connection.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?",
+                    (key,),
+                ).fetchone()
+
+                if row:
+                    tokens = _give(row[0], max(0, now - row[1]), rate, burst)
+
+                    connection.execute(
+                        "UPDATE buckets SET tokens = ?, updated = ?, full_at = ? "
+                        + "WHERE key = ?",
+                        (tokens, now, now + (burst - tokens) / rate, key),
+                    )
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+            connection.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close connection (it will be re-opened on next acquire)."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
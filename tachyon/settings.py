@@ -1,16 +1,34 @@
+import os
 from pathlib import Path
 from tempfile import gettempdir
 from typing import Optional
 
 from pydantic import BaseSettings, Field
 
+from tachyon.db.backends import StorageBackend
+from tachyon.services.compression import NoteCodec
+from tachyon.services.executor import ExecutorKind
+from tachyon.services.ratelimit import RateLimitBackend
+
 TEMP_DIR = Path(gettempdir())
 
 
 class Settings(BaseSettings):
     """Application settings."""
 
+    # database of notes, "cloudant", "sqlite" (local file, single node)
+    # or "memory" (tests and benchmarks)
+    storage_backend: StorageBackend = StorageBackend.cloudant
+    # file of sqlite backend database
+    storage_sqlite_path: str = Field(default=str(TEMP_DIR / "tachyon.sqlite3"))
+    # seconds of simulated round trip of every request to memory backend
+    storage_memory_latency: float = Field(default=0, ge=0)
+
     cloudant_service_name: str = "TACHYON_DB"
+    # keep-alive connections (and threads serving them) per worker
+    cloudant_pool_size: int = 100
+    # connections opened on worker startup (not more than pool size)
+    cloudant_warm_up_connections: int = Field(default=10, ge=0)
 
     host: str = "127.0.0.1"
     port: int = 8000
@@ -19,9 +37,83 @@ class Settings(BaseSettings):
     # Enable uvicorn reloading
     reload: bool = False
 
+    # responses compressed with gzip from this size (bytes), 0 - not compressed
+    http_gzip_min_size: int = Field(default=1024, ge=0)
+    http_gzip_level: int = Field(default=6, ge=1, le=9)
+    # seconds of client cache of unlimited unencrypted notes
+    # (0 - revalidated by ETag on every read)
+    http_note_max_age: int = Field(default=60, ge=0)
+    # seconds of client cache of static files
+    http_static_max_age: int = Field(default=24 * 60 * 60, ge=0)
+
     server_crypto_secret: str = Field(default="super_secret")
+    # bytes of plaintext segment for encryption of new notes
+    crypto_segment_size: int = Field(default=64 * 1024, gt=0)
+    # argon2id cost of key derivation for new notes (default - interactive),
+    # stored in note metadata, so changes don't break existing notes
+    crypto_kdf_opslimit: int = Field(default=2, ge=1)
+    crypto_kdf_memlimit: int = Field(default=64 * 1024 * 1024, ge=8 * 1024)
+
+    # pool for password hashing (argon2), "process" or "thread"
+    password_executor: ExecutorKind = ExecutorKind.process
+    password_executor_workers: int = Field(default=os.cpu_count() or 1, ge=1)
+    # hashing tasks waiting for free worker, others rejected with 503
+    password_executor_queue_size: int = Field(default=64, ge=0)
+
+    # buckets of rate limiter, "memory" (limits per worker)
+    # or "sqlite" (local file, limits shared by workers of host)
+    ratelimit_backend: RateLimitBackend = RateLimitBackend.memory
+    # file of sqlite rate limiter buckets
+    ratelimit_sqlite_path: str = Field(
+        default=str(TEMP_DIR / "tachyon-ratelimit.sqlite3"),
+    )
+    # note requests per second of client address (and burst), 0 - unlimited
+    ratelimit_ip_rate: float = Field(default=20, ge=0)
+    ratelimit_ip_burst: int = Field(default=100, ge=1)
+    # wrong password attempts per second of note (and burst), 0 - unlimited
+    ratelimit_password_rate: float = Field(default=0.2, ge=0)
+    ratelimit_password_burst: int = Field(default=10, ge=1)
+    # encrypted notes created per second of client address (and burst),
+    # 0 - unlimited
+    ratelimit_encrypt_rate: float = Field(default=1, ge=0)
+    ratelimit_encrypt_burst: int = Field(default=20, ge=1)
 
     notes_base: str = Field(default="notes")
+    # bytes of note content
+    notes_max_size: int = Field(default=16 * 1024 * 1024, gt=0)
+    # codec of note content compression (before encryption), none - disabled;
+    # content which isn't compressible is stored as is
+    notes_compression: Optional[NoteCodec] = None
+    # bytes of content, smaller notes aren't compressed
+    notes_compression_min_size: int = Field(default=1024, ge=0)
+    notes_compression_level: int = Field(default=6, ge=0, le=9)
+    # bytes of chunk for streamed note download
+    notes_stream_chunk_size: int = Field(default=64 * 1024, gt=0)
+    # seconds of note lifetime if it isn't set on create, 0 - never expires
+    notes_default_ttl: int = Field(default=0, ge=0)
+    # seconds between deletions of expired notes, 0 - disabled
+    notes_sweep_interval: float = Field(default=0, ge=0)
+    # expired notes deleted by one bulk request
+    notes_sweep_batch_size: int = Field(default=100, ge=1)
+    # seconds of pause between bulk deletions (to leave database for requests)
+    notes_sweep_batch_delay: float = Field(default=0.1, ge=0)
+    # min seconds between database compactions after sweep, 0 - disabled
+    notes_compaction_interval: float = Field(default=3600, ge=0)
+    # notes in one bulk request
+    notes_bulk_max_items: int = Field(default=10000, ge=1)
+    # attempts to count note visit on concurrent reads (revision conflicts)
+    notes_visit_retries: int = Field(default=10, ge=1)
+    # seconds between writes of buffered visits of unlimited notes,
+    # 0 - count every visit of unlimited note on read
+    notes_visit_flush_interval: float = Field(default=0, ge=0)
+    # cache of unlimited unencrypted notes (total bytes of messages and notes),
+    # 0 - disabled; works only with buffered visits (notes_visit_flush_interval)
+    notes_cache_size: int = Field(default=0, ge=0)
+    # seconds
+    notes_cache_ttl: float = Field(default=60, gt=0)
+
+    # seconds of notes counts cache for stat (shared by worker)
+    notes_stat_cache_ttl: float = Field(default=5, gt=0)
 
     sentry_dsn: Optional[str] = None
     sentry_env: str = "develop"
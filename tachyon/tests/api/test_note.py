@@ -1,18 +1,30 @@
+import asyncio
+import base64
+import time
 import uuid
 from random import randint
+from typing import Any, Dict, List, Union
 
+import nacl.pwhash
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from ibm_cloud_sdk_core import ApiException
 from starlette import status
 
-from tachyon.db.dao.note_dao import NoteDAO
-from tachyon.db.models.note_model import NoteContentType
+from tachyon.db.client import cloudant_request_seconds
+from tachyon.db.dao.note_dao import CACHE_ENTRY_OVERHEAD, NoteDAO
+from tachyon.db.models.note_model import NoteContentType, NoteModel
 from tachyon.exceptions.dao.note import (
     NoteDAOEncryptPasswordError,
     NoteDAONotFound,
     NoteDAOSignError,
 )
+from tachyon.services.cache import LRUCache
+from tachyon.services.ciphers.chacha20poly1305 import KDF_VERSION, ChaCha20Poly1305
+from tachyon.services.compression import NoteCodec
+from tachyon.services.password import password_executor
+from tachyon.settings import settings
 
 
 @pytest.mark.asyncio
@@ -139,7 +151,8 @@ async def test_creation(
 
     assert instance.name == test_name
     assert instance.text != test_text.encode()
-    assert instance.encrypt_password_hash is not None
+    assert instance.encrypt_password_hash is None
+    assert instance.get_encrypt_metadata()["version"] == KDF_VERSION
     assert test_text == message
 
     with pytest.raises(NoteDAOEncryptPasswordError):
@@ -219,3 +232,767 @@ async def test_read(
     )
 
     assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_password_executor_saturated(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests encrypted note creation is rejected while hashing pool is full."""
+    monkeypatch.setattr(password_executor, "pending", password_executor.max_pending)
+
+    response = client.post(
+        fastapi_app.url_path_for("create_note"),
+        json={
+            "name": uuid.uuid4().hex,
+            "text": uuid.uuid4().hex,
+            "encrypt_password": uuid.uuid4().hex,
+            "is_encrypted": True,
+        },
+    )
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+@pytest.mark.asyncio
+async def test_creation_sign_conflict(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests note creation regenerates sign if it is already taken."""
+    test_text = uuid.uuid4().hex
+
+    dao = NoteDAO()
+
+    existing_sign = await dao.create(name=uuid.uuid4().hex, text=test_text)
+    fresh_sign = NoteDAO._generate_sign()  # noqa: WPS437
+
+    signs = iter([existing_sign, fresh_sign])
+    monkeypatch.setattr(NoteDAO, "_generate_sign", staticmethod(lambda: next(signs)))
+
+    sign = await dao.create(name=uuid.uuid4().hex, text=uuid.uuid4().hex)
+
+    assert sign == fresh_sign
+
+    _, message = await dao.read(sign=existing_sign)
+
+    assert message == test_text
+
+
+@pytest.mark.asyncio
+async def test_concurrent_read_visits_limit() -> None:
+    """Tests concurrent reads never exceed max number of visits."""
+    test_max_number_visits = 3
+
+    dao = NoteDAO()
+
+    sign = await dao.create(
+        name=uuid.uuid4().hex,
+        text=uuid.uuid4().hex,
+        max_number_visits=test_max_number_visits,
+    )
+
+    results = await asyncio.gather(
+        *(dao.read(sign=sign) for _ in range(test_max_number_visits * 4)),
+        return_exceptions=True,
+    )
+
+    errors = [result for result in results if isinstance(result, Exception)]
+
+    assert len(results) - len(errors) == test_max_number_visits
+    assert all(isinstance(error, NoteDAONotFound) for error in errors)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_coalesced() -> None:
+    """Tests concurrent reads of note share one fetch and one visits write."""
+    test_number_reads = 10
+
+    dao = NoteDAO()
+
+    sign = await dao.create(
+        name=uuid.uuid4().hex,
+        text=uuid.uuid4().hex,
+        max_number_visits=test_number_reads * 2,
+    )
+    requests_before = {
+        operation: cloudant_request_seconds.get(operation)[0]
+        for operation in ("get_document", "put_update")
+    }
+
+    results = await asyncio.gather(
+        *(dao.read(sign=sign) for _ in range(test_number_reads)),
+    )
+
+    assert sorted(note.current_number_visits for note, _ in results) == list(
+        range(1, test_number_reads + 1),
+    )
+    assert len({id(note) for note, _ in results}) == test_number_reads
+    assert all(
+        cloudant_request_seconds.get(operation)[0] - count == 1
+        for operation, count in requests_before.items()
+    )
+
+
+@pytest.mark.parametrize("codec", list(NoteCodec))
+@pytest.mark.parametrize("is_encrypted", [True, False])
+def test_compression(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    codec: NoteCodec,
+    is_encrypted: bool,
+) -> None:
+    """Tests note content is compressed (before encryption) and read as is."""
+    monkeypatch.setattr(settings, "notes_compression", codec)
+    monkeypatch.setattr(settings, "notes_compression_min_size", 1024)
+
+    test_password = uuid.uuid4().hex
+    test_texts = [uuid.uuid4().hex * 1000, uuid.uuid4().hex]
+    cloudant = NoteDAO._client_instance.sync  # type: ignore  # noqa: WPS437
+
+    for test_text, compressed in zip(test_texts, (True, False)):
+        response = client.post(
+            fastapi_app.url_path_for("create_note"),
+            json={
+                "name": uuid.uuid4().hex,
+                "text": test_text,
+                "max_number_visits": 2,
+                "is_encrypted": is_encrypted,
+                "encrypt_password": test_password,
+            },
+        )
+        sign = response.json()["sign"]
+
+        document = cloudant.get_document(
+            db=settings.notes_base,
+            doc_id=sign,
+            attachments=True,
+        ).get_result()
+        stored = base64.b64decode(document["_attachments"]["body"]["data"])
+
+        assert document.get("content_codec") == (codec if compressed else None)
+        assert (len(stored) < len(test_text) // 10) is compressed
+
+        response = client.get(
+            fastapi_app.url_path_for("read_note", sign=sign),
+            params={"password": test_password},
+        )
+
+        assert response.json()["message"] == test_text
+
+        response = client.get(
+            fastapi_app.url_path_for("read_note_stream", sign=sign),
+            params={"password": test_password},
+        )
+
+        assert response.content == test_text.encode()
+
+
+@pytest.mark.asyncio
+async def test_buffered_visits(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests visits of unlimited notes are written only on flush."""
+    monkeypatch.setattr(settings, "notes_visit_flush_interval", 1)
+
+    dao = NoteDAO()
+
+    sign = await dao.create(name=uuid.uuid4().hex, text=uuid.uuid4().hex)
+    test_number_visits = randint(5, 25)
+
+    for _ in range(test_number_visits):
+        await dao.read(sign=sign)
+
+    note = (
+        await dao._client.get_document(db=dao._base_name, doc_id=sign)  # noqa: WPS437
+    ).get_result()
+
+    assert note["current_number_visits"] == 0
+
+    await dao.flush_visits()
+
+    note = (
+        await dao._client.get_document(db=dao._base_name, doc_id=sign)  # noqa: WPS437
+    ).get_result()
+
+    assert note["current_number_visits"] == test_number_visits
+
+
+@pytest.mark.asyncio
+async def test_buffered_visits_flush_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests buffered visits aren't lost if their flush fails."""
+    monkeypatch.setattr(settings, "notes_visit_flush_interval", 1)
+
+    dao = NoteDAO()
+
+    sign = await dao.create(name=uuid.uuid4().hex, text=uuid.uuid4().hex)
+    test_number_visits = randint(5, 25)
+
+    for _ in range(test_number_visits):
+        await dao.read(sign=sign)
+
+    def failing_bulk_docs(*args: Any, **kwargs: Any) -> Any:  # noqa: WPS430
+        raise ApiException(status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    with monkeypatch.context() as failing:
+        failing.setattr(dao._client.sync, "post_bulk_docs", failing_bulk_docs)
+
+        with pytest.raises(ApiException):
+            await dao.flush_visits()
+
+    assert dao._buffered_visits[sign] == test_number_visits  # noqa: WPS437
+
+    await dao.flush_visits()
+
+    note = (
+        await dao._client.get_document(db=dao._base_name, doc_id=sign)  # noqa: WPS437
+    ).get_result()
+
+    assert note["current_number_visits"] == test_number_visits
+
+
+@pytest.mark.asyncio
+async def test_cache(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests only unlimited unencrypted notes are cached."""
+    monkeypatch.setattr(settings, "notes_visit_flush_interval", 1)
+    monkeypatch.setattr(NoteDAO, "_cache", LRUCache(max_size=64 * 1024, ttl=60))
+
+    dao = NoteDAO()
+    # non-ascii message is cached by size in bytes
+    test_text = "заметка {0}".format(uuid.uuid4().hex)
+
+    sign = await dao.create(name=uuid.uuid4().hex, text=test_text)
+    limited_sign = await dao.create(
+        name=uuid.uuid4().hex,
+        text=test_text,
+        max_number_visits=2,
+    )
+    encrypted_sign = await dao.create(
+        name=uuid.uuid4().hex,
+        text=test_text,
+        is_encrypted=True,
+        encrypt_password=test_text,
+    )
+
+    for _ in range(2):
+        for test_sign in (sign, limited_sign, encrypted_sign):
+            _, message = await dao.read(sign=test_sign, password=test_text)
+
+            assert message == test_text
+
+    response = client.get(fastapi_app.url_path_for("cache_stat"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["items"] == 1
+    assert response.json()["hits"] == 1
+    assert NoteDAO._cache.size == (  # noqa: WPS437
+        len(test_text.encode()) + CACHE_ENTRY_OVERHEAD
+    )
+
+    with pytest.raises(NoteDAONotFound):
+        await dao.read(sign=limited_sign)
+
+
+def test_conditional_read(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests unlimited unencrypted notes are revalidated by ETag from cache."""
+    monkeypatch.setattr(settings, "notes_visit_flush_interval", 1)
+    monkeypatch.setattr(NoteDAO, "_cache", LRUCache(max_size=64 * 1024, ttl=60))
+
+    signs = [
+        client.post(
+            fastapi_app.url_path_for("create_note"),
+            json={
+                "name": uuid.uuid4().hex,
+                "text": uuid.uuid4().hex,
+                "max_number_visits": max_number_visits,
+            },
+        ).json()["sign"]
+        for max_number_visits in (0, 2)
+    ]
+    url, limited_url = (
+        fastapi_app.url_path_for("read_note", sign=sign) for sign in signs
+    )
+
+    response = client.get(url)
+    etag = response.headers["ETag"]
+
+    assert response.headers["Cache-Control"] == "private, max-age={0}".format(
+        settings.http_note_max_age,
+    )
+
+    fetches = cloudant_request_seconds.get("get_document")[0]
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+    assert response.headers["ETag"] == etag
+    assert cloudant_request_seconds.get("get_document")[0] == fetches
+
+    response = client.get(url, headers={"If-None-Match": 'W/"other"'})
+
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client.get(limited_url, headers={"If-None-Match": "*"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+
+    fetches = cloudant_request_seconds.get("get_document")[0]
+    response = client.get(limited_url, headers={"If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_200_OK
+    # note which can't be cached isn't fetched for revalidation
+    assert cloudant_request_seconds.get("get_document")[0] == fetches + 1
+
+
+def test_conditional_read_without_cache(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests 304 (notes cache is disabled) doesn't count visit of note."""
+    visits: List[str] = []
+    visit = NoteDAO._visit
+
+    async def recorded_visit(self: NoteDAO, sign: str) -> int:  # noqa: WPS430
+        visits.append(sign)
+
+        return await visit(self, sign)
+
+    monkeypatch.setattr(NoteDAO, "_visit", recorded_visit)
+
+    sign = client.post(
+        fastapi_app.url_path_for("create_note"),
+        json={"name": uuid.uuid4().hex, "text": uuid.uuid4().hex},
+    ).json()["sign"]
+    url = fastapi_app.url_path_for("read_note", sign=sign)
+
+    etag = client.get(url).headers["ETag"]
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert visits == [sign]
+
+    response = client.get(
+        fastapi_app.url_path_for(
+            "read_note",
+            sign=NoteDAO._generate_sign(),  # noqa: WPS437
+        ),
+        headers={"If-None-Match": etag},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_response_compression(
+    fastapi_app: FastAPI,
+    client: TestClient,
+) -> None:
+    """Tests large responses are compressed with gzip."""
+    test_text = uuid.uuid4().hex * 1000
+
+    response = client.post(
+        fastapi_app.url_path_for("create_note"),
+        json={"name": uuid.uuid4().hex, "text": test_text},
+    )
+
+    assert "Content-Encoding" not in response.headers
+
+    url = fastapi_app.url_path_for("read_note", sign=response.json()["sign"])
+    response = client.get(url)
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert int(response.headers["Content-Length"]) < len(test_text) // 10
+    assert response.json()["message"] == test_text
+
+    response = client.get(url, headers={"Accept-Encoding": "identity"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.json()["message"] == test_text
+
+
+@pytest.mark.asyncio
+async def test_read_legacy_layout() -> None:
+    """Tests notes with b85 text inside document are still readable."""
+    test_text = uuid.uuid4().hex
+
+    dao = NoteDAO()
+    sign = NoteDAO._generate_sign()  # noqa: WPS437
+
+    await dao._client.put_document(  # noqa: WPS437
+        db=dao._base_name,  # noqa: WPS437
+        doc_id=sign,
+        document={
+            "sign": sign,
+            "name": uuid.uuid4().hex,
+            "text": base64.b85encode(test_text.encode()).decode(),
+        },
+    )
+
+    _, message = await dao.read(sign=sign)
+
+    assert message == test_text
+
+
+@pytest.mark.parametrize("is_encrypted", [False, True])
+def test_stream(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    is_encrypted: bool,
+) -> None:
+    """Tests streamed note creation and read (with and without encryption)."""
+    test_name = uuid.uuid4().hex
+    test_password = uuid.uuid4().hex
+    test_chunks = [uuid.uuid4().hex.encode() * randint(1, 5000) for _ in range(10)]
+    test_params: Dict[str, Union[str, int]] = {
+        "name": test_name,
+        "max_number_visits": 2,
+        "is_encrypted": str(is_encrypted).lower(),
+        "encrypt_password": test_password,
+    }
+
+    response = client.post(
+        fastapi_app.url_path_for("create_note_stream"),
+        params=test_params,
+        data=(chunk for chunk in test_chunks),
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+
+    sign = response.json()["sign"]
+
+    response = client.get(
+        fastapi_app.url_path_for("read_note", sign=sign),
+        params={"password": test_password},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["message"] == b"".join(test_chunks).decode()
+
+    url = fastapi_app.url_path_for("read_note_stream", sign=sign)
+
+    response = client.get(url, params={"password": test_password})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-Note-Name"] == test_name
+    assert response.content == b"".join(test_chunks)
+
+    response = client.get(url, params={"password": test_password})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_stream_max_size(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests streamed note larger than max size is rejected."""
+    monkeypatch.setattr(settings, "notes_max_size", 1024)
+
+    response = client.post(
+        fastapi_app.url_path_for("create_note_stream"),
+        params={"name": uuid.uuid4().hex},
+        data=(b"0" * 512 for _ in range(3)),
+    )
+
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.asyncio
+async def test_read_legacy_encryption() -> None:
+    """Tests notes encrypted before key derivation (version 1) are still read."""
+    test_text = uuid.uuid4().hex
+    test_password = uuid.uuid4().hex
+
+    cipher = ChaCha20Poly1305(test_password)
+
+    note = NoteModel(name=uuid.uuid4().hex, is_encrypted=True)
+    # password hash of version 1 (new notes don't have it)
+    note.encrypt_password_hash = nacl.pwhash.str(test_password.encode()).decode()
+    note.set_encrypt_metadata(cipher.metadata)
+    note.set_text(cipher.encrypt(test_text))
+
+    dao = NoteDAO()
+    sign, _ = await dao._insert(note.to_document())  # noqa: WPS437
+
+    with pytest.raises(NoteDAOEncryptPasswordError):
+        await dao.read(sign=sign, password=uuid.uuid4().hex)
+
+    _, message = await dao.read(sign=sign, password=test_password)
+
+    assert message == test_text
+
+
+@pytest.mark.asyncio
+async def test_bulk_creation(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests many notes creation in one request with per note errors."""
+    monkeypatch.setattr(NoteDAO, "BULK_BATCH_SIZE", 2)
+
+    test_texts = [uuid.uuid4().hex for _ in range(5)]
+    test_password = uuid.uuid4().hex
+
+    response = client.post(
+        fastapi_app.url_path_for("create_notes_bulk"),
+        json={
+            "notes": [
+                {"name": uuid.uuid4().hex, "text": test_texts[0]},
+                {
+                    "name": uuid.uuid4().hex,
+                    "text": test_texts[1],
+                    "is_encrypted": True,
+                    "encrypt_password": test_password,
+                },
+                {"name": uuid.uuid4().hex, "text": test_texts[2], "is_encrypted": True},
+                {"name": uuid.uuid4().hex, "text": test_texts[3]},
+                {"name": uuid.uuid4().hex, "text": test_texts[4]},
+            ],
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+
+    notes = response.json()["notes"]
+
+    assert [note["code"] for note in notes] == [200, 200, 400, 200, 200]
+    assert notes[2]["sign"] is None
+    assert notes[2]["error"]
+
+    dao = NoteDAO()
+
+    for index in (0, 1, 3, 4):
+        _, message = await dao.read(sign=notes[index]["sign"], password=test_password)
+
+        assert message == test_texts[index]
+
+    response = client.post(
+        fastapi_app.url_path_for("create_notes_bulk"),
+        json={"notes": []},
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def failed_derive(*args: Any, **kwargs: Any) -> Any:  # noqa: WPS430
+        raise RuntimeError("executor is broken")
+
+    monkeypatch.setattr(ChaCha20Poly1305, "derive", failed_derive)
+
+    # internal errors aren't returned as errors of notes
+    with pytest.raises(RuntimeError):
+        await dao.create_bulk(
+            [
+                {"name": uuid.uuid4().hex, "text": test_texts[0]},
+                {
+                    "name": uuid.uuid4().hex,
+                    "text": test_texts[1],
+                    "is_encrypted": True,
+                    "encrypt_password": test_password,
+                },
+            ],
+        )
+
+
+@pytest.mark.asyncio
+async def test_bulk_read(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests many notes read in one request with per note errors."""
+    monkeypatch.setattr(NoteDAO, "BULK_BATCH_SIZE", 2)
+
+    test_password = uuid.uuid4().hex
+    test_texts = [uuid.uuid4().hex for _ in range(4)]
+
+    dao = NoteDAO()
+
+    signs = [
+        await dao.create(name=uuid.uuid4().hex, text=test_texts[0]),
+        await dao.create(
+            name=uuid.uuid4().hex,
+            text=test_texts[1],
+            max_number_visits=1,
+        ),
+        await dao.create(
+            name=uuid.uuid4().hex,
+            text=test_texts[2],
+            max_number_visits=2,
+            is_encrypted=True,
+            encrypt_password=test_password,
+        ),
+        await dao.create(
+            name=uuid.uuid4().hex,
+            text=test_texts[3],
+            is_encrypted=True,
+            encrypt_password=test_password,
+        ),
+    ]
+    missing_sign = NoteDAO._generate_sign()  # noqa: WPS437
+
+    url = fastapi_app.url_path_for("read_notes_bulk")
+    request = {
+        "notes": [
+            {"sign": signs[0]},
+            {"sign": signs[1]},
+            {"sign": signs[2], "password": test_password},
+            {"sign": signs[3], "password": uuid.uuid4().hex},
+            {"sign": missing_sign},
+            {"sign": "wrong"},
+        ],
+    }
+
+    response = client.post(url, json=request)
+
+    assert response.status_code == status.HTTP_200_OK
+
+    notes = response.json()["notes"]
+
+    assert [notes[sign]["message"] for sign in signs] == test_texts[:3] + [None]
+    assert notes[signs[3]]["code"] == status.HTTP_400_BAD_REQUEST
+    assert notes[missing_sign]["code"] == status.HTTP_404_NOT_FOUND
+    assert notes["wrong"]["error"]
+
+    notes = client.post(url, json=request).json()["notes"]
+
+    assert notes[signs[0]]["message"] == test_texts[0]
+    assert notes[signs[1]]["code"] == status.HTTP_404_NOT_FOUND
+    assert notes[signs[2]]["message"] == test_texts[2]
+
+    notes = client.post(url, json=request).json()["notes"]
+
+    assert notes[signs[2]]["code"] == status.HTTP_404_NOT_FOUND
+
+    note, _ = await dao.read(sign=signs[0])
+
+    assert note.current_number_visits == 4
+
+
+@pytest.mark.asyncio
+async def test_bulk_read_conflict(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests bulk read counts visit by update function on write conflict."""
+    dao = NoteDAO()
+
+    sign = await dao.create(
+        name=uuid.uuid4().hex,
+        text=uuid.uuid4().hex,
+        max_number_visits=2,
+    )
+
+    original = NoteDAO._visited_document  # noqa: WPS437
+
+    def stale_document(note: NoteModel, document: Dict[str, Any]) -> Dict[str, Any]:
+        return {**original(note, document), "_rev": "1-stale"}
+
+    monkeypatch.setattr(NoteDAO, "_visited_document", staticmethod(stale_document))
+
+    results = await dao.read_bulk({sign: None})
+
+    note, _ = results[sign]  # type: ignore
+
+    assert note.current_number_visits == 1
+
+
+@pytest.mark.asyncio
+async def test_expiry(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests expired notes aren't readable and are deleted by sweeper."""
+    monkeypatch.setattr(settings, "notes_sweep_batch_size", 1)
+    monkeypatch.setattr(settings, "notes_sweep_batch_delay", 0)
+
+    dao = NoteDAO()
+
+    response = client.post(
+        fastapi_app.url_path_for("create_note"),
+        json={"name": uuid.uuid4().hex, "text": uuid.uuid4().hex, "ttl": 60},
+    )
+    expired_signs = [
+        response.json()["sign"],
+        await dao.create(name=uuid.uuid4().hex, text=uuid.uuid4().hex, ttl=30),
+    ]
+    alive_signs = [
+        await dao.create(name=uuid.uuid4().hex, text=uuid.uuid4().hex, ttl=3600),
+        await dao.create(name=uuid.uuid4().hex, text=uuid.uuid4().hex),
+    ]
+
+    assert await dao.sweep() == 0
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+
+    for sign in expired_signs:
+        with pytest.raises(NoteDAONotFound):
+            await dao.read(sign=sign)
+
+    assert await dao.sweep() == len(expired_signs)
+
+    for sign in expired_signs:
+        with pytest.raises(ApiException):
+            await dao._client.get_document(  # noqa: WPS437
+                db=dao._base_name,  # noqa: WPS437
+                doc_id=sign,
+            )
+
+    for sign in alive_signs:
+        await dao.read(sign=sign)
+
+
+def test_shared_client(
+    fastapi_app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests requests of worker share one client (database is populated once)."""
+    clients = []
+    put_database_calls = []
+    create_client = NoteDAO._create_client  # noqa: WPS437
+
+    def counting_create_client() -> Any:  # noqa: WPS430
+        cloudant_client = create_client()
+        put_database = cloudant_client.sync.put_database
+
+        def counting_put_database(*args: Any, **kwargs: Any) -> Any:  # noqa: WPS430
+            put_database_calls.append(args)
+
+            return put_database(*args, **kwargs)
+
+        monkeypatch.setattr(
+            cloudant_client.sync,
+            "put_database",
+            counting_put_database,
+        )
+        clients.append(cloudant_client)
+
+        return cloudant_client
+
+    NoteDAO.close_client()
+    monkeypatch.setattr(
+        NoteDAO,
+        "_create_client",
+        staticmethod(counting_create_client),
+    )
+
+    with TestClient(app=fastapi_app) as client:
+        response = client.post(
+            fastapi_app.url_path_for("create_note"),
+            json={"name": uuid.uuid4().hex, "text": uuid.uuid4().hex},
+        )
+        url = fastapi_app.url_path_for("read_note", sign=response.json()["sign"])
+
+        for _ in range(1000):
+            assert client.get(url).status_code == status.HTTP_200_OK
+
+    assert len(clients) == 1
+    assert len(put_database_calls) == 1
@@ -0,0 +1,306 @@
+import asyncio
+import functools
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette import status
+from starlette.responses import Response
+from starlette.types import Message, Receive, Scope, Send
+
+from tachyon.services.ciphers.chacha20poly1305 import ChaCha20Poly1305
+from tachyon.services.ratelimit import MemoryRateLimiter, SQLiteRateLimiter
+from tachyon.settings import settings
+from tachyon.web.utils.ratelimit import (
+    RateLimitMiddleware,
+    ratelimit_requests_total,
+    refund_password_attempt,
+    take_password_attempt,
+)
+
+
+def _recorded(
+    method: Callable[..., Any],
+    threads: List[threading.Thread],
+    *args: Any,
+) -> Any:
+    threads.append(threading.current_thread())
+
+    return method(*args)
+
+
+@pytest.fixture()
+def key_derivations(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """
+    Record key derivations (password hashing) of note ciphers.
+
+    :param monkeypatch: monkeypatch fixture.
+    :return: list of derived passwords.
+    """
+    derivations: List[str] = []
+    derive = ChaCha20Poly1305.derive
+
+    async def recorded_derive(  # noqa: WPS430
+        cls: Any,
+        password: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        derivations.append(password)
+
+        return await derive(password, *args, **kwargs)
+
+    monkeypatch.setattr(ChaCha20Poly1305, "derive", classmethod(recorded_derive))
+
+    return derivations
+
+
+def test_password_attempts(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    key_derivations: List[str],
+) -> None:
+    """Tests password attempts over limit of note are rejected before hashing."""
+    test_burst = 3
+    monkeypatch.setattr(settings, "ratelimit_password_burst", test_burst)
+    monkeypatch.setattr(settings, "ratelimit_password_rate", 0.01)
+
+    response = client.post(
+        fastapi_app.url_path_for("create_note"),
+        json={
+            "name": uuid.uuid4().hex,
+            "text": uuid.uuid4().hex,
+            "is_encrypted": True,
+            "encrypt_password": uuid.uuid4().hex,
+        },
+    )
+    url = fastapi_app.url_path_for("read_note", sign=response.json()["sign"])
+    rejected_before = ratelimit_requests_total.get("password", "rejected")
+
+    codes = [
+        client.get(url, params={"password": uuid.uuid4().hex}).status_code
+        for _ in range(test_burst + 2)
+    ]
+
+    assert codes[:test_burst] == [status.HTTP_400_BAD_REQUEST] * test_burst
+    assert codes[test_burst:] == [status.HTTP_429_TOO_MANY_REQUESTS] * 2
+    assert len(key_derivations) == test_burst + 1
+    assert ratelimit_requests_total.get("password", "rejected") - rejected_before == 2
+
+    response = client.post(
+        fastapi_app.url_path_for("read_notes_bulk"),
+        json={
+            "notes": [
+                {"sign": response.json()["sign"], "password": uuid.uuid4().hex},
+            ],
+        },
+    )
+
+    assert list(response.json()["notes"].values())[0]["code"] == (
+        status.HTTP_429_TOO_MANY_REQUESTS
+    )
+    assert len(key_derivations) == test_burst + 1
+
+
+def test_right_password_reads(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests reads with right password don't take tokens of password attempts."""
+    test_burst = 2
+    test_password = uuid.uuid4().hex
+    monkeypatch.setattr(settings, "ratelimit_password_burst", test_burst)
+    monkeypatch.setattr(settings, "ratelimit_password_rate", 0.01)
+
+    sign = client.post(
+        fastapi_app.url_path_for("create_note"),
+        json={
+            "name": uuid.uuid4().hex,
+            "text": uuid.uuid4().hex,
+            "is_encrypted": True,
+            "encrypt_password": test_password,
+        },
+    ).json()["sign"]
+    url = fastapi_app.url_path_for("read_note", sign=sign)
+
+    for _ in range(test_burst * 3):
+        assert client.get(url, params={"password": test_password}).status_code == (
+            status.HTTP_200_OK
+        )
+
+    response = client.post(
+        fastapi_app.url_path_for("read_notes_bulk"),
+        json={"notes": [{"sign": sign, "password": test_password}] * test_burst * 3},
+    )
+
+    assert response.json()["notes"][sign]["code"] == status.HTTP_200_OK
+
+    # wrong passwords still take tokens (last one is rejected before hashing)
+    codes = [
+        client.get(url, params={"password": uuid.uuid4().hex}).status_code
+        for _ in range(test_burst + 1)
+    ]
+
+    assert codes == [status.HTTP_400_BAD_REQUEST] * test_burst + [
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    ]
+
+
+def test_ip_limit(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests note requests of client over limit are rejected with Retry-After."""
+    test_burst = 5
+    monkeypatch.setattr(settings, "ratelimit_ip_burst", test_burst)
+    monkeypatch.setattr(settings, "ratelimit_ip_rate", 0.5)
+
+    url = fastapi_app.url_path_for("read_note", sign=uuid.uuid4().hex)
+
+    for _ in range(test_burst):
+        assert client.get(url).status_code != status.HTTP_429_TOO_MANY_REQUESTS
+
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["Retry-After"] == "2"
+    # monitoring isn't limited
+    assert client.get(fastapi_app.url_path_for("health_check")).status_code == (
+        status.HTTP_200_OK
+    )
+
+
+@pytest.mark.asyncio
+async def test_sqlite_in_thread(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Tests sqlite limiter (waiting for lock of file) doesn't block event loop."""
+    monkeypatch.setattr(settings, "ratelimit_password_burst", 1)
+    monkeypatch.setattr(settings, "ratelimit_password_rate", 0.01)
+
+    limiter = SQLiteRateLimiter(str(tmp_path / "ratelimit.sqlite3"))
+    threads: List[threading.Thread] = []
+
+    for method in ("acquire", "refund"):
+        monkeypatch.setattr(
+            limiter,
+            method,
+            functools.partial(_recorded, getattr(limiter, method), threads),
+        )
+
+    assert not await take_password_attempt(limiter, "sign")
+    assert await take_password_attempt(limiter, "sign")
+
+    await refund_password_attempt(limiter, "sign")
+
+    assert not await take_password_attempt(limiter, "sign")
+    assert threads and threading.main_thread() not in threads
+
+    limiter.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_password_attempts(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests concurrent password attempts can't outrun bucket of note."""
+    test_burst = 3
+    test_attempts = 10
+    monkeypatch.setattr(settings, "ratelimit_password_burst", test_burst)
+    monkeypatch.setattr(settings, "ratelimit_password_rate", 0.01)
+
+    hashed = []
+    codes = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:  # noqa: WPS430
+        hashed.append(scope)
+        # wrong password is hashed meanwhile other attempts come
+        await asyncio.sleep(0.01)
+        await Response(status_code=status.HTTP_400_BAD_REQUEST)(scope, receive, send)
+
+    async def receive() -> Message:  # noqa: WPS430
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:  # noqa: WPS430
+        if message["type"] == "http.response.start":
+            codes.append(message["status"])
+
+    middleware = RateLimitMiddleware(app, MemoryRateLimiter())
+
+    await asyncio.gather(
+        *(
+            middleware(
+                {
+                    "type": "http",
+                    "method": "GET",
+                    "path": "/api/note/sign/",
+                    "query_string": b"password=wrong",
+                    "headers": [],
+                    "client": ("127.0.0.1", 0),
+                },
+                receive,
+                send,
+            )
+            for _ in range(test_attempts)
+        ),
+    )
+
+    assert len(hashed) == test_burst
+    assert codes.count(status.HTTP_429_TOO_MANY_REQUESTS) == (
+        test_attempts - test_burst
+    )
+
+
+def test_encrypt_limit(
+    fastapi_app: FastAPI,
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests creation of encrypted notes over limit of client is rejected."""
+    test_burst = 2
+    monkeypatch.setattr(settings, "ratelimit_encrypt_burst", test_burst)
+    monkeypatch.setattr(settings, "ratelimit_encrypt_rate", 0.01)
+
+    def create(is_encrypted: bool) -> int:  # noqa: WPS430
+        return client.post(
+            fastapi_app.url_path_for("create_note"),
+            json={
+                "name": uuid.uuid4().hex,
+                "text": uuid.uuid4().hex,
+                "is_encrypted": is_encrypted,
+                "encrypt_password": uuid.uuid4().hex if is_encrypted else None,
+            },
+        ).status_code
+
+    assert [create(True) for _ in range(test_burst)] == [
+        status.HTTP_200_OK,
+    ] * test_burst
+    assert create(True) == status.HTTP_429_TOO_MANY_REQUESTS
+    # notes without password hashing aren't limited
+    assert create(False) == status.HTTP_200_OK
+
+    response = client.post(
+        fastapi_app.url_path_for("create_notes_bulk"),
+        json={
+            "notes": [
+                {"name": uuid.uuid4().hex, "text": uuid.uuid4().hex},
+                {
+                    "name": uuid.uuid4().hex,
+                    "text": uuid.uuid4().hex,
+                    "is_encrypted": True,
+                    "encrypt_password": uuid.uuid4().hex,
+                },
+            ],
+        },
+    )
+
+    assert [note["code"] for note in response.json()["notes"]] == [
+        status.HTTP_200_OK,
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    ]
@@ -0,0 +1,26 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tachyon.db.backends.memory import MemoryCloudant
+
+
+def test_latency() -> None:
+    """Tests latency of memory backend is simulated for concurrent requests."""
+    client = MemoryCloudant(latency=0.05)
+    client.put_database("test")
+
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        informations = list(
+            executor.map(
+                lambda _: client.get_database_information("test").get_result(),
+                range(10),
+            ),
+        )
+
+    elapsed = time.perf_counter() - started
+
+    assert all(information["doc_count"] == 0 for information in informations)
+    # requests wait in parallel (not one after another)
+    assert 0.05 <= elapsed < 0.5
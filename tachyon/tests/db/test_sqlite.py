@@ -0,0 +1,259 @@
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Generator, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from ibm_cloud_sdk_core import ApiException
+from starlette import status
+
+from tachyon.db.backends import StorageBackend
+from tachyon.db.backends.sqlite import SQLiteCloudant
+from tachyon.db.dao.note_dao import NoteDAO
+from tachyon.exceptions.dao.note import NoteDAONotFound
+from tachyon.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def sqlite_backend(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> Generator[None, None, None]:
+    """
+    Switch notes database to sqlite file.
+
+    :param monkeypatch: monkeypatch fixture.
+    :param tmp_path: temporary directory of test.
+    :yields: Nothing.
+    """
+    monkeypatch.setattr(settings, "storage_backend", StorageBackend.sqlite)
+    monkeypatch.setattr(
+        settings, "storage_sqlite_path", str(tmp_path / "notes.sqlite3")
+    )
+    NoteDAO.close_client()
+    NoteDAO()._connect()  # noqa: WPS437
+
+    yield
+
+    NoteDAO.close_client()
+
+
+def test_notes(fastapi_app: FastAPI, client: TestClient) -> None:
+    """Tests notes creation and read with sqlite backend."""
+    assert isinstance(
+        NoteDAO._client_instance.sync,  # type: ignore  # noqa: WPS437
+        SQLiteCloudant,
+    )
+
+    test_password = uuid.uuid4().hex
+    test_text = uuid.uuid4().hex * 1000
+
+    response = client.post(
+        fastapi_app.url_path_for("create_note"),
+        json={
+            "name": uuid.uuid4().hex,
+            "text": test_text,
+            "max_number_visits": 2,
+            "is_encrypted": True,
+            "encrypt_password": test_password,
+        },
+    )
+    url = fastapi_app.url_path_for("read_note", sign=response.json()["sign"])
+
+    response = client.get(url, params={"password": uuid.uuid4().hex})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    for _ in range(2):
+        response = client.get(url, params={"password": test_password})
+
+        assert response.json()["message"] == test_text
+
+    assert client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+    response = client.post(
+        fastapi_app.url_path_for("create_note_stream"),
+        params={"name": uuid.uuid4().hex},
+        data=(chunk for chunk in (b"a" * 100000, b"b" * 100000)),
+    )
+    url = fastapi_app.url_path_for("read_note_stream", sign=response.json()["sign"])
+
+    assert client.get(url).content == b"a" * 100000 + b"b" * 100000
+
+    response = client.get(fastapi_app.url_path_for("simple_stat"))
+
+    assert response.json()["current_notes_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk() -> None:
+    """Tests bulk creation and read with sqlite backend."""
+    dao = NoteDAO()
+    test_texts = [uuid.uuid4().hex for _ in range(10)]
+
+    signs = await dao.create_bulk(
+        [{"name": text, "text": text, "max_number_visits": 1} for text in test_texts],
+    )
+
+    results = await dao.read_bulk({sign: None for sign in signs})  # type: ignore
+
+    assert [results[sign][1] for sign in signs] == test_texts  # type: ignore
+
+    results = await dao.read_bulk({sign: None for sign in signs})  # type: ignore
+
+    assert all(isinstance(result, NoteDAONotFound) for result in results.values())
+
+
+@pytest.mark.asyncio
+async def test_sweep(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests expired notes are deleted with sqlite backend."""
+    dao = NoteDAO()
+
+    expired_sign = await dao.create(name="expired", text="expired", ttl=30)
+    alive_sign = await dao.create(name="alive", text="alive")
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 60)
+    monkeypatch.setattr(NoteDAO, "_compacted_at", None)
+
+    assert await dao.sweep() == 1
+
+    with pytest.raises(NoteDAONotFound):
+        await dao.read(expired_sign)
+
+    note, _ = await dao.read(alive_sign)
+
+    assert note.current_number_visits == 1
+
+
+def test_revisions(tmp_path: Path) -> None:
+    """Tests revision conflicts and attachment stubs of sqlite client."""
+    client = SQLiteCloudant(str(tmp_path / "revisions.sqlite3"))
+    client.put_database("test")
+
+    rev = client.put_document(
+        "test",
+        "doc",
+        {"_attachments": {"body": {"content_type": "text/plain", "data": "YWJj"}}},
+    ).get_result()["rev"]
+
+    with pytest.raises(ApiException) as exc_info:
+        client.put_document("test", "doc", {"field": 1})
+
+    assert exc_info.value.code == status.HTTP_409_CONFLICT
+
+    client.put_document(
+        "test",
+        "doc",
+        {"_rev": rev, "field": 1, "_attachments": {"body": {"stub": True}}},
+    )
+
+    document = client.get_document("test", "doc", attachments=True).get_result()
+
+    assert document["field"] == 1
+    assert document["_attachments"]["body"]["data"] == "YWJj"
+    assert document["_rev"].startswith("2-")
+
+    client.delete_document("test", "doc", rev=document["_rev"])
+
+    with pytest.raises(ApiException) as exc_info:
+        client.get_attachment("test", "doc", "body")
+
+    assert exc_info.value.code == status.HTTP_404_NOT_FOUND
+
+
+def test_attachment_chunks(tmp_path: Path) -> None:
+    """Tests attachment written and streamed in chunks by sqlite client."""
+    client = SQLiteCloudant(str(tmp_path / "chunks.sqlite3"))
+    client.put_database("test")
+
+    chunks = [uuid.uuid4().bytes * 1000 for _ in range(5)]
+    rev = client.put_attachment(
+        "test",
+        "doc",
+        "body",
+        iter(chunks),
+        "application/octet-stream",
+    ).get_result()["rev"]
+
+    document = client.get_document("test", "doc").get_result()
+
+    assert document["_attachments"]["body"]["length"] == len(b"".join(chunks))
+
+    response = client.get_attachment("test", "doc", "body", stream=True).get_result()
+
+    # stream reads snapshot of database, so deletion doesn't cut it
+    client.delete_document("test", "doc", rev=rev)
+
+    assert list(response.iter_content(chunk_size=len(chunks[0]))) == chunks
+
+    response.close()
+
+    with pytest.raises(ApiException) as exc_info:
+        client.get_attachment("test", "doc", "body")
+
+    assert exc_info.value.code == status.HTTP_404_NOT_FOUND
+
+
+def test_update_design_document(tmp_path: Path) -> None:
+    """Tests update function is run only if design document has it."""
+    client = SQLiteCloudant(str(tmp_path / "update.sqlite3"))
+    client.put_database("test")
+    client.put_document("test", "doc", {"max_number_visits": 2})
+
+    with pytest.raises(ApiException) as exc_info:
+        client.put_update("test", "notes", "visit", "doc")
+
+    assert exc_info.value.code == status.HTTP_404_NOT_FOUND
+
+    client.put_design_document(
+        "test",
+        "notes",
+        {"updates": {"visit": "function (doc, req) {}"}},
+    )
+
+    response = client.put_update("test", "notes", "visit", "doc")
+
+    assert response.get_result()["current_number_visits"] == 1
+
+
+def test_stat_view(tmp_path: Path) -> None:
+    """Tests stat view is counted by groups of key prefix."""
+    client = SQLiteCloudant(str(tmp_path / "view.sqlite3"))
+    client.put_database("test")
+    client.put_design_document(
+        "test",
+        "notes",
+        {"views": {"stat": {"map": "function (doc) {}", "reduce": "_count"}}},
+    )
+    documents = {
+        "encrypted": {"sign": "encrypted", "is_encrypted": True},
+        "limited": {"sign": "limited", "max_number_visits": 2},
+        "plain": {"sign": "plain", "is_encrypted": False, "max_number_visits": 0},
+        "uploading": {"sign": "uploading", "is_uploading": True},
+        "unsigned": {"sign": ""},
+    }
+
+    for doc_id, document in documents.items():
+        client.put_document("test", doc_id, document)
+
+    def rows(**kwargs: Any) -> List[Dict[str, Any]]:  # noqa: WPS430
+        return client.post_view("test", "notes", "stat", **kwargs).get_result()["rows"]
+
+    assert rows(group_level=2) == [
+        {"key": [False, False], "value": 1},
+        {"key": [False, True], "value": 1},
+        {"key": [True, False], "value": 1},
+    ]
+    assert rows(group_level=1) == [
+        {"key": [False], "value": 2},
+        {"key": [True], "value": 1},
+    ]
+    assert rows() == [{"key": None, "value": 3}]
+    assert rows(reduce=False) == [
+        {"id": "encrypted", "key": [True, False], "value": None},
+        {"id": "limited", "key": [False, True], "value": None},
+        {"id": "plain", "key": [False, False], "value": None},
+    ]
@@ -0,0 +1,74 @@
+import secrets
+import uuid
+
+import nacl.exceptions
+import pytest
+
+from tachyon.services.ciphers.chacha20poly1305 import ChaCha20Poly1305
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [0, 1, 1024, 4096, 10000])
+async def test_segmented_roundtrip(size: int) -> None:
+    """Tests segmented encryption for sizes around segment boundaries."""
+    password = uuid.uuid4().hex
+    message = secrets.token_bytes(size)
+    cipher = await ChaCha20Poly1305.derive(password, segment_size=1024)
+
+    encrypted = b"".join(cipher.encrypt_chunks([message[:100], message[100:]]))
+
+    decrypt_cipher = await ChaCha20Poly1305.derive(password, **cipher.metadata)
+
+    assert decrypt_cipher.decrypt(encrypted) == message
+    assert (
+        b"".join(
+            decrypt_cipher.decrypt_chunks(
+                encrypted[index : index + 333]  # noqa: E203
+                for index in range(0, len(encrypted), 333)
+            ),
+        )
+        == message
+    )
+
+
+@pytest.mark.asyncio
+async def test_segmented_truncated() -> None:
+    """Tests truncated segmented ciphertext can't be decrypted."""
+    cipher = await ChaCha20Poly1305.derive(uuid.uuid4().hex, segment_size=1024)
+    encrypted = cipher.encrypt(secrets.token_bytes(4096))
+
+    with pytest.raises(nacl.exceptions.CryptoError):
+        cipher.decrypt(encrypted[:-1])
+
+    # whole segments cut off (without final one)
+    with pytest.raises(nacl.exceptions.CryptoError):
+        cipher.decrypt(encrypted[: len(encrypted) // 2])
+
+
+@pytest.mark.asyncio
+async def test_derive_wrong_password() -> None:
+    """Tests key tag rejects wrong password and aad is bound to ciphertext."""
+    cipher = await ChaCha20Poly1305.derive(uuid.uuid4().hex)
+    encrypted = cipher.encrypt(b"message")
+
+    with pytest.raises(nacl.exceptions.CryptoError):
+        await ChaCha20Poly1305.derive(uuid.uuid4().hex, **cipher.metadata)
+
+    with pytest.raises(nacl.exceptions.CryptoError):
+        ChaCha20Poly1305(
+            "",
+            key=cipher._key,  # noqa: WPS437
+            aad=b"other secret",
+            **cipher.metadata,
+        ).decrypt(encrypted)
+
+
+def test_legacy_box() -> None:
+    """Tests notes encrypted in one box are still decrypted."""
+    password = uuid.uuid4().hex
+    cipher = ChaCha20Poly1305(password)
+    encrypted = cipher.encrypt(b"message")
+
+    assert ChaCha20Poly1305(password, **cipher.metadata).decrypt(encrypted) == (
+        b"message"
+    )
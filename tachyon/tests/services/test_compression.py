@@ -0,0 +1,63 @@
+import asyncio
+import os
+import uuid
+from typing import AsyncIterator, List
+
+import pytest
+
+from tachyon.services.compression import (
+    INLINE_SIZE,
+    SAMPLE_SIZE,
+    NoteCodec,
+    compress,
+    decompress,
+    decompress_async,
+    decompress_stream,
+)
+
+
+async def _iter_chunks(content: bytes, size: int) -> AsyncIterator[bytes]:
+    for offset in range(0, len(content), size):
+        yield content[offset : offset + size]
+
+
+async def _collect(chunks: AsyncIterator[bytes]) -> List[bytes]:
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.parametrize("codec", list(NoteCodec))
+def test_compression(codec: NoteCodec) -> None:
+    """Tests content is decompressed as is (whole and by stream)."""
+    content = uuid.uuid4().hex.encode() * 10000
+
+    compressed = compress(content, codec, 6)
+
+    assert compressed is not None
+    assert len(compressed) < len(content) // 10
+    assert decompress(compressed, codec) == content
+    assert decompress(compressed, codec.value) == content
+
+    chunks = asyncio.get_event_loop().run_until_complete(
+        _collect(decompress_stream(_iter_chunks(compressed, 1000), codec)),
+    )
+
+    assert b"".join(chunks) == content
+
+
+@pytest.mark.parametrize("size", [1024, SAMPLE_SIZE * 4])
+def test_incompressible(size: int) -> None:
+    """Tests incompressible content isn't compressed."""
+    assert compress(os.urandom(size), NoteCodec.zlib, 6) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1024, INLINE_SIZE * 4])
+async def test_decompress_async(size: int) -> None:
+    """Tests content is decompressed in event loop or (large content) in thread."""
+    # hex of random bytes is compressed about twice
+    content = os.urandom(size // 2).hex().encode()
+
+    compressed = compress(content, NoteCodec.zlib, 6)
+
+    assert compressed is not None
+    assert await decompress_async(compressed, NoteCodec.zlib) == content
@@ -0,0 +1,42 @@
+from tachyon.services.metrics import Counter, Histogram, Registry
+
+
+def test_render() -> None:
+    """Tests metrics are rendered in Prometheus text format."""
+    registry = Registry()
+    histogram = Histogram(
+        "test_seconds",
+        "Test histogram.",
+        labels=("stage",),
+        buckets=(0.1, 1),
+        metrics_registry=registry,
+    )
+    counter = Counter(
+        "test_total",
+        "Test counter.",
+        labels=("code",),
+        metrics_registry=registry,
+    )
+
+    histogram.observe(0.05, "kdf")
+    histogram.observe(0.1, "kdf")
+    histogram.observe(5, "kdf")
+    counter.inc('4"04')
+
+    with histogram.time("sign"):
+        pass
+
+    assert histogram.get("kdf") == (3, 5.15)
+    assert histogram.get("sign")[0] == 1
+    assert registry.render().splitlines()[:9] == [
+        "# HELP test_seconds Test histogram.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{stage="kdf",le="0.1"} 2',
+        'test_seconds_bucket{stage="kdf",le="1"} 2',
+        'test_seconds_bucket{stage="kdf",le="+Inf"} 3',
+        'test_seconds_sum{stage="kdf"} 5.15',
+        'test_seconds_count{stage="kdf"} 3',
+        'test_seconds_bucket{stage="sign",le="0.1"} 1',
+        'test_seconds_bucket{stage="sign",le="1"} 1',
+    ]
+    assert 'test_total{code="4\\"04"} 1' in registry.render()
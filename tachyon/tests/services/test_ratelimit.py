@@ -0,0 +1,78 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from tachyon.services.ratelimit import MemoryRateLimiter, RateLimiter, SQLiteRateLimiter
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter(request: pytest.FixtureRequest, tmp_path: Path) -> RateLimiter:
+    """
+    Rate limiter of every backend.
+
+    :param request: fixture request with backend param.
+    :param tmp_path: temporary directory of test.
+    :return: rate limiter.
+    """
+    if request.param == "sqlite":
+        return SQLiteRateLimiter(str(tmp_path / "ratelimit.sqlite3"))
+
+    return MemoryRateLimiter()
+
+
+def test_token_bucket(limiter: RateLimiter) -> None:
+    """Tests bucket allows burst, then rejects until it's refilled."""
+    test_burst = 5
+    test_rate = 20
+
+    assert not any(
+        limiter.acquire("key", test_rate, test_burst) for _ in range(test_burst)
+    )
+
+    wait = limiter.acquire("key", test_rate, test_burst)
+
+    assert 0 < wait <= 1 / test_rate
+    # buckets of other keys are full
+    assert not limiter.acquire("other", test_rate, test_burst)
+
+    time.sleep(wait)
+
+    assert not limiter.acquire("key", test_rate, test_burst)
+    assert limiter.acquire("key", test_rate, test_burst)
+
+
+def test_refund(limiter: RateLimiter) -> None:
+    """Tests refund returns taken token, bucket isn't filled over burst."""
+    assert not limiter.acquire("key", 0.01, 1)
+    assert limiter.acquire("key", 0.01, 1)
+
+    limiter.refund("key", 0.01, 1)
+    limiter.refund("key", 0.01, 1)
+
+    assert not limiter.acquire("key", 0.01, 1)
+    assert limiter.acquire("key", 0.01, 1)
+
+
+def test_sqlite_shared(tmp_path: Path) -> None:
+    """Tests sqlite limiters of one file share buckets (as workers of host)."""
+    path = str(tmp_path / "ratelimit.sqlite3")
+    limiters = [SQLiteRateLimiter(path), SQLiteRateLimiter(path)]
+
+    assert not limiters[0].acquire("key", 1, 2)
+    assert not limiters[1].acquire("key", 1, 2)
+    assert limiters[0].acquire("key", 1, 2)
+    assert limiters[1].acquire("key", 1, 2)
+
+
+def test_memory_max_buckets() -> None:
+    """Tests memory limiter drops least recently used buckets over limit."""
+    limiter = MemoryRateLimiter(max_buckets=2)
+
+    for key in ("first", "second", "first", "third"):
+        limiter.acquire(key, 1, 1)
+
+    assert len(limiter) == 2
+    assert limiter.acquire("third", 1, 1)
+    # dropped bucket is full again
+    assert not limiter.acquire("second", 1, 1)
@@ -1,7 +1,16 @@
+import uuid
+from typing import Any
+
+import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from ibm_cloud_sdk_core import ApiException
 from starlette import status
 
+from tachyon.db.dao.note_dao import NoteDAO
+from tachyon.services.cache import LRUCache
+from tachyon.settings import settings
+
 
 def test_health(client: TestClient, fastapi_app: FastAPI) -> None:
     """
@@ -13,3 +22,248 @@ def test_health(client: TestClient, fastapi_app: FastAPI) -> None:
     url = fastapi_app.url_path_for("health_check")
     response = client.get(url)
     assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_stat(
+    client: TestClient,
+    fastapi_app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Checks the stat endpoint counts notes and caches counts.
+
+    :param client: client for the app.
+    :param fastapi_app: current FastAPI application.
+    :param monkeypatch: fixture for patching.
+    """
+    monkeypatch.setattr(NoteDAO, "_stat_cache", LRUCache(max_size=1, ttl=60))
+
+    url = fastapi_app.url_path_for("simple_stat")
+    before = client.get(url).json()
+
+    dao = NoteDAO()
+
+    await dao.create(
+        name=uuid.uuid4().hex,
+        text=uuid.uuid4().hex,
+        is_encrypted=True,
+        encrypt_password="password",
+    )
+    await dao.create(name=uuid.uuid4().hex, text=uuid.uuid4().hex, max_number_visits=2)
+    sign = await dao.create(
+        name=uuid.uuid4().hex,
+        text=uuid.uuid4().hex,
+        max_number_visits=1,
+    )
+    await dao.read(sign=sign)
+
+    cached = client.get(url).json()
+
+    assert cached["current_notes_count"] == before["current_notes_count"]
+    assert cached["created_per_minute"] == before["created_per_minute"] + 3
+    assert cached["read_per_minute"] == before["read_per_minute"] + 1
+    assert cached["deleted_per_minute"] == before["deleted_per_minute"] + 1
+
+    NoteDAO._stat_cache.clear()  # noqa: WPS437
+
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["current_notes_count"] == 2
+    assert response.json()["encrypted_notes_count"] == 1
+    assert response.json()["burn_after_read_notes_count"] == 1
+
+
+def test_static_cache(client: TestClient, fastapi_app: FastAPI) -> None:
+    """
+    Checks static files are cached by clients and revalidated by ETag.
+
+    :param client: client for the app.
+    :param fastapi_app: current FastAPI application.
+    """
+    url = fastapi_app.url_path_for("static", path="/docs/swagger-ui.css")
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Cache-Control"] == "public, max-age={0}".format(
+        settings.http_static_max_age,
+    )
+
+    response = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["Cache-Control"].startswith("public")
+
+
+def test_metrics(client: TestClient, fastapi_app: FastAPI) -> None:
+    """
+    Checks the metrics endpoint reports requests, note stages and database calls.
+
+    :param client: client for the app.
+    :param fastapi_app: current FastAPI application.
+    """
+    response = client.post(
+        fastapi_app.url_path_for("create_note"),
+        json={"name": uuid.uuid4().hex, "text": uuid.uuid4().hex},
+    )
+    client.get(fastapi_app.url_path_for("read_note", sign=response.json()["sign"]))
+
+    response = client.get(fastapi_app.url_path_for("metrics"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+
+    metrics = response.text
+
+    assert (
+        'tachyon_http_request_seconds_count{method="POST",'
+        'endpoint="create_note",status="200"}'
+    ) in metrics
+    assert 'tachyon_note_stage_seconds_count{stage="encode"}' in metrics
+    assert 'tachyon_cloudant_request_seconds_count{operation="put_document"}' in metrics
+    assert "tachyon_http_requests_in_flight 1" in metrics
+
+
+def test_ready(
+    client: TestClient,
+    fastapi_app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Checks the ready endpoint reports database reachability.
+
+    :param client: client for the app.
+    :param fastapi_app: current FastAPI application.
+    :param monkeypatch: fixture for patching.
+    """
+    url = fastapi_app.url_path_for("ready_check")
+
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["ready"]
+    assert response.json()["latency_ms"] >= 0
+
+    async def unreachable(dao: NoteDAO) -> float:  # noqa: WPS430
+        raise ApiException(code=500, message="Database is unreachable")
+
+    monkeypatch.setattr(NoteDAO, "ping", unreachable)
+
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert not response.json()["ready"]
+
+
+def test_warm_up(fastapi_app: FastAPI) -> None:
+    """
+    Checks database client is created on startup (before first request).
+
+    :param fastapi_app: current FastAPI application.
+    """
+    NoteDAO.close_client()
+
+    with TestClient(app=fastapi_app):
+        assert NoteDAO._client_instance is not None  # noqa: WPS437
+
+
+def test_populate_retry(
+    fastapi_app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Checks database population failed on startup is retried before ready.
+
+    :param fastapi_app: current FastAPI application.
+    :param monkeypatch: fixture for patching.
+    """
+    # on startup and on first readiness check
+    failures = [
+        ApiException(code=503, message="Database is unavailable") for _ in range(2)
+    ]
+    create_client = NoteDAO._create_client  # noqa: WPS437
+
+    def unavailable_create_client() -> Any:  # noqa: WPS430
+        cloudant_client = create_client()
+        put_database = cloudant_client.sync.put_database
+
+        def failing_put_database(*args: Any, **kwargs: Any) -> Any:  # noqa: WPS430
+            if failures:
+                raise failures.pop()
+
+            return put_database(*args, **kwargs)
+
+        monkeypatch.setattr(cloudant_client.sync, "put_database", failing_put_database)
+
+        return cloudant_client
+
+    NoteDAO.close_client()
+    monkeypatch.setattr(
+        NoteDAO,
+        "_create_client",
+        staticmethod(unavailable_create_client),
+    )
+    populated = []
+    populate_design_document = NoteDAO._populate_design_document  # noqa: WPS437
+
+    def recorded_populate_design_document(  # noqa: WPS430
+        dao: NoteDAO,
+        *args: Any,
+    ) -> None:
+        populate_design_document(dao, *args)
+        populated.append(args[1])
+
+    monkeypatch.setattr(
+        NoteDAO,
+        "_populate_design_document",
+        recorded_populate_design_document,
+    )
+
+    with TestClient(app=fastapi_app) as client:
+        assert NoteDAO._client_instance is None  # noqa: WPS437
+
+        url = fastapi_app.url_path_for("ready_check")
+        response = client.get(url)
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert not populated
+
+        response = client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert populated == ["notes"]
+
+
+def test_unconnected_database(
+    fastapi_app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Tests that requests fail fast until database is connected in background.
+
+    :param fastapi_app: current FastAPI application.
+    :param monkeypatch: pytest monkeypatch fixture.
+    """
+    connections = []
+    connect = NoteDAO._connect  # noqa: WPS437
+
+    def recorded_connect(dao: NoteDAO) -> Any:  # noqa: WPS430
+        connections.append(dao)
+
+        return connect(dao)
+
+    with TestClient(app=fastapi_app) as client:
+        NoteDAO.close_client()
+        monkeypatch.setattr(NoteDAO, "_connect", recorded_connect)
+        url = fastapi_app.url_path_for("read_note", sign="a" * NoteDAO.SIGN_LENGTH)
+        response = client.get(url)
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+        url = fastapi_app.url_path_for("ready_check")
+        response = client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert NoteDAO._client_instance is not None  # noqa: WPS437
+        assert connections
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -5,3 +7,30 @@ class StatResponse(BaseModel):
     """Response schema for stat."""
 
     current_notes_count: int
+    encrypted_notes_count: int
+    # notes with max number of visits (deleted after last visit)
+    burn_after_read_notes_count: int
+    # events of worker
+    created_per_minute: int
+    read_per_minute: int
+    deleted_per_minute: int
+
+
+class CacheStatResponse(BaseModel):
+    """Response schema for notes cache stat."""
+
+    enabled: bool
+    hits: int
+    misses: int
+    items: int
+    size: int
+    max_size: int
+
+
+class ReadyResponse(BaseModel):
+    """Response schema for readiness check."""
+
+    ready: bool
+    # database request latency
+    latency_ms: Optional[float] = None
+    detail: Optional[str] = None
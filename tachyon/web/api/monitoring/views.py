@@ -1,6 +1,19 @@
-from fastapi import APIRouter
+from http import HTTPStatus
 
-from tachyon.web.api.monitoring.schemas import StatResponse
+from fastapi import APIRouter, Depends
+from fastapi.responses import UJSONResponse
+from ibm_cloud_sdk_core import ApiException
+from requests import RequestException
+from starlette.responses import PlainTextResponse
+
+from tachyon.db.dao.note_dao import NoteDAO
+from tachyon.services.metrics import registry
+from tachyon.web.api.monitoring.schemas import (
+    CacheStatResponse,
+    ReadyResponse,
+    StatResponse,
+)
+from tachyon.web.dependencies.dao import get_note_dao
 
 router = APIRouter()
 
@@ -14,14 +27,72 @@ async def health_check() -> None:
     """
 
 
+@router.get(
+    "/ready",
+    response_model=ReadyResponse,
+    responses={HTTPStatus.SERVICE_UNAVAILABLE.value: {"model": ReadyResponse}},
+)
+async def ready_check(note_dao: NoteDAO = Depends(get_note_dao)) -> UJSONResponse:
+    """
+    Checks the database is reachable from worker.
+
+    It returns 503 if database isn't reachable (worker shouldn't get traffic).
+
+    :param note_dao: DAO for note models.
+    :return: readiness and database latency
+    """
+    try:
+        latency = await note_dao.ping()
+    except (ApiException, RequestException) as exc:
+        return UJSONResponse(
+            ReadyResponse(ready=False, detail=str(exc)).dict(),
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        )
+
+    return UJSONResponse(ReadyResponse(ready=True, latency_ms=latency * 1000).dict())
+
+
 @router.get("/stat", response_model=StatResponse)
-async def simple_stat() -> StatResponse:
+async def simple_stat(note_dao: NoteDAO = Depends(get_note_dao)) -> StatResponse:
     """
     Simple stats of notes.
 
-    It returns 200 if the project is healthy.
+    Counts are cached for a few seconds, so the endpoint is cheap to poll.
+
+    :param note_dao: DAO for note models.
     :return: simple notes stat
     """
+    stat = await note_dao.stat()
+
     return StatResponse(
-        current_notes_count=0,
+        current_notes_count=stat["total"],
+        encrypted_notes_count=stat["encrypted"],
+        burn_after_read_notes_count=stat["limited"],
+        created_per_minute=stat["created_per_minute"],
+        read_per_minute=stat["read_per_minute"],
+        deleted_per_minute=stat["deleted_per_minute"],
+    )
+
+
+@router.get("/cache", response_model=CacheStatResponse)
+async def cache_stat(note_dao: NoteDAO = Depends(get_note_dao)) -> CacheStatResponse:
+    """
+    Stats of notes cache of current worker.
+
+    :param note_dao: DAO for note models.
+    :return: cache hits, misses and size
+    """
+    return CacheStatResponse(**note_dao.cache_stat())
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Metrics of current worker in Prometheus text format.
+
+    :return: metrics text
+    """
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4",
     )
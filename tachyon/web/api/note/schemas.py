@@ -1,8 +1,9 @@
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
 from tachyon.db.models.note_model import NoteContentType
+from tachyon.settings import settings
 
 
 class NoteReadResponse(BaseModel):
@@ -20,6 +21,8 @@ class NoteCreateRequest(BaseModel):
     max_number_visits: int = Field(default=0, ge=0)
     is_encrypted: bool = Field(default=False)
     encrypt_password: Optional[str] = Field(default=None)
+    # seconds of note lifetime
+    ttl: Optional[int] = Field(default=None, gt=0)
     text: str = Field(...)
 
 
@@ -27,3 +30,59 @@ class NoteCreateResponse(BaseModel):
     """Response schema for create note."""
 
     sign: str = Field(...)
+
+
+class NoteBulkCreateRequest(BaseModel):
+    """Request schema for create many notes."""
+
+    notes: List[NoteCreateRequest] = Field(
+        ...,
+        min_items=1,
+        max_items=settings.notes_bulk_max_items,
+    )
+
+
+class NoteBulkCreateItem(BaseModel):
+    """Result of create for one note of bulk (sign or error)."""
+
+    sign: Optional[str] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+    code: int = Field(...)
+
+
+class NoteBulkCreateResponse(BaseModel):
+    """Response schema for create many notes."""
+
+    notes: List[NoteBulkCreateItem] = Field(...)
+
+
+class NoteBulkReadItem(BaseModel):
+    """Sign and password of one note for bulk read."""
+
+    sign: str = Field(...)
+    password: Optional[str] = Field(default=None)
+
+
+class NoteBulkReadRequest(BaseModel):
+    """Request schema for read many notes."""
+
+    notes: List[NoteBulkReadItem] = Field(
+        ...,
+        min_items=1,
+        max_items=settings.notes_bulk_max_items,
+    )
+
+
+class NoteBulkReadResult(BaseModel):
+    """Result of read for one note of bulk (note message or error)."""
+
+    name: Optional[str] = Field(default=None)
+    message: Optional[str] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+    code: int = Field(...)
+
+
+class NoteBulkReadResponse(BaseModel):
+    """Response schema for read many notes."""
+
+    notes: Dict[str, NoteBulkReadResult] = Field(...)
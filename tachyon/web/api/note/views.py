@@ -1,51 +1,151 @@
-from typing import Optional
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import quote
 
 from fastapi import APIRouter
-from fastapi.param_functions import Depends, Path, Query
+from fastapi.param_functions import Depends, Header, Path, Query
+from fastapi.responses import UJSONResponse
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
 
 from tachyon.db.dao.note_dao import NoteDAO
+from tachyon.db.models.note_model import NoteContentType, NoteModel
+from tachyon.exceptions.base import BaseTachyonException
+from tachyon.exceptions.dao.note import NoteDAOEncryptPasswordError
+from tachyon.exceptions.services.ratelimit import RateLimitExceededError
+from tachyon.services.ratelimit import RateLimiter
 from tachyon.web.api.note.schemas import (
+    NoteBulkCreateItem,
+    NoteBulkCreateRequest,
+    NoteBulkCreateResponse,
+    NoteBulkReadRequest,
+    NoteBulkReadResponse,
     NoteCreateRequest,
     NoteCreateResponse,
     NoteReadResponse,
 )
+from tachyon.web.dependencies.dao import get_note_dao
+from tachyon.web.dependencies.ratelimit import get_rate_limiter
+from tachyon.web.utils.caching import etag_matches, note_cache_headers, note_etag
+from tachyon.web.utils.ratelimit import (
+    refund_password_attempt,
+    take_encrypt_attempt,
+    take_password_attempt,
+)
 
 router = APIRouter()
 
+MEDIA_TYPES = {NoteContentType.text: "text/plain; charset=utf-8"}
+
 
 @router.get("/{sign}/", response_model=NoteReadResponse)
 async def read_note(
     sign: str = Path(...),
     password: Optional[str] = Query(default=None),
-    note_dao: NoteDAO = Depends(),
-) -> NoteReadResponse:
+    if_none_match: Optional[str] = Header(default=None),
+    note_dao: NoteDAO = Depends(get_note_dao),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> Response:
     """
     Read note message in database.
 
+    Response is returned as is (it isn't validated by response model again).
+    Unlimited unencrypted notes have ETag, so client with the same note
+    gets 304 without message and visit (note is checked without content,
+    from notes cache if it's enabled).
+
     :param password: password for read note.
+    :param if_none_match: ETag of note cached by client.
     :param note_dao: DAO for note models.
+    :param rate_limiter: limiter of password attempts.
     :param sign: unique identity for note find.
 
     :returns: note read message
     """
-    note, message = await note_dao.read(sign, password=password)
+    wrong_password = False
 
-    return NoteReadResponse(message=message, name=note.name)
+    try:
+        # ETag is given only to notes which can be cached, so notes which
+        # can't be cached aren't fetched for revalidation by other tags
+        if if_none_match and etag_matches(if_none_match, note_etag(sign)):
+            headers = note_cache_headers(sign, await note_dao.read_info(sign))
+
+            if "ETag" in headers:
+                return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        note, message = await note_dao.read(sign, password=password)
+    except NoteDAOEncryptPasswordError:
+        # reads without password aren't password attempts (nothing is hashed)
+        wrong_password = bool(password)
+        raise
+    finally:
+        # token of password attempt is taken by rate limit middleware
+        if password is not None and not wrong_password:
+            await refund_password_attempt(rate_limiter, sign)
+
+    return UJSONResponse(
+        {"name": note.name, "message": message},
+        headers=note_cache_headers(sign, note),
+    )
+
+
+@router.get("/{sign}/stream/", response_class=StreamingResponse)
+async def read_note_stream(
+    sign: str = Path(...),
+    password: Optional[str] = Query(default=None),
+    note_dao: NoteDAO = Depends(get_note_dao),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> StreamingResponse:
+    """
+    Read note message as stream (for large notes).
+
+    Note name is sent in X-Note-Name header (url-encoded).
+
+    :param password: password for read note.
+    :param note_dao: DAO for note models.
+    :param rate_limiter: limiter of password attempts.
+    :param sign: unique identity for note find.
+
+    :returns: note message stream
+    """
+    wrong_password = False
+
+    try:
+        note, chunks = await note_dao.read_stream(sign, password=password)
+    except NoteDAOEncryptPasswordError:
+        wrong_password = bool(password)
+        raise
+    finally:
+        if password is not None and not wrong_password:
+            await refund_password_attempt(rate_limiter, sign)
+
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[note.content_type],
+        headers={"X-Note-Name": quote(note.name)},
+    )
 
 
 @router.post("/", response_model=NoteCreateResponse)
 async def create_note(
+    request: Request,
     schema: NoteCreateRequest,
-    note_dao: NoteDAO = Depends(),
+    note_dao: NoteDAO = Depends(get_note_dao),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
 ) -> NoteCreateResponse:
     """
     Read note message in database.
 
+    :param request: request of client.
     :param schema: params for create note.
     :param note_dao: DAO for note models.
+    :param rate_limiter: limiter of encrypted notes creation.
 
     :returns: note sing
     """
+    if schema.is_encrypted:
+        await take_encrypt_attempt(rate_limiter, request)
+
     return NoteCreateResponse(
         sign=await note_dao.create(
             name=schema.name,
@@ -54,5 +154,175 @@ async def create_note(
             max_number_visits=schema.max_number_visits,
             is_encrypted=schema.is_encrypted,
             encrypt_password=schema.encrypt_password,
+            ttl=schema.ttl,
+        ),
+    )
+
+
+@router.post("/bulk/", response_model=NoteBulkCreateResponse)
+async def create_notes_bulk(
+    request: Request,
+    schema: NoteBulkCreateRequest,
+    note_dao: NoteDAO = Depends(get_note_dao),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> NoteBulkCreateResponse:
+    """
+    Create many notes in one request.
+
+    Errors of notes are returned in place of their signs,
+    other notes are created anyway. Encrypted notes over rate limit of
+    client are rejected with 429.
+
+    :param request: request of client.
+    :param schema: params for create every note.
+    :param note_dao: DAO for note models.
+    :param rate_limiter: limiter of encrypted notes creation.
+
+    :returns: sign or error of every note (in same order)
+    """
+    limited: Dict[int, BaseTachyonException] = {}
+
+    for index, note in enumerate(schema.notes):
+        if note.is_encrypted:
+            try:
+                await take_encrypt_attempt(rate_limiter, request)
+            except RateLimitExceededError as exc:
+                limited[index] = exc
+
+    created = iter(
+        await note_dao.create_bulk(
+            [
+                note.dict()
+                for index, note in enumerate(schema.notes)
+                if index not in limited
+            ],
+        ),
+    )
+    results = [
+        limited[index] if index in limited else next(created)
+        for index in range(len(schema.notes))
+    ]
+
+    return NoteBulkCreateResponse(
+        notes=[
+            NoteBulkCreateItem(sign=result, code=HTTPStatus.OK)
+            if isinstance(result, str)
+            else NoteBulkCreateItem(error=result.message, code=result.code)
+            for result in results
+        ],
+    )
+
+
+@router.post("/bulk/read/", response_model=NoteBulkReadResponse)
+async def read_notes_bulk(
+    schema: NoteBulkReadRequest,
+    note_dao: NoteDAO = Depends(get_note_dao),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> UJSONResponse:
+    """
+    Read many notes in one request.
+
+    Errors of notes are returned in place of their messages,
+    other notes are read anyway. Password attempts over rate limit of note
+    are rejected with 429 (before password hashing), tokens are returned
+    unless password is wrong. Response is returned as is (it isn't validated
+    by response model again).
+
+    :param schema: sign and password of every note.
+    :param note_dao: DAO for note models.
+    :param rate_limiter: limiter of password attempts.
+
+    :returns: message or error of every note by sign
+    """
+    passwords = {note.sign: note.password for note in schema.notes}
+    limited = set()
+
+    for sign, password in passwords.items():
+        if password is not None and await take_password_attempt(rate_limiter, sign):
+            limited.add(sign)
+
+    results: Dict[str, Union[Tuple[NoteModel, str], BaseTachyonException]] = {
+        sign: RateLimitExceededError(
+            message="Too many password attempts, try again later.",
+            http_code=HTTPStatus.TOO_MANY_REQUESTS,
+        )
+        for sign in limited
+    }
+
+    for sign in limited:
+        passwords.pop(sign)
+
+    results.update(await note_dao.read_bulk(passwords))
+
+    for sign, password in passwords.items():
+        wrong_password = bool(password) and isinstance(
+            results[sign],
+            NoteDAOEncryptPasswordError,
+        )
+
+        if password is not None and not wrong_password:
+            await refund_password_attempt(rate_limiter, sign)
+
+    return UJSONResponse(
+        {
+            "notes": {
+                sign: {
+                    "name": result[0].name,
+                    "message": result[1],
+                    "error": None,
+                    "code": HTTPStatus.OK,
+                }
+                if isinstance(result, tuple)
+                else {
+                    "name": None,
+                    "message": None,
+                    "error": result.message,
+                    "code": result.code,
+                }
+                for sign, result in results.items()
+            },
+        },
+    )
+
+
+@router.post("/stream/", response_model=NoteCreateResponse)
+async def create_note_stream(
+    request: Request,
+    name: str = Query(...),
+    content_type: NoteContentType = Query(default=NoteContentType.text),
+    max_number_visits: int = Query(default=0, ge=0),
+    is_encrypted: bool = Query(default=False),
+    encrypt_password: Optional[str] = Query(default=None),
+    ttl: Optional[int] = Query(default=None, gt=0),
+    note_dao: NoteDAO = Depends(get_note_dao),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> NoteCreateResponse:
+    """
+    Create note with message streamed in request body (for large notes).
+
+    :param request: request with note message body.
+    :param name: note name.
+    :param content_type: note content type.
+    :param max_number_visits: max visits for note, 0 - unlimited.
+    :param is_encrypted: encrypt note message.
+    :param encrypt_password: password for note cipher.
+    :param ttl: seconds of note lifetime.
+    :param note_dao: DAO for note models.
+    :param rate_limiter: limiter of encrypted notes creation.
+
+    :returns: note sing
+    """
+    if is_encrypted:
+        await take_encrypt_attempt(rate_limiter, request)
+
+    return NoteCreateResponse(
+        sign=await note_dao.create_stream(
+            name=name,
+            chunks=request.stream(),
+            content_type=content_type,
+            max_number_visits=max_number_visits,
+            is_encrypted=is_encrypted,
+            encrypt_password=encrypt_password,
+            ttl=ttl,
         ),
     )
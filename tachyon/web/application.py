@@ -2,13 +2,18 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.responses import UJSONResponse
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 
 from tachyon import __version__
+from tachyon.settings import settings
 from tachyon.web.api import root
 from tachyon.web.api.router import api_router
 from tachyon.web.exceptions import add_exception_handlers
+from tachyon.web.lifetime import register_shutdown_event, register_startup_event
+from tachyon.web.utils.caching import CachedStaticFiles
+from tachyon.web.utils.compression import GZipMiddleware
+from tachyon.web.utils.metrics import MetricsMiddleware
+from tachyon.web.utils.ratelimit import RateLimitMiddleware, create_rate_limiter
 from tachyon.web.utils.sentry import sentry_init
 
 APP_ROOT = Path(__file__).parent.parent
@@ -34,6 +39,10 @@ def get_app() -> FastAPI:
         default_response_class=UJSONResponse,
     )
 
+    # limiter shared by middleware and bulk read (see tachyon.web.dependencies)
+    app.state.rate_limiter = create_rate_limiter()
+
+    app.add_middleware(RateLimitMiddleware, limiter=app.state.rate_limiter)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -42,12 +51,24 @@ def get_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if settings.http_gzip_min_size:
+        app.add_middleware(
+            GZipMiddleware,
+            minimum_size=settings.http_gzip_min_size,
+            level=settings.http_gzip_level,
+        )
+
+    app.add_middleware(MetricsMiddleware)
+
     add_exception_handlers(app)
 
+    register_startup_event(app)
+    register_shutdown_event(app)
+
     app.include_router(router=api_router, prefix="/api")
     app.mount(
         "/static",
-        StaticFiles(directory=APP_ROOT / "static"),
+        CachedStaticFiles(directory=APP_ROOT / "static"),
         name="static",
     )
     app.include_router(router=root.router)
@@ -0,0 +1,16 @@
+from starlette.requests import Request
+
+from tachyon.db.dao.note_dao import NoteDAO
+
+
+def get_note_dao(request: Request) -> NoteDAO:
+    """
+    DAO for note models of application.
+
+    DAO (and its client with connection pool) is created once on startup
+    and shared by all requests of worker.
+
+    :param request: current request.
+    :return: note DAO of application.
+    """
+    return request.app.state.note_dao
@@ -0,0 +1,15 @@
+from starlette.requests import Request
+
+from tachyon.services.ratelimit import RateLimiter
+
+
+def get_rate_limiter(request: Request) -> RateLimiter:
+    """
+    Rate limiter of application.
+
+    Limiter is shared with rate limit middleware, so buckets are the same.
+
+    :param request: current request.
+    :return: rate limiter of application.
+    """
+    return request.app.state.rate_limiter
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from fastapi import FastAPI
+
+from tachyon.db.dao.note_dao import NoteDAO
+from tachyon.services.password import password_executor
+from tachyon.services.periodic import run_periodically
+from tachyon.settings import settings
+
+logger = logging.getLogger("lifetime")
+
+
+def register_startup_event(app: FastAPI) -> Callable[[], Awaitable[None]]:
+    """
+    Actions to run on application startup.
+
+    :param app: fastAPI application.
+    :return: function that actually performs actions.
+    """
+
+    @app.on_event("startup")
+    async def _startup() -> None:  # noqa: WPS430
+        app.state.background_tasks = []
+        # DAO shared by requests of worker (see tachyon.web.dependencies.dao)
+        app.state.note_dao = NoteDAO()
+
+        # first requests of worker don't wait for database setup and connections,
+        # unavailable database doesn't stop worker (it is reported by /ready)
+        try:
+            await app.state.note_dao.warm_up(
+                min(settings.cloudant_warm_up_connections, settings.cloudant_pool_size),
+            )
+        except Exception as exc:
+            logger.exception(exc)
+
+        if settings.notes_visit_flush_interval:
+            app.state.background_tasks.append(
+                asyncio.ensure_future(
+                    run_periodically(
+                        app.state.note_dao.flush_visits,
+                        settings.notes_visit_flush_interval,
+                    ),
+                ),
+            )
+
+        if settings.notes_sweep_interval:
+            app.state.background_tasks.append(
+                asyncio.ensure_future(
+                    run_periodically(
+                        app.state.note_dao.sweep,
+                        settings.notes_sweep_interval,
+                    ),
+                ),
+            )
+
+    return _startup
+
+
+def register_shutdown_event(app: FastAPI) -> Callable[[], Awaitable[None]]:
+    """
+    Actions to run on application's shutdown.
+
+    :param app: fastAPI application.
+    :return: function that actually performs actions.
+    """
+
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:  # noqa: WPS430
+        for task in app.state.background_tasks:
+            task.cancel()
+
+        await asyncio.gather(*app.state.background_tasks, return_exceptions=True)
+
+        await app.state.note_dao.flush_visits()
+
+        app.state.note_dao.close_client()
+        password_executor.shutdown()
+
+    return _shutdown
@@ -0,0 +1,88 @@
+import os
+import time
+from typing import Dict
+
+from starlette.responses import Response
+from starlette.staticfiles import PathLike, StaticFiles
+from starlette.types import Scope
+
+from tachyon.db.models.note_model import NoteModel
+from tachyon.settings import settings
+
+
+def note_etag(sign: str) -> str:
+    """ETag of note read response (content of note never changes).
+
+    :param sign: note sign
+    :return: weak ETag, so it's the same for gzip and identity responses
+    """
+    return 'W/"{0}"'.format(sign)
+
+
+def note_cache_headers(sign: str, note: NoteModel) -> Dict[str, str]:
+    """Http cache headers of note read response.
+
+    Content of note never changes, so unlimited unencrypted notes are
+    cached by clients and revalidated by ETag of sign. Notes with visits
+    limit or encryption are never stored by clients.
+
+    :param sign: note sign
+    :param note: read note
+    :return: response headers
+    """
+    if note.is_encrypted or note.max_number_visits:
+        return {"Cache-Control": "no-store"}
+
+    max_age = settings.http_note_max_age
+
+    if note.expires_at is not None:
+        max_age = max(0, min(max_age, int(note.expires_at - time.time())))
+
+    return {
+        "Cache-Control": "private, max-age={0}".format(max_age),
+        "ETag": note_etag(sign),
+    }
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """ETag of response is in If-None-Match header of request.
+
+    :param if_none_match: value of If-None-Match header
+    :param etag: ETag of response
+    :return: matches or not
+    """
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag[2:] if etag.startswith("W/") else etag
+
+    return any(
+        (tag[2:] if tag.startswith("W/") else tag) == opaque
+        for tag in (value.strip() for value in if_none_match.split(","))
+    )
+
+
+class CachedStaticFiles(StaticFiles):
+    """Static files with Cache-Control header (and 304 by ETag of starlette)."""
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        """Response of file or 304 if client has the same file.
+
+        :param full_path: path of file
+        :param stat_result: stat of file
+        :param scope: request scope
+        :param status_code: response status code
+        :return: response
+        """
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = "public, max-age={0}".format(
+            settings.http_static_max_age,
+        )
+
+        return response
@@ -0,0 +1,38 @@
+import gzip
+import io
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class GZipMiddleware:
+    """ASGI middleware compressing responses with gzip of given level.
+
+    Responses smaller than ``minimum_size`` are sent as is, streamed
+    responses are compressed by chunks.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, level: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get(
+            "Accept-Encoding",
+            "",
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        responder = GZipResponder(self.app, self.minimum_size)
+        # responder of starlette compresses with max level (slow for large bodies)
+        responder.gzip_buffer = io.BytesIO()
+        responder.gzip_file = gzip.GzipFile(
+            mode="wb",
+            fileobj=responder.gzip_buffer,
+            compresslevel=self.level,
+        )
+
+        await responder(scope, receive, send)
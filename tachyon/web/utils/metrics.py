@@ -0,0 +1,59 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from tachyon.services.metrics import Gauge, Histogram
+
+http_request_seconds = Histogram(
+    "tachyon_http_request_seconds",
+    "Duration of http requests (with streaming of response body).",
+    labels=("method", "endpoint", "status"),
+)
+http_requests_in_flight = Gauge(
+    "tachyon_http_requests_in_flight",
+    "Http requests being processed by worker.",
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware for latency and in-flight metrics of http requests.
+
+    Requests are labeled by name of endpoint function, so path params
+    (note signs) don't produce new series.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:  # noqa: WPS430
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+
+            # endpoint is set to scope by router
+            endpoint = getattr(scope.get("endpoint"), "__name__", "unmatched")
+
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                endpoint,
+                str(status_code),
+            )
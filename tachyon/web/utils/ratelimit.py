@@ -0,0 +1,221 @@
+import asyncio
+import math
+import re
+from http import HTTPStatus
+from typing import Callable, Optional, TypeVar
+from urllib.parse import parse_qs
+
+from fastapi.responses import UJSONResponse
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from tachyon.exceptions.services.ratelimit import RateLimitExceededError
+from tachyon.services.metrics import Counter
+from tachyon.services.ratelimit import (
+    MemoryRateLimiter,
+    RateLimitBackend,
+    RateLimiter,
+    SQLiteRateLimiter,
+)
+from tachyon.settings import settings
+
+ResultType = TypeVar("ResultType")
+
+NOTE_API_PREFIX = "/api/note/"
+# reads of note by sign (password is sent in query)
+NOTE_READ_PATH = re.compile(r"^/api/note/(?P<sign>[^/]+)/(stream/)?$")
+
+ratelimit_requests_total = Counter(
+    "tachyon_ratelimit_requests_total",
+    "Requests checked by rate limiter.",
+    labels=("bucket", "result"),
+)
+
+
+def create_rate_limiter() -> RateLimiter:
+    """Create rate limiter of backend from settings.
+
+    :return: rate limiter
+    """
+    if settings.ratelimit_backend == RateLimitBackend.sqlite:
+        return SQLiteRateLimiter(settings.ratelimit_sqlite_path)
+
+    return MemoryRateLimiter()
+
+
+async def take_password_attempt(limiter: RateLimiter, sign: str) -> float:
+    """Take token of password attempt from bucket of note (before hashing).
+
+    Token is taken before password is hashed, so concurrent attempts can't
+    outrun the bucket, and it's returned if password isn't wrong (see
+    ``refund_password_attempt``), so readers with right password aren't
+    limited.
+
+    :param limiter: rate limiter
+    :param sign: note sign
+    :return: 0 if attempt is allowed, else seconds until it's allowed
+    """
+    if not settings.ratelimit_password_rate:
+        return 0
+
+    return await _acquire(
+        limiter,
+        "password",
+        sign,
+        settings.ratelimit_password_rate,
+        settings.ratelimit_password_burst,
+    )
+
+
+async def refund_password_attempt(limiter: RateLimiter, sign: str) -> None:
+    """Return token of password attempt which wasn't wrong password.
+
+    :param limiter: rate limiter
+    :param sign: note sign
+    """
+    if settings.ratelimit_password_rate:
+        await _run(
+            limiter,
+            limiter.refund,
+            "password:{0}".format(sign),
+            settings.ratelimit_password_rate,
+            settings.ratelimit_password_burst,
+        )
+
+
+async def take_encrypt_attempt(limiter: RateLimiter, request: Request) -> None:
+    """Take token of encrypted note creation from bucket of client address.
+
+    Encryption hashes password of note, so creation of encrypted notes is
+    limited by client as password attempts.
+
+    :param limiter: rate limiter
+    :param request: request of client
+    :raises RateLimitExceededError: if bucket of client is empty
+    """
+    if not settings.ratelimit_encrypt_rate or request.client is None:
+        return
+
+    wait = await _acquire(
+        limiter,
+        "encrypt",
+        request.client.host,
+        settings.ratelimit_encrypt_rate,
+        settings.ratelimit_encrypt_burst,
+    )
+
+    if wait:
+        raise RateLimitExceededError(
+            message="Too many encrypted notes, try again later.",
+            http_code=HTTPStatus.TOO_MANY_REQUESTS,
+        )
+
+
+async def _run(
+    limiter: RateLimiter,
+    method: Callable[[str, float, int], ResultType],
+    key: str,
+    rate: float,
+    burst: int,
+) -> ResultType:
+    # blocking limiter is run in thread, so event loop isn't blocked
+    if not limiter.blocking:
+        return method(key, rate, burst)
+
+    return await asyncio.get_event_loop().run_in_executor(
+        None,
+        method,
+        key,
+        rate,
+        burst,
+    )
+
+
+async def _acquire(
+    limiter: RateLimiter,
+    bucket: str,
+    key: str,
+    rate: float,
+    burst: int,
+) -> float:
+    wait = await _run(
+        limiter,
+        limiter.acquire,
+        "{0}:{1}".format(bucket, key),
+        rate,
+        burst,
+    )
+
+    ratelimit_requests_total.inc(bucket, "rejected" if wait else "allowed")
+
+    return wait
+
+
+class RateLimitMiddleware:
+    """ASGI middleware limiting note requests by token buckets.
+
+    Every note request takes token from bucket of client address, read of
+    note with password takes token from bucket of note, so password guessing
+    is rejected before password hashing (token is returned by views if
+    password isn't wrong, see ``refund_password_attempt``). Rejected requests
+    get 429 with Retry-After header.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter) -> None:
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(NOTE_API_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        wait = await self._check(scope)
+
+        if not wait:
+            await self.app(scope, receive, send)
+            return
+
+        response = UJSONResponse(
+            {"detail": "Too many requests, try again later."},
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+        await response(scope, receive, send)
+
+    async def _check(self, scope: Scope) -> float:
+        client = scope.get("client")
+
+        if settings.ratelimit_ip_rate and client:
+            wait = await _acquire(
+                self.limiter,
+                "ip",
+                client[0],
+                settings.ratelimit_ip_rate,
+                settings.ratelimit_ip_burst,
+            )
+
+            if wait:
+                return wait
+
+        sign = self._password_attempt_sign(scope)
+
+        if sign is None:
+            return 0
+
+        return await take_password_attempt(self.limiter, sign)
+
+    def _password_attempt_sign(self, scope: Scope) -> Optional[str]:
+        if scope["method"] != "GET":
+            return None
+
+        match = NOTE_READ_PATH.match(scope["path"])
+
+        if match is None or "password" not in parse_qs(
+            scope["query_string"].decode(),
+            keep_blank_values=True,
+        ):
+            return None
+
+        return match.group("sign")